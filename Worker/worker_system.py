@@ -8,6 +8,7 @@ import asyncio
 import aiohttp
 import json
 import os
+import sys
 import time
 import uuid
 import wave
@@ -16,22 +17,19 @@ import subprocess
 import shutil
 import platform
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 from dotenv import load_dotenv
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
 import threading
-
-# Import pydub for audio conversion
-try:
-    from pydub import AudioSegment
-    PYDUB_AVAILABLE = True
-except ImportError:
-    PYDUB_AVAILABLE = False
-    logger.warning("pydub not available, MP3 conversion will use ffmpeg directly")
+import functools
+import struct
 
 # Load environment variables
 load_dotenv()
@@ -43,6 +41,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Import pydub for audio conversion
+try:
+    from pydub import AudioSegment
+    PYDUB_AVAILABLE = True
+except ImportError:
+    PYDUB_AVAILABLE = False
+    logger.warning("pydub not available, MP3 conversion will use ffmpeg directly")
+
+# In-process MP3 encoder, preferred over ffmpeg when installed
+try:
+    import lameenc
+    LAMEENC_AVAILABLE = True
+except ImportError:
+    LAMEENC_AVAILABLE = False
+
 @dataclass
 class WorkerConfig:
     """Configuration for the worker system"""
@@ -54,21 +67,54 @@ class WorkerConfig:
     # TTS Configuration
     voice: str = "tara"
     use_random_voice: bool = os.getenv('USE_RANDOM_VOICE', 'true').lower() in ('true', '1', 'yes', 'on')
+    # http posts to TTS_SERVER_URL, local runs tts_engine in this process (single-host deployments)
+    tts_mode: str = os.getenv('TTS_MODE', 'http').lower()
     
     # S3 Configuration
     aws_access_key_id: str = os.getenv('AWS_ACCESS_KEY_ID', '')
     aws_secret_access_key: str = os.getenv('AWS_SECRET_ACCESS_KEY', '')
     aws_region: str = os.getenv('AWS_REGION', 'us-east-1')
     s3_bucket: str = os.getenv('S3_BUCKET', '')
+    s3_endpoint_url: str = os.getenv('S3_ENDPOINT_URL', '')  # S3-compatible endpoint (MinIO, moto), empty = AWS
+    s3_multipart_threshold_mb: int = int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '8'))
+    s3_multipart_chunksize_mb: int = int(os.getenv('S3_MULTIPART_CHUNKSIZE_MB', '8'))
+    s3_max_concurrency: int = int(os.getenv('S3_MAX_CONCURRENCY', '10'))  # parts uploaded in parallel per file
+    s3_upload_threads: int = int(os.getenv('S3_UPLOAD_THREADS', '4'))  # files uploaded in parallel
+    
+    # Stream TTS audio through the encoder into an S3 multipart upload instead of local files
+    stream_upload: bool = os.getenv('STREAM_UPLOAD', 'true').lower() in ('true', '1', 'yes', 'on')
+    keep_local_audio: bool = os.getenv('KEEP_LOCAL_AUDIO', 'false').lower() in ('true', '1', 'yes', 'on')
+    # MP3 encoder: auto, lameenc (in-process), ffmpeg or pydub
+    mp3_encoder: str = os.getenv('MP3_ENCODER', 'auto').lower()
+    # Processes for CPU-bound audio stages, shared by all workers
+    audio_process_workers: int = int(os.getenv('AUDIO_PROCESS_WORKERS', '2'))
     
     # Discord Configuration
     discord_webhook_url: str = os.getenv('DISCORD_WEBHOOK_URL', '')
+    discord_audio: str = os.getenv('DISCORD_AUDIO', 'full').lower()  # full, preview or none
+    discord_preview_seconds: float = float(os.getenv('DISCORD_PREVIEW_SECONDS', '30'))
+    discord_max_attachment_mb: float = float(os.getenv('DISCORD_MAX_ATTACHMENT_MB', '8'))  # larger audio is linked
+    discord_queue_size: int = int(os.getenv('DISCORD_QUEUE_SIZE', '20'))  # notifications waiting to be sent
+    discord_concurrency: int = int(os.getenv('DISCORD_CONCURRENCY', '2'))
+    discord_retry_attempts: int = int(os.getenv('DISCORD_RETRY_ATTEMPTS', '3'))
     
     # Worker Configuration
     max_workers: int = int(os.getenv('MAX_WORKERS', '3'))
+    # Adjust the number of workers between MIN_WORKERS and MAX_WORKERS from TTS latency and errors
+    adaptive_concurrency: bool = os.getenv('ADAPTIVE_CONCURRENCY', 'true').lower() in ('true', '1', 'yes', 'on')
+    min_workers: int = int(os.getenv('MIN_WORKERS', '1'))
+    adaptive_latency_tolerance: float = float(os.getenv('ADAPTIVE_LATENCY_TOLERANCE', '1.5'))  # x best latency
+    adaptive_backoff: float = float(os.getenv('ADAPTIVE_BACKOFF', '0.7'))  # target multiplier on overload
     worker_timeout: int = int(os.getenv('WORKER_TIMEOUT', '300'))  # 5 minutes
     retry_attempts: int = int(os.getenv('RETRY_ATTEMPTS', '3'))
     retry_delay: int = int(os.getenv('RETRY_DELAY', '5'))  # seconds
+    prefetch_size: int = int(os.getenv('PREFETCH_SIZE', '1'))  # claimed narrations kept ready, 0 to disable
+    
+    # HTTP connection pool shared by all workers
+    http_pool_limit: int = int(os.getenv('HTTP_POOL_LIMIT', '100'))  # total open connections
+    http_pool_limit_per_host: int = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '10'))  # 0 = no per-host limit
+    http_keepalive_timeout: int = int(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '60'))  # seconds an idle connection is kept
+    http_stats_interval: int = int(os.getenv('HTTP_STATS_INTERVAL', '300'))  # seconds between pool stats logs, 0 = off
 
 class WorkerError(Exception):
     """Custom exception for worker errors"""
@@ -90,9 +136,13 @@ class AudioProcessor:
             logger.error(f"Error getting audio duration: {e}")
             return 0.0
     
+    MP3_BITRATE_KBPS = 128
+    MP3_ENCODERS = ('lameenc', 'ffmpeg', 'pydub')
+    
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _check_ffmpeg_availability() -> bool:
-        """Check if ffmpeg is available on the system"""
+        """Check if ffmpeg is available on the system (probed once per process)"""
         try:
             result = subprocess.run(['ffmpeg', '-version'], 
                                   capture_output=True, text=True, timeout=10)
@@ -111,6 +161,54 @@ class AudioProcessor:
         else:
             return "Install ffmpeg for your operating system"
     
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def select_mp3_encoder(preference: str = 'auto') -> Optional[str]:
+        """
+        Pick the MP3 encoder to use, probing the available ones once per process
+        
+        Returns 'lameenc', 'ffmpeg', 'pydub' or None when no encoder is available.
+        """
+        available = {
+            'lameenc': LAMEENC_AVAILABLE,
+            'ffmpeg': AudioProcessor._check_ffmpeg_availability(),
+        }
+        # pydub encodes through ffmpeg
+        available['pydub'] = PYDUB_AVAILABLE and available['ffmpeg']
+        
+        if preference != 'auto':
+            if available.get(preference):
+                logger.info(f"MP3 encoder: {preference}")
+                return preference
+            logger.warning(f"MP3 encoder '{preference}' is not available, choosing one automatically")
+        
+        for name in AudioProcessor.MP3_ENCODERS:
+            if available[name]:
+                logger.info(f"MP3 encoder: {name}")
+                return name
+        logger.warning(f"No MP3 encoder available, audio will be uploaded as WAV. "
+                       f"{AudioProcessor._install_ffmpeg_instructions()} or pip install lameenc")
+        return None
+    
+    @staticmethod
+    def convert_wav_to_mp3_lameenc(wav_path: str, mp3_path: str) -> float:
+        """Encode WAV to MP3 in-process, chunk by chunk; returns the duration from the sample count"""
+        with wave.open(wav_path, 'rb') as wav_file:
+            if wav_file.getsampwidth() != 2:
+                raise WorkerError(f"Unsupported sample width for MP3 encoding: {wav_file.getsampwidth() * 8} bit")
+            encoder = LameMP3Encoder(wav_file.getframerate(), wav_file.getnchannels(), AudioProcessor.MP3_BITRATE_KBPS)
+            chunk_frames = wav_file.getframerate()  # one second at a time
+            with open(mp3_path, 'wb') as mp3_file:
+                while True:
+                    pcm = wav_file.readframes(chunk_frames)
+                    if not pcm:
+                        break
+                    mp3_file.write(encoder.encode(pcm))
+                mp3_file.write(encoder.flush())
+        
+        logger.info(f"Successfully converted {wav_path} to {mp3_path} using lameenc")
+        return encoder.duration
+    
     @staticmethod
     def convert_wav_to_mp3_pydub(wav_path: str, mp3_path: str) -> bool:
         """Convert WAV to MP3 using pydub (requires ffmpeg)"""
@@ -136,7 +234,7 @@ class AudioProcessor:
     def convert_wav_to_mp3_ffmpeg(wav_path: str, mp3_path: str) -> bool:
         """Convert WAV to MP3 using ffmpeg directly"""
         try:
-            # Check if ffmpeg is available
+            # Check if ffmpeg is available (cached after the first call)
             if not AudioProcessor._check_ffmpeg_availability():
                 logger.error(f"ffmpeg is not available. {AudioProcessor._install_ffmpeg_instructions()}")
                 return False
@@ -168,11 +266,13 @@ class AudioProcessor:
             return False
     
     @staticmethod
-    def convert_wav_to_mp3(wav_path: str) -> str:
+    def encode_wav_to_mp3(wav_path: str, encoder: str = 'auto') -> tuple[str, float]:
         """
         Convert WAV file to MP3 format
-        Returns the path to the MP3 file
-        Tries pydub first, falls back to direct ffmpeg
+        Returns the path to the MP3 file and the audio duration
+        
+        The duration comes from the encoder's sample count or the WAV header,
+        so the MP3 never has to be decoded again.
         """
         if not os.path.exists(wav_path):
             raise WorkerError(f"WAV file not found: {wav_path}")
@@ -180,23 +280,36 @@ class AudioProcessor:
         # Generate MP3 file path
         mp3_path = wav_path.replace('.wav', '.mp3')
         
-        # Try pydub first (more reliable)
-        if PYDUB_AVAILABLE:
+        chosen = AudioProcessor.select_mp3_encoder(encoder)
+        if chosen == 'lameenc':
+            try:
+                return mp3_path, AudioProcessor.convert_wav_to_mp3_lameenc(wav_path, mp3_path)
+            except Exception as e:
+                logger.warning(f"lameenc conversion failed, trying ffmpeg: {e}")
+        
+        duration = AudioProcessor.get_audio_duration(wav_path)
+        if chosen == 'pydub':
             if AudioProcessor.convert_wav_to_mp3_pydub(wav_path, mp3_path):
-                return mp3_path
-            else:
-                logger.warning("pydub conversion failed, trying direct ffmpeg")
+                return mp3_path, duration
+            logger.warning("pydub conversion failed, trying direct ffmpeg")
         
-        # Fallback to direct ffmpeg
-        if AudioProcessor.convert_wav_to_mp3_ffmpeg(wav_path, mp3_path):
-            return mp3_path
+        # Direct ffmpeg, also the fallback of the other encoders
+        if chosen is not None and AudioProcessor.convert_wav_to_mp3_ffmpeg(wav_path, mp3_path):
+            return mp3_path, duration
         
-        # If both methods fail, raise an error
-        system = platform.system().lower()
+        # If all methods fail, raise an error
         error_msg = f"Failed to convert WAV to MP3. {AudioProcessor._install_ffmpeg_instructions()}"
         logger.error(error_msg)
         raise WorkerError(error_msg)
     
+    @staticmethod
+    def convert_wav_to_mp3(wav_path: str) -> str:
+        """
+        Convert WAV file to MP3 format
+        Returns the path to the MP3 file
+        """
+        return AudioProcessor.encode_wav_to_mp3(wav_path)[0]
+    
     @staticmethod
     def get_mp3_duration(file_path: str) -> float:
         """Get duration of MP3 file in seconds using pydub or ffmpeg"""
@@ -238,28 +351,404 @@ class AudioProcessor:
             logger.error(f"Error getting MP3 duration: {e}")
             return 0.0
 
+class LameMP3Encoder:
+    """Incremental in-process MP3 encoder (lameenc) that counts samples for the duration"""
+    
+    def __init__(self, sample_rate: int, channels: int, bitrate_kbps: int = 128):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_bytes = 2 * channels  # 16-bit samples
+        self.encoder = lameenc.Encoder()
+        self.encoder.set_bit_rate(bitrate_kbps)
+        self.encoder.set_in_sample_rate(sample_rate)
+        self.encoder.set_channels(channels)
+        # LAME's default quality, the same ffmpeg's libmp3lame uses
+        self.encoder.set_quality(3)
+        self._remainder = b""
+        self.frames = 0
+    
+    def encode(self, pcm: bytes) -> bytes:
+        """Encode 16-bit PCM, return the MP3 data produced so far"""
+        pcm = self._remainder + pcm
+        usable = len(pcm) - len(pcm) % self.frame_bytes
+        # Network chunks can split a sample, keep the partial one for the next call
+        self._remainder = pcm[usable:]
+        if not usable:
+            return b""
+        self.frames += usable // self.frame_bytes
+        return bytes(self.encoder.encode(pcm[:usable]))
+    
+    def flush(self) -> bytes:
+        return bytes(self.encoder.flush())
+    
+    @property
+    def duration(self) -> float:
+        return round(self.frames / self.sample_rate, 2)
+
+class WavStreamParser:
+    """Split a streamed WAV response into its header and PCM data, counting samples"""
+    
+    HEADER_SIZE = 44
+    
+    def __init__(self):
+        self._header = bytearray()
+        self.sample_rate = None
+        self.channels = None
+        self.sample_width = None
+        self.pcm_bytes = 0
+    
+    @classmethod
+    def for_pcm(cls, sample_rate: int, channels: int = 1, sample_width: int = 2) -> "WavStreamParser":
+        """Parser for headerless PCM of a known format, such as the in-process engine's chunks"""
+        parser = cls()
+        parser.sample_rate, parser.channels, parser.sample_width = sample_rate, channels, sample_width
+        return parser
+    
+    @property
+    def ready(self) -> bool:
+        return self.sample_rate is not None
+    
+    def feed(self, data: bytes) -> bytes:
+        """Consume response bytes, return the PCM data they contain"""
+        if not self.ready:
+            needed = self.HEADER_SIZE - len(self._header)
+            self._header += data[:needed]
+            data = data[needed:]
+            if len(self._header) < self.HEADER_SIZE:
+                return b""
+            header = bytes(self._header)
+            if header[:4] != b"RIFF" or header[8:12] != b"WAVE" or header[36:40] != b"data":
+                raise WorkerError("TTS response is not a 16-bit PCM WAV stream")
+            self.channels, self.sample_rate = struct.unpack("<HI", header[22:28])
+            self.sample_width = struct.unpack("<H", header[34:36])[0] // 8
+        self.pcm_bytes += len(data)
+        return data
+    
+    @property
+    def duration(self) -> float:
+        """Seconds of audio received so far"""
+        if not self.ready:
+            return 0.0
+        return round(self.pcm_bytes / (self.sample_rate * self.channels * self.sample_width), 2)
+    
+    def wav_header(self) -> bytes:
+        """WAV header with the final data size"""
+        byte_rate = self.sample_rate * self.channels * self.sample_width
+        return (
+            b"RIFF" + struct.pack("<I", self.pcm_bytes + 36) + b"WAVE" +
+            b"fmt " + struct.pack("<IHHIIHH", 16, 1, self.channels, self.sample_rate, byte_rate,
+                                  self.channels * self.sample_width, self.sample_width * 8) +
+            b"data" + struct.pack("<I", self.pcm_bytes)
+        )
+
+class StreamingMP3Encoder:
+    """Encode PCM to MP3 through an ffmpeg pipe while the audio streams in"""
+    
+    def __init__(self, sample_rate: int, channels: int, on_output, bitrate: str = "128k"):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.on_output = on_output  # async callable receiving encoded bytes
+        self.bitrate = bitrate
+        self.process = None
+        self._reader = None
+    
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-f', 's16le', '-ar', str(self.sample_rate), '-ac', str(self.channels), '-i', 'pipe:0',
+            '-codec:a', 'libmp3lame', '-b:a', self.bitrate, '-f', 'mp3', 'pipe:1',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        self._reader = asyncio.create_task(self._read_output())
+    
+    async def _read_output(self) -> None:
+        while True:
+            chunk = await self.process.stdout.read(65536)
+            if not chunk:
+                return
+            await self.on_output(chunk)
+    
+    async def write(self, pcm: bytes) -> None:
+        if self._reader.done():
+            # The reader only stops early when ffmpeg or the upload failed
+            await self._reader
+            raise WorkerError("ffmpeg stopped before the end of the audio")
+        self.process.stdin.write(pcm)
+        await self.process.stdin.drain()
+    
+    async def finish(self) -> None:
+        """Flush the encoder and wait until all MP3 data has been passed on"""
+        self.process.stdin.close()
+        await self._reader
+        stderr = await self.process.stderr.read()
+        if await self.process.wait() != 0:
+            raise WorkerError(f"ffmpeg encoding failed: {stderr.decode(errors='replace').strip()}")
+    
+    async def abort(self) -> None:
+        if self.process and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+        if self._reader and not self._reader.done():
+            self._reader.cancel()
+
+class LameStreamEncoder:
+    """In-process counterpart of StreamingMP3Encoder, passing MP3 data on as it is encoded"""
+    
+    def __init__(self, sample_rate: int, channels: int, on_output, audio_pool: Optional['AudioProcessPool'] = None):
+        self.encoder = LameMP3Encoder(sample_rate, channels, AudioProcessor.MP3_BITRATE_KBPS)
+        self.on_output = on_output
+        self.audio_pool = audio_pool
+    
+    async def start(self) -> None:
+        pass
+    
+    async def write(self, pcm: bytes) -> None:
+        if self.audio_pool:
+            # The encoder keeps state between chunks, so it runs on a pool thread (lameenc releases the GIL)
+            data = await self.audio_pool.run_in_thread('stream_encode', self.encoder.encode, pcm)
+        else:
+            data = self.encoder.encode(pcm)
+        if data:
+            await self.on_output(data)
+    
+    async def finish(self) -> None:
+        await self.on_output(self.encoder.flush())
+    
+    async def abort(self) -> None:
+        pass
+
+class WavPassthrough:
+    """Stand-in encoder that passes the WAV stream on unchanged when no MP3 encoder is available"""
+    
+    def __init__(self, parser: WavStreamParser, on_output):
+        self.parser = parser
+        self.on_output = on_output
+    
+    async def start(self) -> None:
+        # Placeholder header, the real data size is only known at the end
+        await self.on_output(self.parser.wav_header())
+    
+    async def write(self, pcm: bytes) -> None:
+        await self.on_output(pcm)
+    
+    async def finish(self) -> None:
+        pass
+    
+    async def abort(self) -> None:
+        pass
+
+class S3MultipartUpload:
+    """Upload an object to S3 part by part while it is being produced"""
+    
+    # S3's minimum size for every part but the last
+    MIN_PART_SIZE = 5 * 1024 * 1024
+    
+    def __init__(self, uploader: 'S3Uploader', s3_key: str, content_type: str, hold_first_part: bool = False):
+        self.uploader = uploader
+        self.s3_key = s3_key
+        self.content_type = content_type
+        # The first part can be held back and uploaded last, e.g. to fix up a header
+        self.hold_first_part = hold_first_part
+        self.part_size = max(self.MIN_PART_SIZE, uploader.config.s3_multipart_chunksize_mb * 1024 * 1024)
+        self.upload_id = None
+        self.buffer = bytearray()
+        self.first_part = None
+        self.next_part_number = 1
+        self.etags: Dict[int, str] = {}
+        # Every part upload is kept, so a failed one can't go unnoticed
+        self.parts: List[asyncio.Task] = []
+        self.slots = asyncio.Semaphore(max(1, uploader.config.s3_max_concurrency))
+        self.size = 0
+        self.start_time = None
+    
+    async def _call(self, method, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.uploader.executor, functools.partial(method, **kwargs))
+    
+    async def start(self) -> None:
+        self.start_time = time.time()
+        response = await self._call(
+            self.uploader.s3_client.create_multipart_upload,
+            Bucket=self.uploader.config.s3_bucket, Key=self.s3_key, ContentType=self.content_type
+        )
+        self.upload_id = response['UploadId']
+    
+    async def _upload_part(self, part_number: int, body: bytes) -> None:
+        try:
+            response = await self._call(
+                self.uploader.s3_client.upload_part,
+                Bucket=self.uploader.config.s3_bucket, Key=self.s3_key, UploadId=self.upload_id,
+                PartNumber=part_number, Body=body
+            )
+            self.etags[part_number] = response['ETag']
+        finally:
+            self.slots.release()
+    
+    async def _start_part(self, body: bytes) -> None:
+        part_number = self.next_part_number
+        self.next_part_number += 1
+        if part_number == 1 and self.hold_first_part:
+            self.first_part = bytearray(body)
+            return
+        # Bounded number of parts in flight, so memory use doesn't grow with the audio length
+        await self.slots.acquire()
+        self.parts.append(asyncio.create_task(self._upload_part(part_number, body)))
+        # Surface failures of finished parts early
+        for task in self.parts:
+            if task.done():
+                task.result()
+    
+    async def write(self, data: bytes) -> None:
+        self.buffer += data
+        self.size += len(data)
+        while len(self.buffer) >= self.part_size:
+            body = bytes(self.buffer[:self.part_size])
+            del self.buffer[:self.part_size]
+            await self._start_part(body)
+    
+    async def complete(self, first_bytes: bytes = b"") -> str:
+        """Upload the remaining data and finish the upload, return the object URL
+        
+        first_bytes replaces the beginning of the object when the first part was held back.
+        """
+        try:
+            if self.buffer or self.next_part_number == 1:
+                await self._start_part(bytes(self.buffer))
+                self.buffer.clear()
+            if self.first_part is not None:
+                self.first_part[:len(first_bytes)] = first_bytes
+                await self.slots.acquire()
+                await self._upload_part(1, bytes(self.first_part))
+            # Raises the first part failure
+            await asyncio.gather(*self.parts)
+            
+            # Completing with a part missing would store truncated audio as a success
+            expected = set(range(1, self.next_part_number))
+            if set(self.etags) != expected:
+                raise WorkerError(f"Multipart upload {self.s3_key} is missing parts "
+                                  f"{sorted(expected - set(self.etags))}")
+            await self._call(
+                self.uploader.s3_client.complete_multipart_upload,
+                Bucket=self.uploader.config.s3_bucket, Key=self.s3_key, UploadId=self.upload_id,
+                MultipartUpload={'Parts': [{'PartNumber': n, 'ETag': self.etags[n]} for n in sorted(self.etags)]}
+            )
+        except BaseException:
+            await self.abort()
+            raise
+        self.uploader.record_upload(self.size, time.time() - self.start_time)
+        return self.uploader.object_url(self.s3_key)
+    
+    async def abort(self) -> None:
+        for task in self.parts:
+            task.cancel()
+        if self.upload_id:
+            upload_id, self.upload_id = self.upload_id, None
+            try:
+                await self._call(
+                    self.uploader.s3_client.abort_multipart_upload,
+                    Bucket=self.uploader.config.s3_bucket, Key=self.s3_key, UploadId=upload_id
+                )
+            except ClientError as e:
+                logger.warning(f"Could not abort multipart upload {self.s3_key}: {e}")
+
 class S3Uploader:
-    """Handles S3 upload operations"""
+    """Handles S3 upload operations
+    
+    Use S3Uploader.shared() to get the process-wide uploader: its boto3 client,
+    transfer settings and upload threads are reused by every worker.
+    """
+    
+    _shared: Optional['S3Uploader'] = None
+    _shared_lock = threading.Lock()
     
     def __init__(self, config: WorkerConfig):
         self.config = config
         self.s3_client = None
+        self.transfer_config = TransferConfig(
+            multipart_threshold=config.s3_multipart_threshold_mb * 1024 * 1024,
+            multipart_chunksize=config.s3_multipart_chunksize_mb * 1024 * 1024,
+            max_concurrency=config.s3_max_concurrency,
+            use_threads=True
+        )
+        self.executor = ThreadPoolExecutor(max_workers=config.s3_upload_threads, thread_name_prefix="s3-upload")
+        self.stats = {'uploads': 0, 'bytes': 0, 'seconds': 0.0}
+        self._stats_lock = threading.Lock()
         self._initialize_s3_client()
     
+    @classmethod
+    def shared(cls, config: WorkerConfig) -> 'S3Uploader':
+        """Return the process-wide uploader, creating it on first use"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(config)
+            return cls._shared
+    
     def _initialize_s3_client(self):
         """Initialize S3 client with credentials"""
         try:
+            # Every concurrent part upload needs its own pooled connection
+            boto_config = BotoConfig(
+                max_pool_connections=max(10, self.config.s3_max_concurrency * self.config.s3_upload_threads),
+                retries={'max_attempts': self.config.retry_attempts, 'mode': 'standard'},
+                s3={'addressing_style': 'path'} if self.config.s3_endpoint_url else None
+            )
             self.s3_client = boto3.client(
                 's3',
                 aws_access_key_id=self.config.aws_access_key_id,
                 aws_secret_access_key=self.config.aws_secret_access_key,
-                region_name=self.config.aws_region
+                region_name=self.config.aws_region,
+                endpoint_url=self.config.s3_endpoint_url or None,
+                config=boto_config
             )
-            logger.info("S3 client initialized successfully")
+            logger.info(f"S3 client initialized successfully"
+                        f"{f' for {self.config.s3_endpoint_url}' if self.config.s3_endpoint_url else ''}")
         except Exception as e:
             logger.error(f"Failed to initialize S3 client: {e}")
             raise WorkerError(f"S3 initialization failed: {e}")
     
+    def object_key(self, narration_id: str, file_ext: str) -> str:
+        """S3 key for a narration's audio file"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"narrations/{narration_id}/audio_{timestamp}.{file_ext}"
+    
+    async def start_stream(self, narration_id: str, file_ext: str, hold_first_part: bool = False) -> S3MultipartUpload:
+        """Start a multipart upload for audio that is still being generated"""
+        if not self.s3_client:
+            raise WorkerError("S3 client not initialized")
+        content_type = 'audio/mpeg' if file_ext == 'mp3' else 'audio/wav'
+        upload = S3MultipartUpload(self, self.object_key(narration_id, file_ext), content_type, hold_first_part)
+        try:
+            await upload.start()
+        except ClientError as e:
+            raise WorkerError(f"S3 upload failed: {e}")
+        return upload
+    
+    def object_url(self, s3_key: str) -> str:
+        """Public URL of an uploaded object"""
+        if self.config.s3_endpoint_url:
+            return f"{self.config.s3_endpoint_url.rstrip('/')}/{self.config.s3_bucket}/{s3_key}"
+        return f"https://{self.config.s3_bucket}.s3.{self.config.aws_region}.amazonaws.com/{s3_key}"
+    
+    def record_upload(self, size: int, elapsed: float) -> None:
+        """Add an upload to the throughput statistics and log its speed"""
+        with self._stats_lock:
+            self.stats['uploads'] += 1
+            self.stats['bytes'] += size
+            self.stats['seconds'] += elapsed
+        throughput = size / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+        logger.info(f"Uploaded {size / (1024 * 1024):.2f} MB in {elapsed:.2f}s ({throughput:.2f} MB/s)")
+    
+    def log_stats(self) -> None:
+        """Log upload totals and average throughput"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        if stats['uploads']:
+            throughput = stats['bytes'] / stats['seconds'] / (1024 * 1024) if stats['seconds'] > 0 else 0.0
+            logger.info(f"S3 uploads: {stats['uploads']} files, {stats['bytes'] / (1024 * 1024):.1f} MB, "
+                        f"{throughput:.2f} MB/s average")
+    
     async def upload_audio(self, file_path: str, narration_id: str) -> str:
         """Upload audio file to S3 and return URL"""
         if not self.s3_client:
@@ -280,23 +769,27 @@ class S3Uploader:
                 file_ext = 'mp3'
             
             # Generate unique S3 key
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            s3_key = f"narrations/{narration_id}/audio_{timestamp}.{file_ext}"
-            
-            # Upload file
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                await loop.run_in_executor(
-                    executor,
+            s3_key = self.object_key(narration_id, file_ext)
+            
+            # Upload file on the shared upload threads, in concurrent parts if it is large
+            loop = asyncio.get_running_loop()
+            size = os.path.getsize(file_path)
+            start_time = time.time()
+            await loop.run_in_executor(
+                self.executor,
+                functools.partial(
                     self.s3_client.upload_file,
                     file_path,
                     self.config.s3_bucket,
                     s3_key,
-                    {'ContentType': content_type}
+                    ExtraArgs={'ContentType': content_type},
+                    Config=self.transfer_config
                 )
+            )
+            self.record_upload(size, time.time() - start_time)
             
             # Generate URL
-            audio_url = f"https://{self.config.s3_bucket}.s3.{self.config.aws_region}.amazonaws.com/{s3_key}"
+            audio_url = self.object_url(s3_key)
             logger.info(f"Audio uploaded successfully: {audio_url}")
             return audio_url
             
@@ -307,6 +800,60 @@ class S3Uploader:
             logger.error(f"Unexpected error during S3 upload: {e}")
             raise WorkerError(f"S3 upload error: {e}")
 
+class NotificationAudio:
+    """
+    Audio kept in memory for the Discord notification
+    
+    Captures the encoded audio as it is produced (or from the local file) up to a
+    byte limit, so the notification doesn't have to download it back from S3.
+    With preview_seconds set only the beginning of the audio is kept.
+    """
+    
+    # Orpheus output when the WAV is attached unencoded: 24 kHz, 16-bit mono
+    WAV_BYTES_PER_SECOND = 24000 * 2
+    
+    def __init__(self, max_bytes: int, preview_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.preview_seconds = preview_seconds
+        self.limit = max_bytes
+        self.file_ext = 'mp3'
+        self.buffer = bytearray()
+        self.truncated = False
+    
+    def set_format(self, file_ext: str) -> None:
+        self.file_ext = file_ext
+        if self.preview_seconds:
+            if file_ext == 'mp3':
+                preview_bytes = int(self.preview_seconds * AudioProcessor.MP3_BITRATE_KBPS * 125)
+            else:
+                preview_bytes = WavStreamParser.HEADER_SIZE + int(self.preview_seconds * self.WAV_BYTES_PER_SECOND)
+            self.limit = min(self.max_bytes, preview_bytes)
+    
+    def write(self, data: bytes) -> None:
+        room = self.limit - len(self.buffer)
+        if len(data) > room:
+            self.truncated = True
+        if room > 0:
+            self.buffer += data[:room]
+    
+    def read_file(self, file_path: str) -> None:
+        """Capture the beginning of a local audio file"""
+        self.set_format('mp3' if file_path.endswith('.mp3') else 'wav')
+        with open(file_path, 'rb') as f:
+            self.write(f.read(self.limit + 1))
+    
+    @property
+    def content_type(self) -> str:
+        return 'audio/mpeg' if self.file_ext == 'mp3' else 'audio/wav'
+    
+    def payload(self) -> bytes:
+        """The captured audio, with a WAV header matching the captured length"""
+        data = bytes(self.buffer)
+        if self.file_ext == 'wav' and len(data) >= WavStreamParser.HEADER_SIZE:
+            data_size = len(data) - WavStreamParser.HEADER_SIZE
+            data = data[:4] + struct.pack("<I", data_size + 36) + data[8:40] + struct.pack("<I", data_size) + data[44:]
+        return data
+
 class DiscordNotifier:
     """Handles Discord webhook notifications"""
     
@@ -314,203 +861,257 @@ class DiscordNotifier:
         self.config = config
         self.webhook_url = config.discord_webhook_url
     
-    async def send_narration_summary(self, session: aiohttp.ClientSession, narration_data: Dict[str, Any], 
-                                   audio_url: str, audio_duration: float, worker_id: int, generation_time: float = 0.0) -> None:
-        """Send a summary of the processed narration to Discord"""
+    def notification_audio(self) -> Optional[NotificationAudio]:
+        """Audio capture for a job's notification, None when no audio will be attached"""
+        if not self.webhook_url or self.config.discord_audio == 'none':
+            return None
+        max_bytes = int(self.config.discord_max_attachment_mb * 1024 * 1024)
+        preview_seconds = self.config.discord_preview_seconds if self.config.discord_audio == 'preview' else None
+        return NotificationAudio(max_bytes, preview_seconds)
+    
+    def _build_message(self, narration_data: Dict[str, Any], audio_duration: float,
+                       generation_time: float) -> tuple[Dict[str, Any], Optional[bytes]]:
+        """Build the embed, and the full narration text as a file when it's too long for the embed"""
+        # Extract relevant information from narration data
+        narration_id = narration_data.get('id', 'Unknown')
+        full_text = narration_data.get('text', '')
+        
+        # If no text, try to get from research data
+        if not full_text:
+            company_research = narration_data.get('company_deep_research', '')
+            profile_research = narration_data.get('profile_deep_research', '')
+            full_text = f"{company_research}\n\n{profile_research}".strip()
+        
+        target_gender = narration_data.get('target_gender', 'Unknown')
+        
+        # Get the chosen voice (we need to determine this from the worker's voice selection)
+        chosen_voice = VoiceSelector.get_voice(self.config, target_gender)
+        
+        # Format duration
+        duration_minutes = int(audio_duration // 60)
+        duration_seconds = int(audio_duration % 60)
+        duration_str = f"{duration_minutes}m {duration_seconds}s" if duration_minutes > 0 else f"{duration_seconds}s"
+        
+        # Format generation time
+        generation_time_str = f"{generation_time}s" if generation_time > 0 else "N/A"
+        
+        # Generate random color for the embed
+        random_color = random.randint(0x000000, 0xFFFFFF)
+        
+        # Create Discord embed without person's name as title
+        embed = {
+            "title": "Narration Generated",
+            "color": random_color,
+            "fields": [
+                {
+                    "name": "Details",
+                    "value": f"**Narration ID:** `{narration_id}`\n**Gender:** {target_gender}\n**Chosen Voice:** {chosen_voice}\n**Audio Duration:** {duration_str}\n**Time to Generate:** {generation_time_str}",
+                    "inline": False
+                }
+            ],
+            "timestamp": datetime.now().isoformat(),
+            "footer": {
+                "text": "Orpheus Narration Engine"
+            }
+        }
+        
+        # Always show the full narration text - use file attachment if too long for embed
+        text_file = None
+        if full_text:
+            # Check if full text fits in a Discord field (max 1024 characters with formatting)
+            formatted_text = f"```{full_text}```"
+            if len(formatted_text) <= 1024:
+                # Full text fits in embed field
+                embed["fields"].append({
+                    "name": "Narration Text",
+                    "value": formatted_text,
+                    "inline": False
+                })
+            else:
+                # Text is too long for embed, use file attachment
+                embed["fields"].append({
+                    "name": "Narration Text",
+                    "value": "📄 Complete text attached as file (too long for embed)",
+                    "inline": False
+                })
+                text_file = (
+                    f"Narration ID: {narration_id}\n"
+                    f"Gender: {target_gender}\n"
+                    f"Voice: {chosen_voice}\n"
+                    f"Duration: {duration_str}\n"
+                    f"Generation Time: {generation_time_str}\n"
+                    f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    + "=" * 50 + "\n\n"
+                    + full_text
+                ).encode('utf-8')
+        
+        return embed, text_file
+    
+    async def _post(self, session: aiohttp.ClientSession, payload: Dict[str, Any],
+                    files: list) -> Optional[float]:
+        """
+        Post one webhook message
+        
+        Returns None when sent, or the number of seconds to wait before retrying.
+        Raises WorkerError when Discord rejects the message in a way retrying won't fix.
+        """
+        if files:
+            # Form data can only be sent once, so it's built for every attempt
+            data = aiohttp.FormData()
+            data.add_field('payload_json', json.dumps(payload))
+            for index, (filename, content, content_type) in enumerate(files):
+                data.add_field(f'files[{index}]', content, filename=filename, content_type=content_type)
+            request = session.post(self.webhook_url, data=data)
+        else:
+            request = session.post(self.webhook_url, json=payload)
+        
+        async with request as response:
+            if 200 <= response.status < 300:
+                return None
+            error_text = await response.text()
+            if response.status == 429:
+                # Rate limited, Discord says how long to wait
+                try:
+                    return float(json.loads(error_text).get('retry_after', 1.0))
+                except (ValueError, AttributeError):
+                    return float(response.headers.get('Retry-After', 1.0))
+            if response.status >= 500:
+                return 0.0
+            raise WorkerError(f"Discord rejected the notification: {response.status} - {error_text}")
+    
+    async def send_narration_summary(self, session: aiohttp.ClientSession, narration_data: Dict[str, Any],
+                                     audio_url: str, audio_duration: float, worker_id: int, generation_time: float = 0.0,
+                                     audio: Optional[NotificationAudio] = None) -> bool:
+        """
+        Send a summary of the processed narration to Discord
+        
+        Attaches the captured audio when there is some (the full file, or a preview),
+        otherwise links to it. Retries rate-limited and failed requests. Returns
+        whether the message was delivered.
+        """
         if not self.webhook_url:
             logger.info("Discord webhook URL not configured, skipping notification")
-            return
+            return False
         
-        temp_audio_file = None
-        temp_text_file = None
+        narration_id = narration_data.get('id', 'Unknown')
         try:
-            # Extract relevant information from narration data
-            narration_id = narration_data.get('id', 'Unknown')
-            full_text = narration_data.get('text', '')
-            
-            # If no text, try to get from research data
-            if not full_text:
-                company_research = narration_data.get('company_deep_research', '')
-                profile_research = narration_data.get('profile_deep_research', '')
-                full_text = f"{company_research}\n\n{profile_research}".strip()
-            
-            # Extract person's name and other details
-            person_name = narration_data.get('name', narration_data.get('person_name', 'Unknown Person'))
-            target_gender = narration_data.get('target_gender', 'Unknown')
-            
-            # Get the chosen voice (we need to determine this from the worker's voice selection)
-            chosen_voice = VoiceSelector.get_voice(self.config, target_gender)
-            
-            # Format duration
-            duration_minutes = int(audio_duration // 60)
-            duration_seconds = int(audio_duration % 60)
-            duration_str = f"{duration_minutes}m {duration_seconds}s" if duration_minutes > 0 else f"{duration_seconds}s"
-            
-            # Format generation time
-            generation_time_str = f"{generation_time}s" if generation_time > 0 else "N/A"
-            
-            # Generate random color for the embed
-            random_color = random.randint(0x000000, 0xFFFFFF)
-            
-            # Create Discord embed without person's name as title
-            embed = {
-                "title": "Narration Generated",
-                "color": random_color,
-                "fields": [
-                    {
-                        "name": "Details",
-                        "value": f"**Narration ID:** `{narration_id}`\n**Gender:** {target_gender}\n**Chosen Voice:** {chosen_voice}\n**Audio Duration:** {duration_str}\n**Time to Generate:** {generation_time_str}",
-                        "inline": False
-                    }
-                ],
-                "timestamp": datetime.now().isoformat(),
-                "footer": {
-                    "text": "Orpheus Narration Engine"
-                }
-            }
+            embed, text_file = self._build_message(narration_data, audio_duration, generation_time)
+            payload = {"username": "Narration Engine", "embeds": [embed]}
+            files = []
             
-            # Always show the full narration text - use file attachment if too long for embed
-            if full_text:
-                # Check if full text fits in a Discord field (max 1024 characters with formatting)
-                formatted_text = f"```{full_text}```"
-                if len(formatted_text) <= 1024:
-                    # Full text fits in embed field
-                    embed["fields"].append({
-                        "name": "Narration Text",
-                        "value": formatted_text,
-                        "inline": False
-                    })
-                else:
-                    # Text is too long for embed, use file attachment
+            preview = audio is not None and audio.preview_seconds and audio.truncated
+            if audio is not None and audio.buffer and (preview or not audio.truncated):
+                payload["content"] = '🎵 **New Narration Generated!**'
+                if preview:
                     embed["fields"].append({
-                        "name": "Narration Text",
-                        "value": "📄 Complete text attached as file (too long for embed)",
+                        "name": "Audio Preview",
+                        "value": f"First {audio.preview_seconds:g}s attached, full audio: {audio_url}",
                         "inline": False
                     })
-                    
-                    # Create temporary text file with full content
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    temp_text_file = f"temp_discord_text_{narration_id}_{timestamp}.txt"
-                    
-                    # Ensure outputs directory exists
-                    os.makedirs("outputs", exist_ok=True)
-                    temp_text_path = os.path.join("outputs", temp_text_file)
-                    
-                    # Save text file with full narration text
-                    with open(temp_text_path, 'w', encoding='utf-8') as f:
-                        f.write(f"Narration ID: {narration_id}\n")
-                        f.write(f"Gender: {target_gender}\n")
-                        f.write(f"Voice: {chosen_voice}\n")
-                        f.write(f"Duration: {duration_str}\n")
-                        f.write(f"Generation Time: {generation_time_str}\n")
-                        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                        f.write("=" * 50 + "\n\n")
-                        f.write(full_text)
-                    
-                    logger.info(f"Created text file for Discord attachment: {temp_text_path}")
-            
-            # Download audio file for attachment
-            logger.info(f"Downloading audio file from {audio_url} for Discord attachment")
-            async with session.get(audio_url) as audio_response:
-                if audio_response.status == 200:
-                    # Create temporary file for the audio
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    file_extension = '.mp3' if audio_url.endswith('.mp3') else '.wav'
-                    temp_audio_file = f"temp_discord_audio_{narration_id}_{timestamp}{file_extension}"
-                    
-                    # Ensure outputs directory exists
-                    os.makedirs("outputs", exist_ok=True)
-                    temp_audio_path = os.path.join("outputs", temp_audio_file)
-                    
-                    # Save audio file temporarily
-                    with open(temp_audio_path, 'wb') as f:
-                        async for chunk in audio_response.content.iter_chunked(8192):
-                            f.write(chunk)
-                    
-                    logger.info(f"Audio file downloaded for Discord attachment: {temp_audio_path}")
-                    
-                    # Prepare multipart form data for Discord webhook with file attachment(s)
-                    data = aiohttp.FormData()
-                    data.add_field('username', 'Narration Engine')
-                    data.add_field('content', f'🎵 **New Narration Generated!**')
-                    
-                    # Add the embed as JSON
-                    payload = {"embeds": [embed]}
-                    data.add_field('payload_json', json.dumps(payload))
-                    
-                    # Add the audio file
-                    audio_filename = f"narration_{narration_id}_audio{file_extension}"
-                    with open(temp_audio_path, 'rb') as audio_file:
-                        data.add_field('files[0]', audio_file.read(), 
-                                     filename=audio_filename, 
-                                     content_type='audio/mpeg' if file_extension == '.mp3' else 'audio/wav')
-                    
-                    # Add text file if it exists
-                    if temp_text_file:
-                        text_filename = f"narration_{narration_id}_text.txt"
-                        with open(temp_text_path, 'rb') as text_file:
-                            data.add_field('files[1]', text_file.read(),
-                                         filename=text_filename,
-                                         content_type='text/plain')
-                    
-                    # Send to Discord with file attachment(s)
-                    async with session.post(self.webhook_url, data=data) as response:
-                        if response.status == 200:
-                            logger.info(f"Discord notification with attachments sent successfully for narration {narration_id}")
-                        else:
-                            error_text = await response.text()
-                            logger.warning(f"Discord notification failed: {response.status} - {error_text}")
-                
-                else:
-                    logger.warning(f"Failed to download audio file for Discord attachment: {audio_response.status}")
-                    # Fallback to URL-only message
-                    content = f"🎵 **Audio File**: {audio_url}"
-                    payload = {
-                        "username": "Narration Engine",
-                        "content": content,
-                        "embeds": [embed]
-                    }
-                    
-                    async with session.post(self.webhook_url, json=payload) as response:
-                        if response.status == 204:
-                            logger.info(f"Discord notification sent successfully for narration {narration_id} (fallback)")
-                        else:
-                            error_text = await response.text()
-                            logger.warning(f"Discord notification failed: {response.status} - {error_text}")
-                    
-        except Exception as e:
-            logger.error(f"Error sending Discord notification: {e}")
-        finally:
-            # Clean up temporary Discord files - ensure all temp files are deleted after notification
-            temp_files_cleaned = 0
+                suffix = "preview" if preview else "audio"
+                files.append((f"narration_{narration_id}_{suffix}.{audio.file_ext}", audio.payload(), audio.content_type))
+            else:
+                # No audio captured or too large to attach, link to it instead
+                payload["content"] = f"🎵 **Audio File**: {audio_url}"
             
-            if temp_audio_file:
-                temp_audio_path = os.path.join("outputs", temp_audio_file)
-                try:
-                    if os.path.exists(temp_audio_path):
-                        os.remove(temp_audio_path)
-                        temp_files_cleaned += 1
-                        logger.info(f"Successfully deleted temporary Discord audio file: {temp_audio_path}")
-                    else:
-                        logger.debug(f"Temporary Discord audio file already deleted: {temp_audio_path}")
-                except Exception as e:
-                    logger.error(f"Failed to delete temporary Discord audio file {temp_audio_path}: {e}")
+            if text_file:
+                files.append((f"narration_{narration_id}_text.txt", text_file, 'text/plain'))
             
-            if temp_text_file:
-                temp_text_path = os.path.join("outputs", temp_text_file)
+            for attempt in range(1, self.config.discord_retry_attempts + 1):
                 try:
-                    if os.path.exists(temp_text_path):
-                        os.remove(temp_text_path)
-                        temp_files_cleaned += 1
-                        logger.info(f"Successfully deleted temporary Discord text file: {temp_text_path}")
-                    else:
-                        logger.debug(f"Temporary Discord text file already deleted: {temp_text_path}")
-                except Exception as e:
-                    logger.error(f"Failed to delete temporary Discord text file {temp_text_path}: {e}")
+                    retry_after = await self._post(session, payload, files)
+                except WorkerError as e:
+                    logger.warning(f"Discord notification for narration {narration_id} failed: {e}")
+                    return False
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.warning(f"Discord notification for narration {narration_id} failed: {e}")
+                    retry_after = 0.0
+                
+                if retry_after is None:
+                    logger.info(f"Discord notification sent for narration {narration_id} (worker {worker_id})")
+                    return True
+                if attempt < self.config.discord_retry_attempts:
+                    # Rate limits say how long to wait, other failures back off exponentially
+                    delay = retry_after if retry_after > 0 else 2 ** attempt
+                    logger.info(f"Retrying Discord notification for narration {narration_id} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
             
-            # Log completion of Discord temp file cleanup
-            if temp_files_cleaned > 0:
-                logger.info(f"Discord notification cleanup completed - deleted {temp_files_cleaned} temporary files")
+            logger.warning(f"Discord notification for narration {narration_id} failed after "
+                           f"{self.config.discord_retry_attempts} attempts")
+            return False
+                    
+        except Exception as e:
+            logger.error(f"Error sending Discord notification: {e}")
+            return False
+
+class DiscordNotificationQueue:
+    """
+    Sends Discord notifications in the background
+    
+    Jobs hand their notification over and finish immediately; a few sender tasks
+    deliver them, so a slow or rate-limited webhook never holds a worker slot.
+    The queue is bounded and drops new notifications when full.
+    """
+    
+    def __init__(self, config: WorkerConfig, notifier: Optional[DiscordNotifier] = None):
+        self.config = config
+        self.notifier = notifier or DiscordNotifier(config)
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks = []
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'dropped': 0}
+    
+    def start(self, session: aiohttp.ClientSession) -> None:
+        """Start the sender tasks (must be called from the running event loop)"""
+        if self.queue is None and self.notifier.webhook_url:
+            self.queue = asyncio.Queue(maxsize=max(1, self.config.discord_queue_size))
+            self.tasks = [
+                asyncio.create_task(self._run(session))
+                for _ in range(max(1, self.config.discord_concurrency))
+            ]
+    
+    def enqueue(self, **notification) -> bool:
+        """Queue a notification (send_narration_summary arguments without the session)"""
+        if self.queue is None:
+            return False
+        try:
+            self.queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            logger.warning(f"Discord notification queue full, dropping notification for narration "
+                           f"{notification['narration_data'].get('id', 'Unknown')}")
+            return False
+        self.stats['queued'] += 1
+        return True
+    
+    async def _run(self, session: aiohttp.ClientSession) -> None:
+        while True:
+            notification = await self.queue.get()
+            try:
+                if await self.notifier.send_narration_summary(session, **notification):
+                    self.stats['sent'] += 1
+                else:
+                    self.stats['failed'] += 1
+            finally:
+                self.queue.task_done()
+    
+    async def close(self, timeout: float = 30.0) -> None:
+        """Give queued notifications up to timeout seconds to go out, then stop the senders"""
+        if self.queue is not None:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Discarding {self.queue.qsize()} unsent Discord notifications")
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.queue = None
+    
+    def log_stats(self) -> None:
+        if self.stats['queued'] or self.stats['dropped']:
+            pending = self.queue.qsize() if self.queue is not None else 0
+            logger.info(f"Discord notifications: {self.stats['sent']} sent, {self.stats['failed']} failed, "
+                        f"{self.stats['dropped']} dropped, {pending} pending")
 
 class VoiceSelector:
     """Handles voice selection logic"""
@@ -587,23 +1188,178 @@ class VoiceSelector:
             logger.info(f"Using default voice: {config.voice}")
             return config.voice
 
-class APIClient:
-    """Handles all API communications"""
+def _timed_call(func, *args):
+    """Run func in a pool worker, return its result and how long it ran"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+class AudioProcessPool:
+    """
+    Bounded pools for CPU-bound audio stages shared by all workers
+    
+    File conversions and duration reads run in worker processes so they never
+    block the event loop that drives every worker's HTTP traffic. Stateful
+    stream encoders can't move between processes and run on threads instead.
+    Tracks per-stage run time, time spent waiting for a free slot and the
+    number of stages queued.
+    """
     
     def __init__(self, config: WorkerConfig):
         self.config = config
+        self.max_workers = max(1, config.audio_process_workers)
+        self.processes: Optional[ProcessPoolExecutor] = None
+        self.threads: Optional[ThreadPoolExecutor] = None
+        self.in_flight = {'process': 0, 'thread': 0}
+        self.max_queue_depth = 0
+        self.stats: Dict[str, Dict[str, float]] = {}
+    
+    def start(self) -> None:
+        if self.processes is None:
+            # spawn, since forking a process that already runs threads (S3 uploads) is unsafe
+            self.processes = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            self.threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="audio")
+            # Start the processes and probe the encoders in them now rather than in the first jobs
+            for _ in range(self.max_workers):
+                self.processes.submit(AudioProcessor.select_mp3_encoder, self.config.mp3_encoder)
+            logger.info(f"Audio process pool started ({self.max_workers} processes)")
+    
+    def close(self) -> None:
+        if self.processes is not None:
+            self.processes.shutdown(wait=True)
+            self.threads.shutdown(wait=True)
+        self.processes = None
+        self.threads = None
+    
+    @property
+    def queue_depth(self) -> int:
+        """Stages waiting for a free process or thread"""
+        return sum(max(0, count - self.max_workers) for count in self.in_flight.values())
+    
+    async def _submit(self, kind: str, executor, stage: str, func, *args):
+        if executor is None:
+            raise WorkerError("Audio process pool not started")
+        loop = asyncio.get_running_loop()
+        self.in_flight[kind] += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        submitted = time.perf_counter()
+        try:
+            result, elapsed = await loop.run_in_executor(executor, functools.partial(_timed_call, func, *args))
+        finally:
+            self.in_flight[kind] -= 1
+        self.record(stage, elapsed, time.perf_counter() - submitted - elapsed)
+        return result
+    
+    async def run(self, stage: str, func, *args):
+        """Run a module-level function (or static method) in a pool process"""
+        return await self._submit('process', self.processes, stage, func, *args)
+    
+    async def run_in_thread(self, stage: str, func, *args):
+        """Run func on a pool thread, for stateful work that releases the GIL"""
+        return await self._submit('thread', self.threads, stage, func, *args)
+    
+    def record(self, stage: str, elapsed: float, waited: float) -> None:
+        stats = self.stats.setdefault(stage, {'runs': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'wait_seconds': 0.0})
+        stats['runs'] += 1
+        stats['seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        stats['wait_seconds'] += max(0.0, waited)
+    
+    def log_stats(self) -> None:
+        """Log per-stage timing and the queue depth, the maximum is reset for the next interval"""
+        logger.info(f"Audio pool: {self.queue_depth} stages queued (max {self.max_queue_depth} since last report)")
+        for stage, stats in sorted(self.stats.items()):
+            logger.info(f"Audio pool {stage}: {stats['runs']} runs, "
+                        f"{stats['seconds'] / stats['runs']:.3f}s average, {stats['max_seconds']:.3f}s max, "
+                        f"{stats['wait_seconds'] / stats['runs']:.3f}s average queue wait")
+        self.max_queue_depth = self.queue_depth
+
+class HTTPSessionPool:
+    """
+    Long-lived aiohttp session shared by all workers
+    
+    Keeps connections to the narration API, the TTS server, S3 and Discord alive
+    between jobs so each job doesn't pay for new TCP/TLS handshakes, and counts
+    per host how many requests got a new connection and how many reused one.
+    """
+    
+    def __init__(self, config: WorkerConfig):
+        self.config = config
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats: Dict[str, Dict[str, int]] = {}
+    
+    def _host_stats(self, host: str) -> Dict[str, int]:
+        return self.stats.setdefault(host, {'requests': 0, 'new_connections': 0, 'reused_connections': 0})
+    
+    async def _on_request_start(self, session, context, params):
+        context.host = params.url.host
+        self._host_stats(context.host)['requests'] += 1
+    
+    async def _on_connection_create_end(self, session, context, params):
+        self._host_stats(getattr(context, 'host', 'unknown'))['new_connections'] += 1
+    
+    async def _on_connection_reuseconn(self, session, context, params):
+        self._host_stats(getattr(context, 'host', 'unknown'))['reused_connections'] += 1
+    
+    async def start(self) -> aiohttp.ClientSession:
+        """Create the shared session (must be called from the running event loop)"""
+        if self.session is None or self.session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(self._on_request_start)
+            trace_config.on_connection_create_end.append(self._on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+            
+            connector = aiohttp.TCPConnector(
+                limit=self.config.http_pool_limit,
+                limit_per_host=self.config.http_pool_limit_per_host,
+                keepalive_timeout=self.config.http_keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.worker_timeout),
+                trace_configs=[trace_config]
+            )
+            logger.info(f"HTTP connection pool started (limit: {self.config.http_pool_limit}, "
+                        f"per host: {self.config.http_pool_limit_per_host}, "
+                        f"keep-alive: {self.config.http_keepalive_timeout}s)")
+        return self.session
+    
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections"""
+        if self.session and not self.session.closed:
+            await self.session.close()
         self.session = None
     
+    def log_stats(self) -> None:
+        """Log connection reuse per host"""
+        for host, stats in sorted(self.stats.items()):
+            connections = stats['new_connections'] + stats['reused_connections']
+            reuse_rate = stats['reused_connections'] / connections * 100 if connections else 0.0
+            logger.info(f"HTTP pool {host}: {stats['requests']} requests, {stats['new_connections']} new connections, "
+                        f"{stats['reused_connections']} reused ({reuse_rate:.0f}% reuse)")
+
+class APIClient:
+    """Handles all API communications"""
+    
+    def __init__(self, config: WorkerConfig, session: Optional[aiohttp.ClientSession] = None):
+        self.config = config
+        # A session passed in is shared and stays open after this client is done
+        self.session = session
+        self._owns_session = session is None
+    
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config.worker_timeout)
-        )
+        if self._owns_session:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.config.worker_timeout)
+            )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
+        if self._owns_session and self.session:
             await self.session.close()
     
     
@@ -664,10 +1420,8 @@ class APIClient:
                     logger.error(f"TTS generation failed with status {response.status}, could not read response: {e}")
                     raise WorkerError(f"TTS generation failed with status {response.status}")
             
-            # Generate unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            worker_id = threading.current_thread().ident
-            filename = f"worker_{worker_id}_{timestamp}.wav"
+            # Generate unique filename (all workers share the event loop thread, so its ident isn't unique)
+            filename = f"worker_{uuid.uuid4().hex}.wav"
             file_path = os.path.join("outputs", filename)
             
             # Ensure outputs directory exists
@@ -681,6 +1435,32 @@ class APIClient:
             logger.info(f"TTS audio generated: {file_path}")
             return file_path
     
+    async def stream_tts(self, text: str, voice: str):
+        """Request streamed TTS audio and yield the WAV response bytes as they arrive"""
+        url = f"{self.config.tts_server_url}/v1/audio/speech"
+        payload = {
+            "input": text,
+            "model": "orpheus",
+            "voice": voice,
+            "response_format": "wav",
+            "speed": 1.0,
+            "stream": True
+        }
+        
+        async with self.session.post(url, json=payload) as response:
+            if response.status != 200:
+                error_content = await response.text()
+                logger.error(f"TTS API Error - Status: {response.status}, Response: {error_content}")
+                raise WorkerError(f"TTS generation failed with status {response.status}: {error_content}")
+            
+            # The server aborts the chunked response when generation fails, so a stream
+            # that ends without its final chunk is a failed generation, not a short one
+            try:
+                async for chunk in response.content.iter_chunked(65536):
+                    yield chunk
+            except aiohttp.ClientPayloadError as e:
+                raise WorkerError(f"TTS stream ended before the audio was complete: {e}") from e
+    
     async def update_narration_audio(self, narration_id: str, audio_url: str, duration: float) -> Dict[str, Any]:
         """Update narration with audio information"""
         if not self.config.server_to_server_api_key:
@@ -709,15 +1489,506 @@ class APIClient:
             logger.info(f"Narration updated successfully: {narration_id}")
             return data
 
+class LocalTTSEngine:
+    """
+    Orpheus TTS engine running inside the worker process (TTS_MODE=local)
+    
+    For single-host deployments: instead of a request to TTS_SERVER_URL, whose
+    server streams a WAV back, generation runs on threads in this process and
+    its PCM chunks go straight to the encoder. The engine still gets its tokens
+    from the LLM server at ORPHEUS_API_URL. SNAC is loaded and warmed once, when
+    the manager starts.
+    """
+    
+    def __init__(self, config: WorkerConfig):
+        self.config = config
+        self.engine = None  # tts_engine.inference once loaded
+        self.threads: Optional[ThreadPoolExecutor] = None
+    
+    @staticmethod
+    def _load():
+        """Import the engine and decode every window shape once, return its inference module"""
+        try:
+            import tts_engine
+        except ImportError:
+            # The worker runs from Worker/, next to the engine package
+            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            import tts_engine
+        from tts_engine import inference
+        from tts_engine.warmup import warm_decoder
+        warm_decoder()
+        return inference
+    
+    async def start(self) -> None:
+        if self.engine is None:
+            started = time.perf_counter()
+            try:
+                self.engine = await asyncio.get_running_loop().run_in_executor(None, self._load)
+            except ImportError as e:
+                raise WorkerError(f"TTS_MODE=local needs the tts_engine package and its requirements: {e}") from e
+            # One generation per worker at most
+            self.threads = ThreadPoolExecutor(max_workers=max(1, self.config.max_workers), thread_name_prefix="tts")
+            logger.info(f"Local TTS engine loaded in {time.perf_counter() - started:.1f}s")
+    
+    def close(self) -> None:
+        if self.threads is not None:
+            self.threads.shutdown(wait=True)
+        self.threads = None
+    
+    @property
+    def sample_rate(self) -> int:
+        return self.engine.SAMPLE_RATE
+    
+    async def stream_pcm(self, text: str, voice: str):
+        """Generate speech on a TTS thread and yield its 16-bit mono PCM chunks as they are decoded"""
+        if self.engine is None:
+            raise WorkerError("Local TTS engine not started")
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        cancel_event = threading.Event()
+        
+        def generate():
+            # Same batching rule as the server's /v1/audio/speech
+            return self.engine.generate_speech_from_api(
+                prompt=text, voice=voice, use_batching=len(text) > 1000,
+                on_audio_chunk=lambda chunk: loop.call_soon_threadsafe(chunks.put_nowait, chunk),
+                cancel_event=cancel_event
+            )
+        
+        generation = loop.run_in_executor(self.threads, generate)
+        # Queued after the last chunk, both are handed to the loop in order
+        generation.add_done_callback(lambda _: chunks.put_nowait(None))
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                yield chunk
+            try:
+                await generation
+            except Exception as e:
+                raise WorkerError(f"Local TTS generation failed: {e}") from e
+        finally:
+            # Stops the engine when the job fails or is cancelled mid-stream
+            cancel_event.set()
+
+class NarrationPrefetcher:
+    """
+    Keeps a small buffer of claimed narrations so workers don't wait for the API
+    
+    Claims narrations through the regular get-narration endpoint in the
+    background whenever the buffer has room, so a worker can start TTS right
+    after the previous job. Narrations still buffered at shutdown stay claimed,
+    which is why the buffer is kept small.
+    """
+    
+    def __init__(self, config: WorkerConfig, idle_tracker: Optional['TTSIdleTracker'] = None):
+        self.config = config
+        self.size = max(0, config.prefetch_size)
+        self.idle_tracker = idle_tracker
+        self.buffer: List[Dict[str, Any]] = []
+        self.condition: Optional[asyncio.Condition] = None
+        # Set while the API has no narrations, so workers don't wait for the buffer
+        self.exhausted = False
+        # Set once the prefetch task has ended, so workers don't wait for it forever
+        self.stopped = False
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {'fetched': 0, 'handed_out': 0, 'empty_polls': 0, 'errors': 0}
+    
+    def start(self, session: aiohttp.ClientSession) -> None:
+        """Start prefetching (must be called from the running event loop)"""
+        if self.task is None and self.size > 0:
+            self.condition = asyncio.Condition()
+            self.task = asyncio.create_task(self._run(session))
+            logger.info(f"Narration prefetch started (buffer: {self.size})")
+    
+    async def _run(self, session: aiohttp.ClientSession) -> None:
+        try:
+            async with APIClient(self.config, session) as api_client:
+                while True:
+                    async with self.condition:
+                        await self.condition.wait_for(lambda: len(self.buffer) < self.size and not self.exhausted)
+                    try:
+                        narration_data = await api_client.get_narration()
+                    except WorkerError as e:
+                        if "No narration available for audio generation" in str(e):
+                            self.stats['empty_polls'] += 1
+                            if self.idle_tracker:
+                                self.idle_tracker.no_work()
+                            # Poll again when a worker asks, the manager already backs off
+                            async with self.condition:
+                                self.exhausted = True
+                                self.condition.notify_all()
+                            continue
+                        self.stats['errors'] += 1
+                        logger.warning(f"Narration prefetch failed: {e}")
+                        await asyncio.sleep(self.config.retry_delay)
+                        continue
+                    except Exception as e:
+                        self.stats['errors'] += 1
+                        logger.warning(f"Narration prefetch failed: {type(e).__name__}: {e}")
+                        await asyncio.sleep(self.config.retry_delay)
+                        continue
+                    
+                    self.stats['fetched'] += 1
+                    async with self.condition:
+                        self.buffer.append(narration_data)
+                        self.condition.notify_all()
+        finally:
+            self.stopped = True
+            async with self.condition:
+                self.condition.notify_all()
+    
+    async def get(self) -> Dict[str, Any]:
+        """Next claimed narration, waiting for one being fetched; raises WorkerError when there are none"""
+        async with self.condition:
+            if not self.buffer and self.exhausted:
+                # Ask the API again now instead of answering from an earlier empty poll
+                self.exhausted = False
+                self.condition.notify_all()
+            await self.condition.wait_for(lambda: self.buffer or self.exhausted or self.stopped)
+            if not self.buffer:
+                if self.stopped:
+                    raise WorkerError("Narration prefetch has stopped")
+                raise WorkerError("No narration available for audio generation")
+            narration_data = self.buffer.pop(0)
+            self.condition.notify_all()
+        self.stats['handed_out'] += 1
+        return narration_data
+    
+    async def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.buffer:
+            ids = ", ".join(str(narration.get('id')) for narration in self.buffer)
+            logger.warning(f"Shutting down with {len(self.buffer)} claimed but unprocessed narrations: {ids}")
+    
+    def log_stats(self) -> None:
+        if self.size > 0:
+            logger.info(f"Narration prefetch: {self.stats['fetched']} fetched, {self.stats['handed_out']} handed out, "
+                        f"{len(self.buffer)} buffered, {self.stats['empty_polls']} empty polls, "
+                        f"{self.stats['errors']} errors")
+
+class TTSIdleTracker:
+    """
+    Measures how long the TTS server sits idle between jobs while there is work
+    
+    A gap starts when the last job in TTS generation finishes and ends when the
+    next one starts. Gaps during which the API had no narrations aren't counted,
+    since nothing could have been generated then.
+    """
+    
+    def __init__(self):
+        self.active = 0
+        self.gap_start: Optional[float] = None
+        self.gap_had_no_work = False
+        self.gaps: List[float] = []
+    
+    def start_job(self) -> None:
+        if self.active == 0 and self.gap_start is not None and not self.gap_had_no_work:
+            self.gaps.append(time.time() - self.gap_start)
+        self.active += 1
+        self.gap_start = None
+    
+    def finish_job(self) -> None:
+        self.active = max(0, self.active - 1)
+        if self.active == 0:
+            self.gap_start = time.time()
+            self.gap_had_no_work = False
+    
+    def no_work(self) -> None:
+        """The API had no narrations, so the current gap isn't idle overhead"""
+        self.gap_had_no_work = True
+    
+    def log_stats(self) -> None:
+        """Log idle gaps since the last report"""
+        if not self.gaps:
+            return
+        gaps = sorted(self.gaps)
+        logger.info(f"TTS idle gaps: {len(gaps)} gaps, {sum(gaps):.1f}s total, "
+                    f"{gaps[len(gaps) // 2]:.2f}s median, {gaps[-1]:.2f}s max")
+        self.gaps = []
+
+class ConcurrencyController:
+    """
+    AIMD controller for the number of concurrent workers
+    
+    The signal is TTS time per second of audio. While it stays within
+    ADAPTIVE_LATENCY_TOLERANCE of the best level seen, the target grows (by one
+    per job at first, then by one per round of jobs); when it rises above that,
+    or TTS generation fails, the target is cut by ADAPTIVE_BACKOFF. The target
+    stays between MIN_WORKERS and MAX_WORKERS.
+    """
+    
+    # Smoothing of the latency signal and how fast the baseline follows a slower server
+    SMOOTHING = 0.3
+    BASELINE_DRIFT = 0.02
+    
+    def __init__(self, config: WorkerConfig):
+        self.config = config
+        self.min_target = max(1, min(config.min_workers, config.max_workers))
+        self.max_target = max(1, config.max_workers)
+        self.target = float(self.min_target)
+        self.slow_start = True
+        self.in_flight = 0
+        self.smoothed: Optional[float] = None
+        self.baseline: Optional[float] = None
+        # Jobs started before a decrease finish slow as well, they shouldn't cut the target again
+        self.completions_until_decrease = 0
+        self.stats = {'increases': 0, 'decreases': 0, 'failures': 0}
+    
+    @property
+    def limit(self) -> int:
+        """Current number of workers to run"""
+        return int(self.target)
+    
+    def start_job(self) -> None:
+        self.in_flight += 1
+    
+    def cancel_job(self) -> None:
+        """A job ended without a TTS outcome, e.g. it was cancelled or its upload failed first"""
+        self.in_flight = max(0, self.in_flight - 1)
+    
+    def record_success(self, seconds_per_audio_second: float) -> None:
+        """A TTS generation finished, taking this long per second of audio"""
+        saturated = self.in_flight >= self.limit
+        self.in_flight = max(0, self.in_flight - 1)
+        if self.smoothed is None:
+            self.smoothed = seconds_per_audio_second
+        else:
+            self.smoothed += self.SMOOTHING * (seconds_per_audio_second - self.smoothed)
+        if self.baseline is None or self.smoothed < self.baseline:
+            self.baseline = self.smoothed
+        else:
+            self.baseline += self.BASELINE_DRIFT * (self.smoothed - self.baseline)
+        
+        self.completions_until_decrease = max(0, self.completions_until_decrease - 1)
+        if self.smoothed > self.baseline * self.config.adaptive_latency_tolerance:
+            self._decrease(f"TTS latency {self.smoothed:.2f}s per audio second, baseline {self.baseline:.2f}s")
+        elif saturated:
+            # Only grow when the current target is actually in use
+            self._increase()
+    
+    def record_failure(self) -> None:
+        """A TTS generation failed, e.g. the server is overloaded"""
+        self.in_flight = max(0, self.in_flight - 1)
+        self.stats['failures'] += 1
+        self.completions_until_decrease = max(0, self.completions_until_decrease - 1)
+        self._decrease("TTS generation failed")
+    
+    def _increase(self) -> None:
+        previous = self.limit
+        self.target = min(self.max_target, self.target + (1.0 if self.slow_start else 1.0 / self.target))
+        if self.limit != previous:
+            self.stats['increases'] += 1
+            logger.info(f"Concurrency target raised to {self.limit}")
+    
+    def _decrease(self, reason: str) -> None:
+        if self.completions_until_decrease > 0:
+            return
+        previous = self.limit
+        self.slow_start = False
+        self.target = max(float(self.min_target), self.target * self.config.adaptive_backoff)
+        self.completions_until_decrease = self.in_flight
+        if self.limit != previous:
+            self.stats['decreases'] += 1
+            logger.info(f"Concurrency target lowered to {self.limit} ({reason})")
+    
+    def log_stats(self) -> None:
+        latency = f"{self.smoothed:.2f}s per audio second (baseline {self.baseline:.2f}s)" if self.smoothed is not None else "no data"
+        logger.info(f"Concurrency target: {self.limit} (range {self.min_target}-{self.max_target}), "
+                    f"TTS latency {latency}, {self.stats['increases']} increases, "
+                    f"{self.stats['decreases']} decreases, {self.stats['failures']} failures")
+
 class Worker:
     """Individual worker that processes a single narration"""
     
-    def __init__(self, worker_id: int, config: WorkerConfig):
+    def __init__(self, worker_id: int, config: WorkerConfig, session: Optional[aiohttp.ClientSession] = None,
+                 audio_pool: Optional[AudioProcessPool] = None,
+                 notifications: Optional[DiscordNotificationQueue] = None,
+                 prefetcher: Optional[NarrationPrefetcher] = None,
+                 idle_tracker: Optional[TTSIdleTracker] = None,
+                 controller: Optional[ConcurrencyController] = None,
+                 local_tts: Optional[LocalTTSEngine] = None):
         self.worker_id = worker_id
         self.config = config
-        self.s3_uploader = S3Uploader(config)
+        self.session = session
+        # Without a pool, audio stages run inline on the event loop
+        self.audio_pool = audio_pool
+        # Without a queue, Discord notifications are sent before the job finishes
+        self.notifications = notifications
+        # Without a prefetcher, the narration is fetched when the job starts
+        self.prefetcher = prefetcher
+        self.idle_tracker = idle_tracker
+        self.controller = controller
+        # Set from the start of TTS until its outcome is reported to the controller
+        self.tts_outcome_pending = False
+        # Generates in this process instead of calling the TTS server
+        self.local_tts = local_tts
+        self.s3_uploader = S3Uploader.shared(config)
         self.audio_processor = AudioProcessor()
-        self.discord_notifier = DiscordNotifier(config)
+        self.discord_notifier = notifications.notifier if notifications else DiscordNotifier(config)
+    
+    async def stream_audio_to_s3(self, api_client: APIClient, text: str, target_gender: Optional[str],
+                                 narration_id: str, notification_audio: Optional[NotificationAudio] = None
+                                 ) -> tuple[str, float, Optional[str]]:
+        """
+        Generate audio and upload it to S3 while it streams in
+        
+        PCM from the TTS server, or from the in-process engine with TTS_MODE=local,
+        goes through the MP3 encoder (lameenc in-process or an ffmpeg pipe; WAV when
+        neither is available) straight into a multipart upload,
+        and the duration is counted from the samples on the way. Returns (audio URL,
+        duration, local path), where the local copy is only written when
+        KEEP_LOCAL_AUDIO is set. The encoded audio is also captured into
+        notification_audio when given.
+        
+        The TTS outcome is reported here, since only this knows when the last chunk
+        arrived and whether an error came from the TTS or from encoding and upload.
+        """
+        voice = VoiceSelector.get_voice(self.config, target_gender)
+        encoder_name = AudioProcessor.select_mp3_encoder(self.config.mp3_encoder)
+        use_mp3 = encoder_name is not None
+        file_ext = 'mp3' if use_mp3 else 'wav'
+        
+        local_path = None
+        local_file = None
+        if self.config.keep_local_audio:
+            os.makedirs("outputs", exist_ok=True)
+            local_path = os.path.join("outputs", f"narration_{uuid.uuid4().hex}.{file_ext}")
+            local_file = open(local_path, 'wb')
+        
+        # A WAV stream's header has no length yet, so its part is uploaded last with the real one
+        upload = await self.s3_uploader.start_stream(narration_id, file_ext, hold_first_part=not use_mp3)
+        
+        if notification_audio:
+            notification_audio.set_format(file_ext)
+        
+        async def write_output(data: bytes) -> None:
+            await upload.write(data)
+            if local_file:
+                local_file.write(data)
+            if notification_audio:
+                notification_audio.write(data)
+        
+        tts_start_time = time.time()
+        if self.local_tts:
+            # PCM straight from the engine, there is no WAV header to parse
+            parser = WavStreamParser.for_pcm(self.local_tts.sample_rate)
+            chunks = self.local_tts.stream_pcm(text, voice)
+        else:
+            parser = WavStreamParser()
+            chunks = api_client.stream_tts(text, voice)
+        encoder = None
+        try:
+            while True:
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                except Exception:
+                    self.tts_failed()
+                    raise
+                pcm = parser.feed(chunk)
+                if not parser.ready:
+                    continue
+                if encoder is None:
+                    if encoder_name == 'lameenc':
+                        encoder = LameStreamEncoder(parser.sample_rate, parser.channels, write_output, self.audio_pool)
+                    elif use_mp3:
+                        # pydub can't encode a stream, it uses ffmpeg anyway
+                        encoder = StreamingMP3Encoder(parser.sample_rate, parser.channels, write_output)
+                    else:
+                        encoder = WavPassthrough(parser, write_output)
+                    await encoder.start()
+                if pcm:
+                    await encoder.write(pcm)
+            
+            if not parser.ready or parser.pcm_bytes == 0:
+                self.tts_failed()
+                raise WorkerError("TTS returned no audio")
+            self.tts_succeeded(time.time() - tts_start_time, parser.duration)
+            
+            await encoder.finish()
+            if use_mp3:
+                audio_url = await upload.complete()
+            else:
+                audio_url = await upload.complete(first_bytes=parser.wav_header())
+                if local_file:
+                    local_file.seek(0)
+                    local_file.write(parser.wav_header())
+        except BaseException:
+            # Ends the TTS request or the local generation right away
+            await chunks.aclose()
+            if encoder:
+                await encoder.abort()
+            await upload.abort()
+            if local_file:
+                local_file.close()
+                local_file = None
+                os.remove(local_path)
+            raise
+        finally:
+            if local_file:
+                local_file.close()
+        
+        logger.info(f"Worker {self.worker_id}: Streamed {parser.duration}s of audio to {audio_url}")
+        return audio_url, parser.duration, local_path
+    
+    async def run_audio_stage(self, stage: str, func, *args):
+        """Run a CPU-bound audio stage in the process pool"""
+        if self.audio_pool is None:
+            return func(*args)
+        return await self.audio_pool.run(stage, func, *args)
+    
+    def tts_started(self) -> None:
+        if self.idle_tracker:
+            self.idle_tracker.start_job()
+        if self.controller:
+            self.controller.start_job()
+        self.tts_outcome_pending = True
+    
+    def tts_finished(self) -> None:
+        if self.idle_tracker:
+            self.idle_tracker.finish_job()
+        if self.tts_outcome_pending:
+            self.tts_outcome_pending = False
+            if self.controller:
+                self.controller.cancel_job()
+    
+    def tts_failed(self) -> None:
+        """The TTS itself failed, errors of encoding, upload or cancellation don't count"""
+        self.tts_outcome_pending = False
+        if self.controller:
+            self.controller.record_failure()
+    
+    def tts_succeeded(self, generation_time: float, audio_duration: float) -> None:
+        """generation_time runs up to the last audio from the TTS, not to the end of the upload"""
+        self.tts_outcome_pending = False
+        if self.controller:
+            if audio_duration > 0:
+                self.controller.record_success(generation_time / audio_duration)
+            else:
+                self.controller.record_failure()
+    
+    async def notify(self, api_client: APIClient, narration_data: Dict[str, Any], audio_url: str,
+                     audio_duration: float, generation_time: float,
+                     notification_audio: Optional[NotificationAudio]) -> None:
+        """Hand the Discord notification to the background queue, or send it now without one"""
+        if self.notifications:
+            if self.notifications.enqueue(narration_data=narration_data, audio_url=audio_url,
+                                          audio_duration=audio_duration, worker_id=self.worker_id,
+                                          generation_time=generation_time, audio=notification_audio):
+                logger.info(f"Worker {self.worker_id}: Discord notification queued")
+            return
+        
+        logger.info(f"Worker {self.worker_id}: Sending Discord notification")
+        await self.discord_notifier.send_narration_summary(
+            api_client.session, narration_data, audio_url, audio_duration, self.worker_id, generation_time,
+            notification_audio
+        )
     
     async def process_narration(self) -> bool:
         """Process a single narration through the complete pipeline"""
@@ -727,10 +1998,13 @@ class Worker:
         mp3_file_path = None
         
         try:
-            async with APIClient(self.config) as api_client:
+            async with APIClient(self.config, self.session) as api_client:
                 # Step 1: Get narration
                 logger.info(f"Worker {self.worker_id}: Getting narration")
-                narration_data = await api_client.get_narration()
+                if self.prefetcher:
+                    narration_data = await self.prefetcher.get()
+                else:
+                    narration_data = await api_client.get_narration()
                 
                 narration_id = narration_data.get('id')
                 if not narration_id:
@@ -751,37 +2025,64 @@ class Worker:
                 # Extract target_gender from narration data (if available)
                 target_gender = narration_data.get('target_gender', None)
                 
+                # Audio for the Discord notification is kept from here rather than downloaded from S3
+                notification_audio = self.discord_notifier.notification_audio()
+                
+                # The local engine has no file-based path
+                if self.config.stream_upload or self.local_tts:
+                    # Steps 2-5 in one pass: generate, encode and upload while the audio streams in
+                    logger.info(f"Worker {self.worker_id}: Generating and streaming TTS audio to S3")
+                    generation_start_time = time.time()
+                    self.tts_started()
+                    try:
+                        audio_url, audio_duration, local_path = await self.stream_audio_to_s3(
+                            api_client, text_content, target_gender, narration_id, notification_audio
+                        )
+                    finally:
+                        self.tts_finished()
+                    generation_time = round(time.time() - generation_start_time, 2)
+                    logger.info(f"Worker {self.worker_id}: TTS generation and upload completed in {generation_time} seconds")
+                    if local_path:
+                        logger.info(f"Worker {self.worker_id}: Kept local copy at {local_path}")
+                    
+                    logger.info(f"Worker {self.worker_id}: Updating narration")
+                    await api_client.update_narration_audio(narration_id, audio_url, audio_duration)
+                    
+                    await self.notify(api_client, narration_data, audio_url, audio_duration, generation_time,
+                                      notification_audio)
+                    
+                    logger.info(f"Worker {self.worker_id}: Successfully processed narration {narration_id}")
+                    return True
+                
                 # Step 2: Generate TTS audio (WAV format) - Track generation time
                 logger.info(f"Worker {self.worker_id}: Generating TTS audio")
                 generation_start_time = time.time()
-                wav_file_path = await api_client.generate_tts(text_content, target_gender)
+                self.tts_started()
+                try:
+                    wav_file_path = await api_client.generate_tts(text_content, target_gender)
+                except Exception:
+                    self.tts_failed()
+                    raise
+                finally:
+                    self.tts_finished()
                 generation_end_time = time.time()
                 generation_time = round(generation_end_time - generation_start_time, 2)
                 logger.info(f"Worker {self.worker_id}: TTS generation completed in {generation_time} seconds")
+                self.tts_succeeded(generation_time, AudioProcessor.get_audio_duration(wav_file_path))
                 
-                # Step 3: Convert WAV to MP3
+                # Steps 3-4: Convert WAV to MP3, the duration comes from the samples encoded
                 logger.info(f"Worker {self.worker_id}: Converting WAV to MP3")
                 try:
-                    mp3_file_path = self.audio_processor.convert_wav_to_mp3(wav_file_path)
+                    mp3_file_path, audio_duration = await self.run_audio_stage(
+                        'mp3_encode', AudioProcessor.encode_wav_to_mp3, wav_file_path, self.config.mp3_encoder
+                    )
                     logger.info(f"Worker {self.worker_id}: Successfully converted to MP3: {mp3_file_path}")
                 except WorkerError as e:
                     logger.error(f"Worker {self.worker_id}: MP3 conversion failed: {e}")
                     # If MP3 conversion fails, continue with WAV file
                     logger.warning(f"Worker {self.worker_id}: Continuing with WAV file due to MP3 conversion failure")
                     mp3_file_path = wav_file_path
-                
-                # Step 4: Get audio duration (use MP3 if available, otherwise WAV)
-                logger.info(f"Worker {self.worker_id}: Calculating audio duration")
-                if mp3_file_path != wav_file_path and mp3_file_path.endswith('.mp3'):
-                    # Use MP3 duration calculation
-                    audio_duration = self.audio_processor.get_mp3_duration(mp3_file_path)
-                    if audio_duration == 0.0:
-                        # Fallback to WAV duration if MP3 duration fails
-                        logger.warning(f"Worker {self.worker_id}: MP3 duration calculation failed, using WAV")
-                        audio_duration = self.audio_processor.get_audio_duration(wav_file_path)
-                else:
-                    # Use WAV duration calculation
-                    audio_duration = self.audio_processor.get_audio_duration(wav_file_path)
+                    audio_duration = await self.run_audio_stage('duration', AudioProcessor.get_audio_duration, wav_file_path)
                 
                 # Step 5: Upload to S3 (prefer MP3, fallback to WAV)
                 logger.info(f"Worker {self.worker_id}: Uploading to S3")
@@ -793,10 +2094,10 @@ class Worker:
                 await api_client.update_narration_audio(narration_id, audio_url, audio_duration)
                 
                 # Step 7: Send Discord notification
-                logger.info(f"Worker {self.worker_id}: Sending Discord notification")
-                await self.discord_notifier.send_narration_summary(
-                    api_client.session, narration_data, audio_url, audio_duration, self.worker_id, generation_time
-                )
+                if notification_audio:
+                    notification_audio.read_file(upload_file_path)
+                await self.notify(api_client, narration_data, audio_url, audio_duration, generation_time,
+                                  notification_audio)
                 
                 logger.info(f"Worker {self.worker_id}: Successfully processed narration {narration_id}")
                 return True
@@ -841,6 +2142,17 @@ class WorkerManager:
         self.no_narrations_backoff = 0  # Backoff time when no narrations are available
         self.max_backoff = 60  # Maximum backoff time in seconds
         self.last_no_narration_time = 0
+        # Set while the one worker allowed after a backoff checks for narrations
+        self.probing = False
+        self.http_pool = HTTPSessionPool(config)
+        self.audio_pool = AudioProcessPool(config)
+        self.notifications = DiscordNotificationQueue(config)
+        self.idle_tracker = TTSIdleTracker()
+        self.prefetcher = NarrationPrefetcher(config, self.idle_tracker)
+        self.controller = ConcurrencyController(config)
+        self.local_tts = LocalTTSEngine(config) if config.tts_mode == 'local' else None
+        # Set when a worker finishes, so its slot is refilled without waiting for the next poll
+        self.worker_finished: Optional[asyncio.Event] = None
     
     async def start_worker(self) -> tuple[int, bool]:
         """Start a single worker and return (worker_id, success)"""
@@ -860,7 +2172,9 @@ class WorkerManager:
         no_narrations_available = False
         
         try:
-            worker = Worker(worker_id, self.config)
+            worker = Worker(worker_id, self.config, self.http_pool.session, self.audio_pool, self.notifications,
+                            self.prefetcher if self.prefetcher.task else None, self.idle_tracker,
+                            self.controller if self.config.adaptive_concurrency else None, self.local_tts)
             self.active_workers[worker_id]['status'] = 'processing'
             
             # Single attempt - no retry for "no narrations available"
@@ -896,10 +2210,14 @@ class WorkerManager:
             self.active_workers[worker_id]['status'] = 'error'
         finally:
             self.active_workers.pop(worker_id, None)
+            if self.worker_finished:
+                self.worker_finished.set()
             logger.info(f"Worker {worker_id}: Finished")
         
         # Update backoff logic based on result
+        self.probing = False
         if no_narrations_available:
+            self.idle_tracker.no_work()
             current_time = time.time()
             self.last_no_narration_time = current_time
             # Increase backoff time (exponential backoff with max limit)
@@ -928,11 +2246,20 @@ class WorkerManager:
                 # Backoff period has passed, reset and allow one worker to check
                 logger.info("Backoff period ended, allowing one worker to check for narrations")
                 self.no_narrations_backoff = 0
-                return len(self.active_workers) == 0  # Only start if no workers are active
+                self.probing = len(self.active_workers) == 0
+                return self.probing  # Only start if no workers are active
+        
+        # Wait for the probe's result before starting more workers
+        if self.probing:
+            return False
         
         # Normal operation: start workers up to max limit
         active_count = len(self.active_workers)
         
+        if self.config.adaptive_concurrency:
+            # The controller's target follows TTS latency and errors
+            return active_count < self.controller.limit
+        
         if active_count == 0:
             # No workers running, start one
             return True
@@ -950,17 +2277,52 @@ class WorkerManager:
     async def run(self) -> None:
         """Run the worker system continuously with smart worker management"""
         logger.info(f"Starting worker system with {self.config.max_workers} max workers")
-        logger.info("Smart worker management enabled: will start with one worker and scale based on demand")
+        if self.config.adaptive_concurrency:
+            logger.info(f"Adaptive concurrency enabled: between {self.controller.min_target} and "
+                        f"{self.controller.max_target} workers, following TTS latency and errors")
+        else:
+            logger.info("Smart worker management enabled: will start with one worker and scale based on demand")
         self.running = True
+        # Probe the MP3 encoders once, before any job needs them
+        AudioProcessor.select_mp3_encoder(self.config.mp3_encoder)
+        self.worker_finished = asyncio.Event()
+        session = await self.http_pool.start()
+        self.audio_pool.start()
+        if self.local_tts:
+            # Load the model before the first job rather than inside it
+            logger.info("TTS_MODE=local: generating speech in this process")
+            await self.local_tts.start()
+        self.notifications.start(session)
+        self.prefetcher.start(session)
+        last_stats_time = time.time()
         
         try:
             while self.running:
-                if self.should_start_new_worker():
+                while self.running and self.should_start_new_worker():
                     logger.info(f"Starting new worker (active: {len(self.active_workers)})")
                     asyncio.create_task(self.start_worker())
+                    # Let the worker register itself before checking again
+                    await asyncio.sleep(0)
+                    if not self.config.adaptive_concurrency:
+                        # The fixed heuristic starts one worker per check
+                        break
                 
-                # Wait before checking again
-                await asyncio.sleep(2)
+                if self.config.http_stats_interval and time.time() - last_stats_time >= self.config.http_stats_interval:
+                    self.http_pool.log_stats()
+                    self.audio_pool.log_stats()
+                    self.notifications.log_stats()
+                    self.prefetcher.log_stats()
+                    self.idle_tracker.log_stats()
+                    if self.config.adaptive_concurrency:
+                        self.controller.log_stats()
+                    last_stats_time = time.time()
+                
+                # Wait before checking again, or until a worker finishes
+                self.worker_finished.clear()
+                try:
+                    await asyncio.wait_for(self.worker_finished.wait(), 2)
+                except asyncio.TimeoutError:
+                    pass
                 
         except KeyboardInterrupt:
             logger.info("Received interrupt signal, shutting down...")
@@ -973,6 +2335,22 @@ class WorkerManager:
                 while self.active_workers:
                     await asyncio.sleep(1)
             
+            await self.prefetcher.close()
+            # Let queued notifications go out before the shared session closes
+            await self.notifications.close()
+            self.prefetcher.log_stats()
+            self.idle_tracker.log_stats()
+            if self.config.adaptive_concurrency:
+                self.controller.log_stats()
+            self.notifications.log_stats()
+            self.http_pool.log_stats()
+            self.audio_pool.log_stats()
+            if S3Uploader._shared is not None:
+                S3Uploader._shared.log_stats()
+            await self.http_pool.close()
+            self.audio_pool.close()
+            if self.local_tts:
+                self.local_tts.close()
             logger.info("Worker system shutdown complete")
     
     def stop(self):
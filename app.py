@@ -5,6 +5,7 @@
 import os
 import time
 import asyncio
+import threading
 from datetime import datetime
 from typing import List, Optional
 from dotenv import load_dotenv
@@ -38,20 +39,35 @@ def ensure_env_file_exists():
         except Exception as e:
             print(f"⚠️ Error creating default .env file: {e}")
 
-# Ensure .env file exists before loading environment variables
-ensure_env_file_exists()
+# ORPHEUS_DOTENV=false ignores .env, e.g. for benchmarks that pass every setting in the environment
+USE_DOTENV = os.environ.get("ORPHEUS_DOTENV", "true").lower() in ("true", "1", "yes", "on")
 
-# Load environment variables from .env file
-load_dotenv(override=True)
+if USE_DOTENV:
+    # Ensure .env file exists before loading environment variables
+    ensure_env_file_exists()
 
-from fastapi import FastAPI, Request, Form, HTTPException, Depends
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+    # Load environment variables from .env file
+    load_dotenv(override=True)
+
+from fastapi import FastAPI, Request, Form, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse, Response, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 import json
 
 from tts_engine import generate_speech_from_api, AVAILABLE_VOICES, DEFAULT_VOICE, VOICE_TO_LANGUAGE, AVAILABLE_LANGUAGES
+from tts_engine import AdmissionController, AdmissionRejected, RequestCoalescer
+from tts_engine import OutputJanitor, SentenceSegmenter, load_model, get_model_state
+from tts_engine.inference import (
+    SAMPLE_RATE, create_wav_header, create_output_path,
+    write_wav_file, audio_to_wav_bytes, metric_voice
+)
+from tts_engine import metrics
+from tts_engine import warmup
+from tts_engine import config as runtime_config
+from server import DRAIN_TIMEOUT
 
 # Create FastAPI app
 app = FastAPI(
@@ -68,6 +84,79 @@ app = FastAPI(
 os.makedirs("outputs", exist_ok=True)
 os.makedirs("static", exist_ok=True)
 
+# The OpenAI-compatible endpoint answers from memory unless outputs should also be kept on disk
+SAVE_API_OUTPUTS = os.environ.get("ORPHEUS_SAVE_API_OUTPUTS", "false").lower() in ("true", "1", "yes", "on")
+
+# Load the SNAC model in the background at startup instead of on the first request
+PRELOAD_MODEL = os.environ.get("ORPHEUS_PRELOAD_MODEL", "true").lower() in ("true", "1", "yes", "on")
+
+# Decode every window shape and prime the LLM with the voice prefixes before reporting ready
+WARMUP_ENABLED = os.environ.get("ORPHEUS_WARMUP", "false").lower() in ("true", "1", "yes", "on")
+if WARMUP_ENABLED:
+    warmup.warmup_state["status"] = "pending"
+
+# Expire and size-limit generated files in outputs/
+output_janitor = OutputJanitor("outputs")
+
+# Seconds before retrying a failed warm-up, doubled after each failure up to the maximum
+WARMUP_RETRY_DELAY = 5
+WARMUP_RETRY_MAX_DELAY = 60
+
+# Background model preload or warm-up, cancelled on shutdown
+preload_task = None
+
+@app.on_event("startup")
+async def preload_model():
+    global preload_task
+    if not PRELOAD_MODEL and not WARMUP_ENABLED:
+        return
+    
+    async def load():
+        delay = WARMUP_RETRY_DELAY
+        while True:
+            try:
+                if WARMUP_ENABLED:
+                    await run_in_threadpool(warmup.warmup)
+                else:
+                    await run_in_threadpool(load_model)
+                return
+            except Exception as e:
+                if not WARMUP_ENABLED:
+                    print(f"Model preload failed, it will be retried on the first request: {e}")
+                    return
+                # /ready waits for the warm-up, so a failure must not stick for the life
+                # of the process (the model may also have loaded on a request meanwhile)
+                print(f"Warm-up failed, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WARMUP_RETRY_MAX_DELAY)
+    
+    # Don't block startup, /ready reports when the model can serve requests
+    preload_task = asyncio.create_task(load())
+
+@app.on_event("shutdown")
+async def stop_preload():
+    if preload_task is not None and not preload_task.done():
+        preload_task.cancel()
+
+@app.on_event("startup")
+async def start_output_janitor():
+    output_janitor.start()
+
+@app.on_event("shutdown")
+async def stop_output_janitor():
+    output_janitor.stop()
+
+@app.on_event("shutdown")
+async def drain_generations():
+    """Let generations whose clients have already gone finish before exiting"""
+    pending = [task for task in generation_tasks if not task.done()]
+    if not pending:
+        return
+    print(f"Waiting up to {DRAIN_TIMEOUT}s for {len(pending)} in-flight generations")
+    done, still_running = await asyncio.wait(pending, timeout=DRAIN_TIMEOUT)
+    for task in still_running:
+        task.cancel()
+
 # Mount directories for serving files
 app.mount("/outputs", StaticFiles(directory="outputs"), name="outputs")
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -75,6 +164,149 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Setup templates
 templates = Jinja2Templates(directory="templates")
 
+# Limit concurrent and queued generations so overload is rejected early
+# instead of slowing down every request in flight
+admission = AdmissionController()
+
+# Identical in-flight requests share a single generation
+coalescer = RequestCoalescer()
+
+# Keep references to background generation tasks so they are not garbage collected
+generation_tasks = set()
+
+# Number of sentences a WebSocket stream may generate ahead of the one being sent
+try:
+    STREAM_LOOKAHEAD = int(os.environ.get("ORPHEUS_STREAM_LOOKAHEAD", "2"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_STREAM_LOOKAHEAD value, using 2 as fallback")
+    STREAM_LOOKAHEAD = 2
+
+# Expose admission state as gauges
+metrics.QUEUE_DEPTH.set_function(lambda: admission.queued)
+metrics.ACTIVE_GENERATIONS.set_function(lambda: admission.active)
+
+# Endpoints that generate speech and are tracked by request metrics
+SPEECH_ENDPOINTS = ("/v1/audio/speech", "/speak", "/web/")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record latency and status of speech requests, labelled by endpoint and voice"""
+    endpoint = request.url.path
+    if request.method != "POST" or endpoint not in SPEECH_ENDPOINTS:
+        return await call_next(request)
+    
+    start = time.time()
+    
+    def record(status: int):
+        # Endpoints store the requested voice on request.state
+        voice = metric_voice(getattr(request.state, "voice", DEFAULT_VOICE))
+        metrics.REQUESTS_TOTAL.inc(endpoint=endpoint, voice=voice, status=str(status))
+        metrics.REQUEST_LATENCY.observe(time.time() - start, endpoint=endpoint, voice=voice)
+        if getattr(request.state, "coalesced", False):
+            metrics.COALESCED_REQUESTS.inc(endpoint=endpoint, voice=voice)
+    
+    try:
+        response = await call_next(request)
+    except BaseException:
+        record(500)
+        raise
+    
+    # call_next returns once the headers are ready; streamed audio is only
+    # complete when the last body chunk has been sent
+    body = response.body_iterator
+    async def body_with_metrics():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            record(response.status_code)
+    response.body_iterator = body_with_metrics()
+    return response
+
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once the audio model is loaded (and warmed up if enabled), 503 before that"""
+    state = get_model_state()
+    ready = state["status"] == "ready"
+    if WARMUP_ENABLED:
+        ready = ready and warmup.warmup_state["status"] == "done"
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "model": state, "warmup": warmup.warmup_state}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics in the text exposition format"""
+    return PlainTextResponse(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
+
+def current_config():
+    """Runtime configuration for a new request, including changes saved by other workers"""
+    if USE_DOTENV:
+        runtime_config.reload_if_changed(".env")
+    return runtime_config.get_config()
+
+def start_generation(text: str, voice: str, use_batching: bool, max_batch_chars: int = 1000):
+    """
+    Attach to an identical in-flight generation or start a new one.
+    
+    Returns (generation, coalesced). The generation's result holds the
+    complete PCM audio in memory; nothing is written to disk. Raises
+    AdmissionRejected if a new generation would exceed the server's capacity.
+    """
+    # Settings are fixed for the whole generation when it starts
+    config = current_config()
+    key = coalescer.make_key(
+        text=text,
+        voice=voice,
+        temperature=config.temperature,
+        top_p=config.top_p,
+        max_tokens=config.max_tokens,
+        use_batching=use_batching,
+        max_batch_chars=max_batch_chars
+    )
+    generation, is_leader = coalescer.join(key)
+    if not is_leader:
+        print(f"Coalescing request with in-flight generation ({generation.followers} followers)")
+        return generation, True
+    
+    try:
+        tokens = admission.reserve(text, use_batching, max_batch_chars)
+    except AdmissionRejected as e:
+        coalescer.release(generation)
+        generation.finish(error=e)
+        raise
+    
+    async def run_generation():
+        try:
+            async with admission.slot(text, use_batching, max_batch_chars, tokens=tokens):
+                segments = await run_in_threadpool(
+                    generate_speech_from_api,
+                    prompt=text,
+                    voice=voice,
+                    use_batching=use_batching,
+                    max_batch_chars=max_batch_chars,
+                    on_audio_chunk=generation.add_chunk,
+                    config=config
+                )
+            coalescer.release(generation)
+            generation.finish(result={"audio": b"".join(segments)})
+        except Exception as e:
+            print(f"Error during speech generation: {e}")
+            coalescer.release(generation)
+            generation.finish(error=e)
+    
+    task = asyncio.create_task(run_generation())
+    generation_tasks.add(task)
+    task.add_done_callback(generation_tasks.discard)
+    return generation, False
+
+async def save_output(audio: bytes, voice: str) -> str:
+    """Persist generated audio under a collision-free name in outputs/"""
+    output_path = create_output_path(voice)
+    await run_in_threadpool(write_wav_file, output_path, audio)
+    return output_path
+
 # API models
 class SpeechRequest(BaseModel):
     input: str
@@ -82,6 +314,7 @@ class SpeechRequest(BaseModel):
     voice: str = DEFAULT_VOICE
     response_format: str = "wav"
     speed: float = 1.0
+    stream: bool = False
 
 class APIResponse(BaseModel):
     status: str
@@ -91,45 +324,217 @@ class APIResponse(BaseModel):
 
 # OpenAI-compatible API endpoint
 @app.post("/v1/audio/speech")
-async def create_speech_api(request: SpeechRequest):
+async def create_speech_api(request: SpeechRequest, http_request: Request):
     """
     Generate speech from text using the Orpheus TTS model.
     Compatible with OpenAI's /v1/audio/speech endpoint.
     
     For longer texts (>1000 characters), batched generation is used
     to improve reliability and avoid truncation issues.
+    
+    Set stream to true to receive the WAV audio while it is being generated.
+    The X-Coalesced response header is "true" when the request was served by
+    an identical generation that was already in progress.
     """
+    http_request.state.voice = request.voice
     if not request.input:
         raise HTTPException(status_code=400, detail="Missing input text")
     
-    # Generate unique filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = f"outputs/{request.voice}_{timestamp}.wav"
-    
     # Check if we should use batched generation
     use_batching = len(request.input) > 1000
     if use_batching:
         print(f"Using batched generation for long text ({len(request.input)} characters)")
     
     # Generate speech with automatic batching for long texts
-    start = time.time()
-    generate_speech_from_api(
-        prompt=request.input,
-        voice=request.voice,
-        output_file=output_path,
-        use_batching=use_batching,
-        max_batch_chars=1000  # Process in ~1000 character chunks (roughly 1 paragraph)
-    )
-    end = time.time()
-    generation_time = round(end - start, 2)
+    # Process in ~1000 character chunks (roughly 1 paragraph)
+    try:
+        generation, coalesced = start_generation(request.input, request.voice, use_batching)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    http_request.state.coalesced = coalesced
+    headers = {"X-Coalesced": "true" if coalesced else "false"}
     
-    # Return audio file
-    return FileResponse(
-        path=output_path,
+    # Stream audio chunks as they are generated (replayed from the start for coalesced requests)
+    if request.stream:
+        def stream_wav():
+            yield create_wav_header()
+            # Raises when the generation fails, which aborts the response rather than ending it
+            yield from generation.iter_chunks()
+        
+        return StreamingResponse(stream_wav(), media_type="audio/wav", headers=headers)
+    
+    try:
+        result = await generation.wait()
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    
+    if SAVE_API_OUTPUTS:
+        output_path = await save_output(result["audio"], request.voice)
+        return FileResponse(
+            path=output_path,
+            media_type="audio/wav",
+            filename=os.path.basename(output_path),
+            headers=headers
+        )
+    
+    # Return the audio straight from memory
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    headers["Content-Disposition"] = f'attachment; filename="{request.voice}_{timestamp}.wav"'
+    return Response(
+        content=audio_to_wav_bytes(result["audio"]),
         media_type="audio/wav",
-        filename=f"{request.voice}_{timestamp}.wav"
+        headers=headers
     )
 
+@app.websocket("/v1/audio/speech/ws")
+async def speech_websocket(websocket: WebSocket):
+    """
+    Stream speech for text that arrives incrementally.
+    
+    Clients send text fragments as they are produced, either as plain text frames
+    or as {"type": "text", "text": ...}. Each complete sentence is generated as
+    soon as it has been received and its audio is sent back in order as binary
+    frames of 16-bit mono PCM at the server's sample rate.
+    
+    Control messages:
+    - {"type": "config", "voice": ...} changes the voice for following sentences
+    - {"type": "flush"} voices buffered text that does not end a sentence yet
+    - {"type": "cancel"} drops buffered text and stops all pending audio
+    - {"type": "end"} voices the remaining text, sends "done" and closes
+    
+    The server sends "ready" on connect, "segment_start" and "segment_end"
+    around the audio of each sentence, "error" when a sentence could not be
+    generated and "cancelled" once a cancel has taken effect.
+    """
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+    voice = websocket.query_params.get("voice", DEFAULT_VOICE)
+    segmenter = SentenceSegmenter()
+    
+    # Sentences are generated concurrently but only the sender writes to the socket,
+    # taking segments and control messages from the outbox in the order they were queued
+    outbox = asyncio.Queue()
+    lookahead = asyncio.Semaphore(max(1, STREAM_LOOKAHEAD))
+    cancel_event = threading.Event()
+    segment_count = 0
+    
+    async def generate_segment(text, segment_voice, chunks, cancel):
+        use_batching = len(text) > 1000
+        try:
+            async with lookahead:
+                if cancel.is_set():
+                    return
+                config = current_config()
+                tokens = admission.reserve(text, use_batching)
+                async with admission.slot(text, use_batching, tokens=tokens):
+                    await run_in_threadpool(
+                        generate_speech_from_api,
+                        prompt=text,
+                        voice=segment_voice,
+                        use_batching=use_batching,
+                        on_audio_chunk=lambda chunk: loop.call_soon_threadsafe(chunks.put_nowait, chunk),
+                        cancel_event=cancel,
+                        config=config
+                    )
+        except Exception as e:
+            if not isinstance(e, AdmissionRejected):
+                print(f"Error during streamed speech generation: {e}")
+            chunks.put_nowait(e)
+        finally:
+            chunks.put_nowait(None)
+    
+    def queue_segments(sentences):
+        nonlocal segment_count
+        for text in sentences:
+            chunks = asyncio.Queue()
+            task = asyncio.create_task(generate_segment(text, voice, chunks, cancel_event))
+            generation_tasks.add(task)
+            task.add_done_callback(generation_tasks.discard)
+            outbox.put_nowait(("segment", (segment_count, text, chunks, cancel_event)))
+            segment_count += 1
+    
+    async def send_outbox():
+        while True:
+            item = await outbox.get()
+            if item is None:
+                return
+            kind, payload = item
+            if kind == "message":
+                await websocket.send_json(payload)
+                continue
+            
+            index, text, chunks, cancel = payload
+            started = False
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                # Audio of cancelled segments is drained without being sent
+                if cancel.is_set():
+                    continue
+                if isinstance(chunk, Exception):
+                    error = {"type": "error", "index": index, "detail": str(chunk)}
+                    if isinstance(chunk, AdmissionRejected):
+                        error["status"] = chunk.status_code
+                        error["retry_after"] = chunk.retry_after
+                    await websocket.send_json(error)
+                    continue
+                if not started:
+                    await websocket.send_json({"type": "segment_start", "index": index, "text": text})
+                    started = True
+                await websocket.send_bytes(chunk)
+            if started and not cancel.is_set():
+                await websocket.send_json({"type": "segment_end", "index": index})
+    
+    sender = asyncio.create_task(send_outbox())
+    await websocket.send_json({"type": "ready", "voice": voice, "sample_rate": SAMPLE_RATE, "format": "pcm_s16le"})
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            raw = message.get("text")
+            if raw is None:
+                continue
+            
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                data = {"type": "text", "text": raw}
+            
+            message_type = data.get("type", "text")
+            if message_type == "text":
+                queue_segments(segmenter.feed(str(data.get("text", ""))))
+            elif message_type == "config":
+                voice = data.get("voice", voice)
+            elif message_type == "flush":
+                queue_segments(segmenter.flush())
+            elif message_type == "cancel":
+                # Stop everything queued so far, later text starts fresh
+                segmenter.clear()
+                cancel_event.set()
+                cancel_event = threading.Event()
+                outbox.put_nowait(("message", {"type": "cancelled"}))
+            elif message_type == "end":
+                queue_segments(segmenter.flush())
+                outbox.put_nowait(("message", {"type": "done", "segments": segment_count}))
+                outbox.put_nowait(None)
+                await sender
+                await websocket.close()
+                return
+            else:
+                outbox.put_nowait(("message", {"type": "error", "detail": f"Unknown message type: {message_type}"}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Stop generating audio nobody will receive
+        cancel_event.set()
+        if not sender.done():
+            sender.cancel()
+
 @app.get("/v1/audio/voices")
 async def list_voices():
     """Return list of available voices"""
@@ -149,6 +554,7 @@ async def speak(request: Request):
     data = await request.json()
     text = data.get("text", "")
     voice = data.get("voice", DEFAULT_VOICE)
+    request.state.voice = voice
 
     if not text:
         return JSONResponse(
@@ -156,9 +562,6 @@ async def speak(request: Request):
             content={"error": "Missing 'text'"}
         )
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = f"outputs/{voice}_{timestamp}.wav"
-    
     # Check if we should use batched generation for longer texts
     use_batching = len(text) > 1000
     if use_batching:
@@ -166,21 +569,28 @@ async def speak(request: Request):
     
     # Generate speech with batching for longer texts
     start = time.time()
-    generate_speech_from_api(
-        prompt=text, 
-        voice=voice, 
-        output_file=output_path,
-        use_batching=use_batching,
-        max_batch_chars=1000
-    )
+    try:
+        generation, coalesced = start_generation(text, voice, use_batching)
+        request.state.coalesced = coalesced
+        result = await generation.wait()
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"error": e.detail},
+            headers=e.headers
+        )
     end = time.time()
     generation_time = round(end - start, 2)
+    
+    # These responses link to the file, so persist it
+    output_path = await save_output(result["audio"], voice)
 
     return JSONResponse(content={
         "status": "ok",
         "voice": voice,
         "output_file": output_path,
-        "generation_time": generation_time
+        "generation_time": generation_time,
+        "coalesced": coalesced
     })
 
 # Web UI routes
@@ -219,6 +629,10 @@ async def get_config():
     config = get_current_config()
     return JSONResponse(content=config)
 
+# Settings applied to new requests without a restart, all others are only read at startup
+LIVE_SETTINGS = set(runtime_config.RUNTIME_SETTINGS) | {"ORPHEUS_MODEL_NAME"}
+startup_env = dict(os.environ)
+
 @app.post("/save_config")
 async def save_config(request: Request):
     """Save configuration to .env file"""
@@ -242,7 +656,18 @@ async def save_config(request: Request):
         for key, value in data.items():
             f.write(f"{key}={value}\n")
     
-    return JSONResponse(content={"status": "ok", "message": "Configuration saved successfully. Restart server to apply changes."})
+    # Apply runtime settings to new requests right away; in-flight requests keep theirs.
+    # Other worker processes pick the change up from .env on their next request.
+    for key, value in data.items():
+        os.environ[key] = str(value)
+    runtime_config.update_config(data)
+    
+    restart_keys = [key for key in data if key not in LIVE_SETTINGS and data[key] != startup_env.get(key)]
+    if restart_keys:
+        message = f"Configuration saved and applied. Restart server to apply {', '.join(restart_keys)}."
+    else:
+        message = "Configuration saved and applied to new requests."
+    return JSONResponse(content={"status": "ok", "message": message, "restart_required": restart_keys})
 
 @app.post("/restart_server")
 async def restart_server():
@@ -306,6 +731,7 @@ async def generate_from_web(
     voice: str = Form(DEFAULT_VOICE)
 ):
     """Handle form submission from web UI"""
+    request.state.voice = voice
     if not text:
         return templates.TemplateResponse(
             "tts.html",
@@ -318,9 +744,6 @@ async def generate_from_web(
             }
         )
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = f"outputs/{voice}_{timestamp}.wav"
-    
     # Check if we should use batched generation for longer texts
     use_batching = len(text) > 1000
     if use_batching:
@@ -328,16 +751,29 @@ async def generate_from_web(
     
     # Generate speech with batching for longer texts
     start = time.time()
-    generate_speech_from_api(
-        prompt=text, 
-        voice=voice, 
-        output_file=output_path,
-        use_batching=use_batching,
-        max_batch_chars=1000
-    )
+    try:
+        generation, coalesced = start_generation(text, voice, use_batching)
+        request.state.coalesced = coalesced
+        result = await generation.wait()
+    except AdmissionRejected as e:
+        return templates.TemplateResponse(
+            "tts.html",
+            {
+                "request": request,
+                "error": e.detail,
+                "voices": AVAILABLE_VOICES,
+                "VOICE_TO_LANGUAGE": VOICE_TO_LANGUAGE,
+                "AVAILABLE_LANGUAGES": AVAILABLE_LANGUAGES
+            },
+            status_code=e.status_code,
+            headers=e.headers
+        )
     end = time.time()
     generation_time = round(end - start, 2)
     
+    # These responses link to the file, so persist it
+    output_path = await save_output(result["audio"], voice)
+    
     return templates.TemplateResponse(
         "tts.html",
         {
@@ -390,8 +826,14 @@ if __name__ == "__main__":
     else:
         print(f"🔗 Using LLM inference server at: {api_url}")
         
-    # Include restart.flag in the reload_dirs to monitor it for changes
-    extra_files = ["restart.flag"] if os.path.exists("restart.flag") else []
-    
-    # Start with reload enabled to allow automatic restart when restart.flag changes
-    uvicorn.run("app:app", host=host, port=port, reload=True, reload_dirs=["."], reload_includes=["*.py", "*.html", "restart.flag"])
+    # Production mode: pre-forked workers sharing the preloaded model, no reloader
+    if os.environ.get("ORPHEUS_RELOAD", "true").lower() in ("false", "0", "no", "off"):
+        from server import run_production_server
+        
+        run_production_server(app, host, port)
+    else:
+        # Include restart.flag in the reload_dirs to monitor it for changes
+        extra_files = ["restart.flag"] if os.path.exists("restart.flag") else []
+        
+        # Start with reload enabled to allow automatic restart when restart.flag changes
+        uvicorn.run("app:app", host=host, port=port, reload=True, reload_dirs=["."], reload_includes=["*.py", "*.html", "restart.flag"])
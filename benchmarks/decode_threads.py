@@ -0,0 +1,113 @@
+"""
+SNAC decode real-time factor across CPU thread splits.
+
+For every combination of decoder threads and simulated llama.cpp threads the
+script starts a fresh decoder process (ORPHEUS_TORCH_THREADS set, and
+ORPHEUS_CPU_AFFINITY when --pin is given) next to that many busy-looping
+processes standing in for llama.cpp, decodes a fixed number of audio windows
+and reports the real-time factor (decode time / audio duration, lower is
+better) and the spread of per-window decode times as a measure of jitter.
+
+With --pin the decoder gets the first N cores and the llama.cpp stand-ins the
+cores after them, which shows the effect of partitioning versus sharing.
+
+Usage:
+    python benchmarks/decode_threads.py --decode-threads 1 2 4 --llm-threads 0 4 [--pin]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import sys, time, json
+from tts_engine.speechpipe import load_model, convert_to_audio
+load_model()
+windows = int(sys.argv[1])
+codes = [100 + (i * 97) % 3900 for i in range(28)]
+convert_to_audio(codes, 28)
+times, samples = [], 0
+for _ in range(windows):
+    start = time.perf_counter()
+    audio = convert_to_audio(codes, 28)
+    times.append(time.perf_counter() - start)
+    samples += len(audio) // 2
+print("__result__", json.dumps({"times": times, "samples": samples}), flush=True)
+"""
+
+# Stand-in for a llama.cpp compute thread
+BUSY = "import sys, os\nif len(sys.argv) > 1: os.sched_setaffinity(0, [int(sys.argv[1])])\nwhile True: pass\n"
+
+SAMPLE_RATE = 24000
+
+def run_split(decode_threads, llm_threads, windows, pin):
+    """Decode windows with the given split and return the measured RTF and jitter"""
+    cpu_count = os.cpu_count() or 1
+    env = dict(os.environ, ORPHEUS_TORCH_THREADS=str(decode_threads), LLAMA_CPU_THREADS=str(llm_threads))
+    busy_cpus = [None] * llm_threads
+    if pin:
+        env["ORPHEUS_CPU_AFFINITY"] = f"0-{min(decode_threads, cpu_count) - 1}"
+        busy_cpus = [(decode_threads + i) % cpu_count for i in range(llm_threads)]
+    else:
+        env.pop("ORPHEUS_CPU_AFFINITY", None)
+
+    busy = [
+        subprocess.Popen([sys.executable, "-c", BUSY] + ([str(cpu)] if cpu is not None else []))
+        for cpu in busy_cpus
+    ]
+    try:
+        result = subprocess.run([sys.executable, "-c", CHILD, str(windows)], cwd=ROOT, env=env,
+                                capture_output=True, text=True)
+    finally:
+        for process in busy:
+            process.kill()
+            process.wait()
+
+    for line in result.stdout.splitlines():
+        if line.startswith("__result__"):
+            data = json.loads(line.split(" ", 1)[1])
+            break
+    else:
+        raise RuntimeError(f"Decoder process failed:\n{result.stderr[-2000:]}")
+
+    times = sorted(data["times"])
+    audio_seconds = data["samples"] / SAMPLE_RATE
+    return {
+        "decode_threads": decode_threads,
+        "llm_threads": llm_threads,
+        "pinned": pin,
+        "rtf": round(sum(times) / audio_seconds, 4) if audio_seconds else None,
+        "window_ms_p50": round(times[len(times) // 2] * 1000, 2),
+        "window_ms_p95": round(times[int(len(times) * 0.95)] * 1000, 2),
+        "window_ms_max": round(times[-1] * 1000, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep SNAC decode RTF across decoder/llama.cpp thread splits")
+    parser.add_argument("--decode-threads", type=int, nargs="+", default=[1, 2, 4],
+                        help="Decoder intra-op thread counts to try (default: 1 2 4)")
+    parser.add_argument("--llm-threads", type=int, nargs="+", default=[0],
+                        help="Busy threads simulating llama.cpp on the same host (default: 0)")
+    parser.add_argument("--windows", type=int, default=50, help="Audio windows decoded per run (default: 50)")
+    parser.add_argument("--pin", action="store_true",
+                        help="Pin the decoder and the llama.cpp stand-ins to disjoint cores")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs", file=sys.stderr)
+    results = []
+    for llm_threads in args.llm_threads:
+        for decode_threads in args.decode_threads:
+            start = time.time()
+            result = run_split(decode_threads, llm_threads, args.windows, args.pin)
+            print(f"decode={decode_threads} llm={llm_threads}: RTF {result['rtf']} "
+                  f"({time.time() - start:.1f}s)", file=sys.stderr)
+            results.append(result)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
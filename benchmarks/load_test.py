@@ -0,0 +1,275 @@
+"""
+HTTP load test for the FastAPI endpoints with concurrency and input-length sweeps.
+
+Runs closed-loop clients against /v1/audio/speech, /speak or the web form
+(POST /web/) for every combination of concurrency level and input-length mix,
+and reports for each step: throughput, latency percentiles, error and 429
+rates, and the server's CPU use and RSS. Plotting throughput and p95 latency
+against concurrency gives the capacity curve of a build.
+
+By default the script starts its own server backed by benchmarks/mock_llm.py,
+so no model or GPU is needed (set ORPHEUS_SNAC_PATH to exported weights to
+avoid the SNAC download). That server ignores .env, runs in a scratch
+directory that is removed afterwards (/speak and the web form write files),
+and the run fails if the mock didn't serve the requests. With --url it targets a running server instead; pass
+--server-pid to also sample that server's CPU and memory.
+
+Input-length mixes are comma-separated weights of the text profiles
+short (~100 chars), medium (~1 KB) and long (~10 KB narration), e.g.
+"short", "long" or "short=0.9,long=0.1".
+
+Usage:
+    python benchmarks/load_test.py --concurrency 1 2 4 8 --mix short "short=0.9,long=0.1" --duration 30
+    python benchmarks/load_test.py --url http://127.0.0.1:5005 --server-pid 1234 --endpoint speak
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import contextlib
+import statistics
+
+import psutil
+import requests
+
+from replay import start_mock, start_server, stop_server, mock_requests, check_mock_used
+
+SENTENCES = [
+    "The lighthouse keeper climbed the spiral stairs as the storm rolled in from the west.",
+    "Nobody in the village remembered a winter quite as long as that one.",
+    "She folded the letter twice, slipped it into her coat and stepped out into the rain.",
+    "Somewhere below, the engines changed pitch and the whole ship seemed to hold its breath.",
+    "By the time the train reached the coast, the sky had turned the colour of old pewter.",
+]
+
+# Approximate characters per text profile
+PROFILES = {"short": 100, "medium": 1000, "long": 10000}
+
+ENDPOINTS = ("speech", "speak", "web")
+
+def make_text(profile: str, rng: random.Random, request_id: int) -> str:
+    """Text of roughly the profile's length, unique per request so it isn't coalesced"""
+    target = PROFILES[profile]
+    parts = [f"Request {request_id}."]
+    length = len(parts[0])
+    while length < target:
+        sentence = rng.choice(SENTENCES)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)
+
+def parse_mix(spec: str) -> list:
+    """Parse "short=0.9,long=0.1" into [(profile, weight)]"""
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in PROFILES:
+            raise ValueError(f"Unknown text profile '{name}', use one of {', '.join(PROFILES)}")
+        mix.append((name, float(weight) if weight else 1.0))
+    return mix
+
+def send(session: requests.Session, url: str, endpoint: str, text: str, voice: str, timeout: float) -> dict:
+    """One request, return its status, latency and response size"""
+    start = time.perf_counter()
+    try:
+        if endpoint == "speech":
+            response = session.post(f"{url}/v1/audio/speech", json={"input": text, "voice": voice}, timeout=timeout)
+        elif endpoint == "speak":
+            response = session.post(f"{url}/speak", json={"text": text, "voice": voice}, timeout=timeout)
+        else:
+            response = session.post(f"{url}/web/", data={"text": text, "voice": voice}, timeout=timeout)
+        status = response.status_code
+        size = len(response.content)
+    except requests.exceptions.RequestException:
+        status = 0
+        size = 0
+    return {"status": status, "seconds": time.perf_counter() - start, "bytes": size}
+
+class ServerSampler:
+    """Sample a server process tree's CPU time and RSS while a step runs"""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.max_rss = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def processes(self) -> list:
+        try:
+            return [self.process] + self.process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return []
+
+    def cpu_seconds(self) -> float:
+        total = 0.0
+        for process in self.processes():
+            try:
+                times = process.cpu_times()
+                total += times.user + times.system
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    def rss(self) -> int:
+        total = 0
+        for process in self.processes():
+            try:
+                total += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    def run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            self.max_rss = max(self.max_rss, self.rss())
+
+    def __enter__(self):
+        self.cpu_start = self.cpu_seconds()
+        self.wall_start = time.perf_counter()
+        self.max_rss = self.rss()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+        self.cpu_used = self.cpu_seconds() - self.cpu_start
+        self.wall = time.perf_counter() - self.wall_start
+
+def percentile(values: list, fraction: float):
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(len(values) * fraction))], 3)
+
+def run_step(url, endpoint, concurrency, mix, args, server_pid) -> dict:
+    """Run closed-loop clients for one step and summarize the results"""
+    results = []
+    lock = threading.Lock()
+    counter = iter(range(10 ** 9))
+    deadline = time.perf_counter() + args.duration
+    profiles, weights = zip(*mix)
+
+    def client(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            with lock:
+                request_id = next(counter)
+            profile = rng.choices(profiles, weights)[0]
+            result = send(session, url, endpoint, make_text(profile, rng, request_id), args.voice, args.timeout)
+            result["profile"] = profile
+            with lock:
+                results.append(result)
+
+    sampler = ServerSampler(server_pid) if server_pid else None
+    with sampler or contextlib.nullcontext():
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(seed,)) for seed in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+    ok = [r for r in results if r["status"] == 200]
+    latencies = sorted(r["seconds"] for r in ok)
+    step = {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "mix": ",".join(f"{name}={weight:g}" for name, weight in mix),
+        "requests": len(results),
+        "seconds": round(wall, 2),
+        "throughput_rps": round(len(ok) / wall, 3) if wall else 0.0,
+        "latency_seconds": {
+            "p50": round(statistics.median(latencies), 3) if latencies else None,
+            "p90": percentile(latencies, 0.90),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": round(latencies[-1], 3) if latencies else None,
+        },
+        "error_rate": round(sum(1 for r in results if r["status"] not in (200, 429)) / len(results), 4) if results else 0.0,
+        "rejected_429_rate": round(sum(1 for r in results if r["status"] == 429) / len(results), 4) if results else 0.0,
+        "by_profile": {
+            profile: {
+                "requests": sum(1 for r in results if r["profile"] == profile),
+                "p50_seconds": round(statistics.median(
+                    [r["seconds"] for r in ok if r["profile"] == profile]), 3)
+                if any(r["profile"] == profile for r in ok) else None,
+            }
+            for profile in profiles
+        },
+    }
+    if endpoint == "speech" and ok:
+        # The WAV body is 16-bit mono audio behind a 44-byte header
+        audio_seconds = sum(max(0, r["bytes"] - 44) for r in ok) / 2 / 24000
+        step["audio_seconds_per_second"] = round(audio_seconds / wall, 3)
+    if sampler:
+        step["server_cpu_percent"] = round(sampler.cpu_used / sampler.wall * 100, 1)
+        step["server_max_rss_mb"] = round(sampler.max_rss / (1024 * 1024), 1)
+    return step
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the TTS HTTP endpoints")
+    parser.add_argument("--url", type=str, help="Target a running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="PID of the --url server, to sample its CPU and RSS")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, nargs="+", default=["speech"],
+                        help="Endpoints to test (default: speech)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Concurrent clients per step (default: 1 2 4 8)")
+    parser.add_argument("--mix", type=str, nargs="+", default=["short"],
+                        help="Input-length mixes, e.g. short or short=0.9,long=0.1 (default: short)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per step (default: 30)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Request timeout in seconds (default: 600)")
+    parser.add_argument("--voice", type=str, default="tara")
+    parser.add_argument("--output", type=str, help="Also write the JSON report to this file")
+    # Mock LLM settings when the script starts its own server
+    parser.add_argument("--frames", type=int, default=300, help="Frames per mock stream (default: 300)")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0,
+                        help="Mock replay rate per request (default: 100)")
+    parser.add_argument("--chunk-tokens", type=int, default=1, help="Tokens per mock SSE event (default: 1)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mock chunk delay jitter (default: 0)")
+    parser.add_argument("--streams", type=str, help="Recorded token streams for the mock")
+    args = parser.parse_args()
+
+    mixes = [parse_mix(spec) for spec in args.mix]
+    mock = server = None
+    try:
+        if args.url:
+            url, server_pid = args.url.rstrip("/"), args.server_pid
+        else:
+            mock, api_url = start_mock(args)
+            server, url = start_server(dict(os.environ, ORPHEUS_API_URL=api_url))
+            server_pid = server.pid
+            served_before = mock_requests(api_url)
+
+        steps = []
+        for endpoint in args.endpoint:
+            for mix in mixes:
+                for concurrency in args.concurrency:
+                    step = run_step(url, endpoint, concurrency, mix, args, server_pid)
+                    steps.append(step)
+                    print(f"{endpoint} c={concurrency} {step['mix']}: {step['throughput_rps']} req/s, "
+                          f"p95 {step['latency_seconds']['p95']}s, errors {step['error_rate']:.1%}, "
+                          f"429 {step['rejected_429_rate']:.1%}", file=sys.stderr)
+        if mock is not None and any(step["throughput_rps"] for step in steps):
+            check_mock_used(api_url, served_before)
+    finally:
+        if server is not None:
+            stop_server(server)
+        if mock is not None:
+            mock.terminate()
+            mock.wait()
+
+    output = json.dumps({"url": url, "steps": steps}, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
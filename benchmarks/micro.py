@@ -0,0 +1,222 @@
+"""
+Micro-benchmarks for the hot functions of the TTS pipeline, with a regression gate.
+
+Each benchmark is calibrated so that one round takes at least --min-round-time,
+then timed over several rounds; the median time per call is what gets compared.
+Results can be saved as a baseline, and later runs fail (exit code 1) when a
+benchmark is slower than its baseline by more than --threshold percent.
+
+Baselines are only comparable on the same machine and dependency versions, so
+the baseline records both and a mismatch is reported.
+
+Usage:
+    python benchmarks/micro.py --save                  # record benchmarks/micro_baseline.json
+    python benchmarks/micro.py --threshold 10          # compare against it
+    python benchmarks/micro.py --filter convert_to_audio
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import wave
+import platform
+import argparse
+import tempfile
+import statistics
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "micro_baseline.json")
+
+def token_strings(frames: int):
+    """Synthetic completion text for frames of 7 audio tokens each"""
+    return [
+        f"<custom_token_{10 + slot * 4096 + (frame * 131 + slot * 17) % 4096}>"
+        for frame in range(frames)
+        for slot in range(7)
+    ]
+
+def codes(count: int):
+    return [(i * 97) % 4096 for i in range(count)]
+
+def bench_turn_token_into_id(cached: bool):
+    def setup():
+        from tts_engine import speechpipe
+        tokens = token_strings(1000)
+
+        def run():
+            if not cached:
+                # The 7000 keys fit in the cache, so without this every timed call would be all hits
+                speechpipe.token_id_cache.clear()
+            for index, token in enumerate(tokens):
+                speechpipe.turn_token_into_id(token, index)
+        return run
+    return setup
+
+def bench_convert_to_audio(window: int):
+    def setup():
+        from tts_engine.speechpipe import load_model, convert_to_audio
+        load_model()
+        frame = codes(window)
+        return lambda: convert_to_audio(frame, window)
+    return setup
+
+def bench_split_text_into_sentences():
+    from tts_engine.inference import split_text_into_sentences
+    sentence = "This is a sentence, with a clause; and another one! Is it a question? Yes. "
+    text = sentence * 1500  # about 110 KB
+
+    return lambda: split_text_into_sentences(text)
+
+def bench_stitch_wav_files():
+    from tts_engine.inference import stitch_wav_files
+    directory = tempfile.mkdtemp(prefix="micro_stitch_")
+    segment = b"".join(((i * 37) % 2000 - 1000).to_bytes(2, "little", signed=True) for i in range(24000))
+    files = []
+    for i in range(100):
+        path = os.path.join(directory, f"segment_{i}.wav")
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(24000)
+            wav.writeframes(segment)
+        files.append(path)
+    output = os.path.join(directory, "stitched.wav")
+
+    return lambda: stitch_wav_files(files, output)
+
+def bench_tokens_decoder():
+    from tts_engine.speechpipe import load_model
+    from tts_engine.inference import tokens_decoder_sync
+    load_model()
+    tokens = token_strings(21)
+
+    return lambda: tokens_decoder_sync(iter(tokens))
+
+BENCHMARKS = {
+    "turn_token_into_id_7000_uncached": bench_turn_token_into_id(cached=False),
+    "turn_token_into_id_7000_cached": bench_turn_token_into_id(cached=True),
+    "convert_to_audio_7": bench_convert_to_audio(7),
+    "convert_to_audio_28": bench_convert_to_audio(28),
+    "convert_to_audio_49": bench_convert_to_audio(49),
+    "split_text_into_sentences_110kb": bench_split_text_into_sentences,
+    "stitch_wav_files_100x1s": bench_stitch_wav_files,
+    "tokens_decoder_21_frames": bench_tokens_decoder,
+}
+
+def measure(func, rounds: int, min_round_time: float) -> dict:
+    """Time func, return per-call statistics in seconds"""
+    # Warm up, then find how many calls make a round long enough to time reliably
+    func()
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_time:
+            break
+        iterations *= 2 if elapsed == 0 else max(2, min(10, int(min_round_time / elapsed) + 1))
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - start) / iterations)
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": rounds,
+        "iterations": iterations,
+    }
+
+def environment() -> dict:
+    """What the results depend on besides the code"""
+    info = {"python": platform.python_version(), "machine": platform.machine(),
+            "processor": platform.processor(), "cpus": os.cpu_count()}
+    try:
+        import torch
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return info
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return (name, change in percent) for benchmarks slower than the threshold allows"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline.get("results", {}):
+            continue
+        before = baseline["results"][name]["median"]
+        change = (result["median"] - before) / before * 100 if before else 0.0
+        result["baseline_median"] = before
+        result["change_percent"] = round(change, 1)
+        if change > threshold:
+            regressions.append((name, change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks with a regression gate")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE,
+                        help="Baseline file (default: benchmarks/micro_baseline.json)")
+    parser.add_argument("--save", action="store_true", help="Save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Allowed slowdown of the median in percent (default: 10)")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per benchmark (default: 7)")
+    parser.add_argument("--min-round-time", type=float, default=0.2,
+                        help="Minimum seconds per round (default: 0.2)")
+    parser.add_argument("--filter", type=str, default="", help="Only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        # The engine logs every decode, keep the output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            func = setup()
+            results[name] = measure(func, args.rounds, args.min_round_time)
+        print(f"{name}: {results[name]['median'] * 1000:.3f} ms median "
+              f"(stdev {results[name]['stdev'] * 1000:.3f} ms)", file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+
+    if args.save:
+        # Keep baselines of benchmarks that weren't run this time
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r") as f:
+                report["results"] = {**json.load(f).get("results", {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        print(json.dumps(report, indent=2))
+        return
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != report["environment"]:
+            print("Warning: baseline was recorded in a different environment, comparisons may be off",
+                  file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold)
+    else:
+        print(f"No baseline at {args.baseline}, run with --save to create one", file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+    for name, change in regressions:
+        print(f"REGRESSION: {name} is {change:.1f}% slower than the baseline (threshold {args.threshold}%)",
+              file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
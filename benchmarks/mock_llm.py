@@ -0,0 +1,241 @@
+"""
+Mock llama.cpp server that replays Orpheus token streams.
+
+Serves the endpoints the TTS engine talks to, so the pipeline can be measured
+without a model or GPU:
+
+- POST /v1/completions: OpenAI-compatible SSE stream of <custom_token_N> text
+- POST /completion: llama.cpp native SSE stream of token IDs (return_tokens)
+- POST /tokenize: stand-in tokenizer for ORPHEUS_TOKEN_MODE=ids
+- GET /stats: number of completions served, so benchmarks can check they hit the mock
+
+Streams are replayed from a recording (JSON lines of {"tokens": [token IDs]})
+or generated synthetically, at a configurable rate, chunk size and jitter.
+Every response ends with llama.cpp-style timings.
+
+Serve:
+    python benchmarks/mock_llm.py serve --port 5006 --tokens-per-second 100 [--streams streams.jsonl]
+
+Record streams from a real server (uses ORPHEUS_API_URL and ORPHEUS_TOKEN_MODE):
+    python benchmarks/mock_llm.py record --output streams.jsonl --text "Hello there." --voice tara
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# <custom_token_N> has token ID CUSTOM_TOKEN_BASE + N, audio codes start at N = 10
+CUSTOM_TOKEN_BASE = 128256
+AUDIO_TOKEN_OFFSET = 10
+
+# Token that ends an Orpheus audio stream
+END_OF_SPEECH_ID = 128258
+
+def synthetic_stream(frames: int, seed: int = 0) -> List[int]:
+    """Token IDs for frames of 7 random but valid audio codes each"""
+    rng = random.Random(seed)
+    return [
+        CUSTOM_TOKEN_BASE + AUDIO_TOKEN_OFFSET + slot * 4096 + rng.randint(0, 4095)
+        for _ in range(frames)
+        for slot in range(7)
+    ]
+
+def load_streams(path: str) -> List[List[int]]:
+    """Read recorded streams, one {"tokens": [...]} object per line"""
+    streams = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                streams.append([int(token) for token in json.loads(line)["tokens"]])
+    if not streams:
+        raise ValueError(f"No streams in {path}")
+    return streams
+
+class ReplaySettings:
+    """Streams and pacing shared by all request handlers"""
+
+    def __init__(self, streams: List[List[int]], tokens_per_second: float, chunk_tokens: int,
+                 jitter: float, first_token_delay: float, prompt_ms: float):
+        self.streams = streams
+        self.tokens_per_second = tokens_per_second
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.jitter = jitter
+        self.first_token_delay = first_token_delay
+        self.prompt_ms = prompt_ms
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def next_stream(self) -> List[int]:
+        """Hand out the streams round-robin"""
+        with self.lock:
+            stream = self.streams[self.requests % len(self.streams)]
+            self.requests += 1
+        return stream
+
+    def chunk_delay(self, tokens: int) -> float:
+        """Time to wait before sending a chunk of tokens"""
+        if self.tokens_per_second <= 0:
+            return 0.0
+        delay = tokens / self.tokens_per_second
+        if self.jitter:
+            delay *= max(0.0, 1.0 + random.uniform(-self.jitter, self.jitter))
+        return delay
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    settings: ReplaySettings = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def send_json(self, data: dict) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_event(self, data) -> None:
+        self.wfile.write(f"data: {json.dumps(data) if not isinstance(data, str) else data}\n\n".encode())
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path != "/stats":
+            self.send_error(404)
+            return
+        self.send_json({"requests": self.settings.requests})
+
+    def do_POST(self):
+        body = self.read_json()
+        if self.path == "/tokenize":
+            # Any stable IDs will do, the mock ignores the prompt
+            self.send_json({"tokens": [128000] + [ord(c) % 128000 for c in body.get("content", "")]})
+            return
+        if self.path not in ("/v1/completions", "/completions", "/completion"):
+            self.send_error(404)
+            return
+
+        native = self.path == "/completion"
+        limit = body.get("n_predict" if native else "max_tokens") or None
+        stream = self.settings.next_stream()[:limit]
+
+        # Non-streaming requests (warm-up priming) get a single short answer
+        if not body.get("stream", False):
+            self.send_json({"choices": [{"text": ""}], "content": "", "timings": self.timings(0)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            self.replay(stream, native)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled the generation
+            pass
+
+    def timings(self, predicted: int) -> dict:
+        return {"prompt_n": 12, "cache_n": 0, "prompt_ms": self.settings.prompt_ms, "predicted_n": predicted}
+
+    def replay(self, stream: List[int], native: bool) -> None:
+        settings = self.settings
+        time.sleep(settings.first_token_delay + settings.prompt_ms / 1000)
+        for start in range(0, len(stream), settings.chunk_tokens):
+            chunk = stream[start:start + settings.chunk_tokens]
+            time.sleep(settings.chunk_delay(len(chunk)))
+            if native:
+                self.send_event({"content": "", "tokens": chunk, "stop": False})
+            else:
+                text = "".join(f"<custom_token_{token - CUSTOM_TOKEN_BASE}>" for token in chunk)
+                self.send_event({"choices": [{"text": text}]})
+
+        if native:
+            self.send_event({"content": "", "tokens": [END_OF_SPEECH_ID], "stop": True,
+                             "timings": self.timings(len(stream))})
+        else:
+            self.send_event({"choices": [{"text": "", "finish_reason": "stop"}],
+                             "timings": self.timings(len(stream))})
+            self.send_event("[DONE]")
+
+def serve(port: int, settings: ReplaySettings, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Create the mock server (call serve_forever on it, or run it in a thread)"""
+    handler = type("Handler", (ReplayHandler,), {"settings": settings})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def record(output: str, texts: List[str], voice: str) -> None:
+    """Record the token streams a real server produces for texts"""
+    sys.path.insert(0, ROOT)
+    from tts_engine.inference import generate_tokens_from_api
+
+    with open(output, "a") as f:
+        for text in texts:
+            tokens = []
+            for token in generate_tokens_from_api(prompt=text, voice=voice):
+                if isinstance(token, int):
+                    tokens.append(token)
+                else:
+                    # Text mode yields <custom_token_N> strings
+                    tokens.extend(CUSTOM_TOKEN_BASE + int(n) for n in re.findall(r"custom_token_(\d+)", token))
+            # Keep audio tokens only, the mock appends its own end of speech
+            tokens = [token for token in tokens if token >= CUSTOM_TOKEN_BASE + AUDIO_TOKEN_OFFSET]
+            f.write(json.dumps({"text": text, "voice": voice, "tokens": tokens}) + "\n")
+            print(f"Recorded {len(tokens)} tokens for '{text[:40]}'", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock llama.cpp server replaying Orpheus token streams")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve recorded or synthetic streams")
+    serve_parser.add_argument("--host", type=str, default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=5006)
+    serve_parser.add_argument("--streams", type=str, help="Recorded streams (JSON lines), synthetic if omitted")
+    serve_parser.add_argument("--frames", type=int, default=300,
+                              help="Frames per synthetic stream, 7 tokens each (default: 300, about 3.5s of audio)")
+    serve_parser.add_argument("--tokens-per-second", type=float, default=100.0,
+                              help="Replay rate, 0 for as fast as possible (default: 100)")
+    serve_parser.add_argument("--chunk-tokens", type=int, default=1, help="Tokens per SSE event (default: 1)")
+    serve_parser.add_argument("--jitter", type=float, default=0.0,
+                              help="Random +/- fraction applied to each chunk delay (default: 0)")
+    serve_parser.add_argument("--first-token-delay", type=float, default=0.0,
+                              help="Extra seconds before the first token (default: 0)")
+    serve_parser.add_argument("--prompt-ms", type=float, default=20.0,
+                              help="Simulated prompt evaluation time in ms (default: 20)")
+
+    record_parser = subparsers.add_parser("record", help="Record streams from the server at ORPHEUS_API_URL")
+    record_parser.add_argument("--output", type=str, required=True)
+    record_parser.add_argument("--text", type=str, nargs="+", required=True)
+    record_parser.add_argument("--voice", type=str, default="tara")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.output, args.text, args.voice)
+        return
+
+    streams = load_streams(args.streams) if args.streams else [synthetic_stream(args.frames, seed) for seed in range(4)]
+    settings = ReplaySettings(streams, args.tokens_per_second, args.chunk_tokens, args.jitter,
+                              args.first_token_delay, args.prompt_ms)
+    server = serve(args.port, settings, args.host)
+    print(f"Mock llama.cpp server on {args.host}:{args.port} replaying {len(streams)} streams", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
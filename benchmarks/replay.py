@@ -0,0 +1,298 @@
+"""
+Offline replay benchmark for the TTS pipeline.
+
+Starts benchmarks/mock_llm.py as the LLM backend, then drives one of the
+pipeline's entry points against it and reports machine-readable JSON:
+
+- engine: generate_speech_from_api in a fresh process
+- http: POST /v1/audio/speech with streaming against a uvicorn server
+- ws: the /v1/audio/speech/ws streaming endpoint against a uvicorn server
+
+For every target the report has time to first audio (TTFB), the real-time
+factor (generation time / audio duration, lower is better), CPU seconds spent
+by the pipeline process per second of audio and its peak RSS. The mock's own
+CPU time is not counted.
+
+Needs no GPU or model download when ORPHEUS_SNAC_PATH points to exported
+SNAC weights (see python -m tts_engine.snac_weights).
+
+Usage:
+    python benchmarks/replay.py --target engine --runs 5
+    python benchmarks/replay.py --target http --concurrency 4 --tokens-per-second 300 --jitter 0.3
+    python benchmarks/replay.py --target ws --streams streams.jsonl --chunk-tokens 7
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 24000
+WAV_HEADER_BYTES = 44
+
+TEXT = ("The quick brown fox jumps over the lazy dog. "
+        "She sells sea shells by the sea shore, and the shells she sells are sea shells for sure.")
+
+ENGINE_CHILD = """
+import sys, json, time, resource
+from tts_engine import generate_speech_from_api, load_model
+load_model()
+text, voice, runs = sys.argv[1], sys.argv[2], int(sys.argv[3])
+results = []
+for _ in range(runs):
+    first = []
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    segments = generate_speech_from_api(prompt=text, voice=voice,
+                                        on_audio_chunk=lambda chunk: first or first.append(time.perf_counter()))
+    end = time.perf_counter()
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    results.append({
+        "ttfb": first[0] - start if first else None,
+        "seconds": end - start,
+        "audio_seconds": sum(len(s) for s in segments) / 2 / 24000,
+        "cpu_seconds": (after.ru_utime + after.ru_stime) - (usage.ru_utime + usage.ru_stime),
+    })
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print("__result__", json.dumps({"runs": results, "peak_rss_mb": peak}), flush=True)
+"""
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for(check, timeout: float, what: str) -> None:
+    """Poll check() until it returns True"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if check():
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{what} did not start within {timeout}s")
+
+def start_mock(args) -> Tuple[subprocess.Popen, str]:
+    """Start the mock LLM server, return the process and its completions URL"""
+    port = free_port()
+    command = [sys.executable, os.path.join(ROOT, "benchmarks", "mock_llm.py"), "serve", "--port", str(port),
+               "--tokens-per-second", str(args.tokens_per_second), "--chunk-tokens", str(args.chunk_tokens),
+               "--jitter", str(args.jitter), "--frames", str(args.frames)]
+    if args.streams:
+        command += ["--streams", args.streams]
+    process = subprocess.Popen(command, stderr=subprocess.DEVNULL)
+
+    def listening():
+        with socket.create_connection(("127.0.0.1", port), timeout=1):
+            return True
+    wait_for(listening, 10, "Mock LLM server")
+    return process, f"http://127.0.0.1:{port}/v1/completions"
+
+def mock_requests(api_url: str) -> int:
+    """Completions the mock LLM server has served so far"""
+    import requests
+
+    return requests.get(api_url.rsplit("/v1/", 1)[0] + "/stats", timeout=5).json()["requests"]
+
+def start_server(env: dict) -> Tuple[subprocess.Popen, str]:
+    """
+    Start app.py's server on a free port, return the process and its URL
+
+    The server runs with ORPHEUS_DOTENV=false, so a .env in the checkout can't
+    replace the mock's ORPHEUS_API_URL, and in a scratch directory, so the files
+    it writes to outputs/ stay out of the checkout. Stop it with stop_server.
+    """
+    import requests
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    workdir = tempfile.mkdtemp(prefix="orpheus_bench_")
+    for name in ("static", "templates"):
+        os.symlink(os.path.join(ROOT, name), os.path.join(workdir, name))
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "app:app", "--app-dir", ROOT, "--port", str(port)],
+                              cwd=workdir, env=dict(env, ORPHEUS_DOTENV="false"),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    server.workdir = workdir
+    try:
+        wait_for(lambda: requests.get(f"{url}/ready", timeout=1).status_code == 200, 300, "TTS server")
+    except BaseException:
+        stop_server(server)
+        raise
+    return server, url
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    server.wait()
+    shutil.rmtree(server.workdir, ignore_errors=True)
+
+def check_mock_used(api_url: str, served_before: int = 0) -> None:
+    """Fail when the server answered requests without asking the mock"""
+    if mock_requests(api_url) <= served_before:
+        raise RuntimeError("The mock LLM server received no requests, the TTS server used another backend")
+
+def peak_rss_mb(pid: int) -> float:
+    """Peak resident set size of a running process (Linux)"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def run_engine(args, env) -> dict:
+    """Generate speech in a fresh process and return its measurements"""
+    result = subprocess.run([sys.executable, "-c", ENGINE_CHILD, args.text, args.voice, str(args.runs)],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith("__result__"):
+            return json.loads(line.split(" ", 1)[1])
+    raise RuntimeError(f"Engine process failed:\n{result.stderr[-2000:]}")
+
+def http_request(url: str, text: str, voice: str) -> dict:
+    """One streaming /v1/audio/speech request"""
+    import requests
+
+    start = time.perf_counter()
+    first = None
+    received = 0
+    with requests.post(f"{url}/v1/audio/speech", json={"input": text, "voice": voice, "stream": True},
+                       stream=True, timeout=600) as response:
+        if response.status_code != 200:
+            return {"status": response.status_code}
+        for chunk in response.iter_content(chunk_size=None):
+            received += len(chunk)
+            if first is None and received > WAV_HEADER_BYTES:
+                first = time.perf_counter()
+    return {
+        "status": 200,
+        "ttfb": first - start if first else None,
+        "seconds": time.perf_counter() - start,
+        "audio_seconds": max(0, received - WAV_HEADER_BYTES) / 2 / SAMPLE_RATE,
+    }
+
+def ws_request(url: str, text: str, voice: str) -> dict:
+    """Send text to the WebSocket endpoint word by word and receive all audio"""
+    from websockets.sync.client import connect
+
+    start = time.perf_counter()
+    first = None
+    received = 0
+    with connect(f"{url.replace('http', 'ws', 1)}/v1/audio/speech/ws?voice={voice}", max_size=None) as ws:
+        for word in text.split(" "):
+            ws.send(json.dumps({"type": "text", "text": word + " "}))
+        ws.send(json.dumps({"type": "end"}))
+        for message in ws:
+            if isinstance(message, bytes):
+                received += len(message)
+                if first is None:
+                    first = time.perf_counter()
+                continue
+            data = json.loads(message)
+            if data.get("type") == "error":
+                return {"status": data.get("status", 500)}
+            if data.get("type") == "done":
+                break
+    return {
+        "status": 200,
+        "ttfb": first - start if first else None,
+        "seconds": time.perf_counter() - start,
+        "audio_seconds": received / 2 / SAMPLE_RATE,
+    }
+
+def run_server(args, env) -> dict:
+    """Start the app against the mock and send requests to it"""
+    import psutil
+
+    server, url = start_server(env)
+    try:
+        served_before = mock_requests(env["ORPHEUS_API_URL"])
+        process = psutil.Process(server.pid)
+        send = http_request if args.target == "http" else ws_request
+        cpu_before = sum(process.cpu_times()[:2])
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            runs = list(pool.map(lambda _: send(url, args.text, args.voice), range(args.runs)))
+        cpu_seconds = sum(process.cpu_times()[:2]) - cpu_before
+        check_mock_used(env["ORPHEUS_API_URL"], served_before)
+        return {"runs": runs, "cpu_seconds": cpu_seconds, "peak_rss_mb": peak_rss_mb(server.pid)}
+    finally:
+        stop_server(server)
+
+def percentiles(values) -> dict:
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return {}
+    return {
+        "p50": round(statistics.median(values), 4),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 4),
+        "max": round(values[-1], 4),
+    }
+
+def summarize(args, measured: dict) -> dict:
+    """Aggregate per-run measurements into the report"""
+    runs = measured["runs"]
+    ok = [run for run in runs if run.get("status", 200) == 200]
+    audio_seconds = sum(run["audio_seconds"] for run in ok)
+    cpu_seconds = measured.get("cpu_seconds", sum(run.get("cpu_seconds", 0) for run in ok))
+    return {
+        "target": args.target,
+        "settings": {
+            "runs": args.runs,
+            "concurrency": args.concurrency if args.target != "engine" else 1,
+            "tokens_per_second": args.tokens_per_second,
+            "chunk_tokens": args.chunk_tokens,
+            "jitter": args.jitter,
+            "streams": args.streams or f"synthetic ({args.frames} frames)",
+            "text_chars": len(args.text),
+        },
+        "requests": len(runs),
+        "errors": len(runs) - len(ok),
+        "audio_seconds_total": round(audio_seconds, 3),
+        "ttfb_seconds": percentiles(run["ttfb"] for run in ok),
+        "rtf": percentiles(run["seconds"] / run["audio_seconds"] for run in ok if run["audio_seconds"]),
+        "cpu_seconds_per_audio_second": round(cpu_seconds / audio_seconds, 4) if audio_seconds else None,
+        "peak_rss_mb": round(measured["peak_rss_mb"], 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the TTS pipeline against a replaying mock LLM server")
+    parser.add_argument("--target", choices=["engine", "http", "ws"], default="engine")
+    parser.add_argument("--runs", type=int, default=5, help="Requests to measure (default: 5)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent requests for http/ws (default: 1)")
+    parser.add_argument("--text", type=str, default=TEXT, help="Input text for every request")
+    parser.add_argument("--voice", type=str, default="tara")
+    parser.add_argument("--streams", type=str, help="Recorded token streams for the mock (JSON lines)")
+    parser.add_argument("--frames", type=int, default=300, help="Frames per synthetic stream (default: 300)")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0,
+                        help="Mock replay rate, 0 for unthrottled (default: 100)")
+    parser.add_argument("--chunk-tokens", type=int, default=1, help="Tokens per SSE event (default: 1)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- fraction on chunk delays (default: 0)")
+    parser.add_argument("--output", type=str, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    mock, api_url = start_mock(args)
+    env = dict(os.environ, ORPHEUS_API_URL=api_url)
+    try:
+        measured = run_engine(args, env) if args.target == "engine" else run_server(args, env)
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    report = summarize(args, measured)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
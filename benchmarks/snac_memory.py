@@ -0,0 +1,83 @@
+"""
+SNAC startup time and per-process memory with several processes on one host.
+
+Starts N processes that each load SNAC (from ORPHEUS_SNAC_PATH when set, so the
+weights are memory-mapped) and decode one audio window, then measures every
+process while they are all alive. RSS counts shared pages in every process;
+PSS splits them between the processes sharing them and USS counts only
+private memory, so the saving from shared weights shows up in PSS and USS.
+
+Usage:
+    ORPHEUS_SNAC_PATH=models/snac_24khz python benchmarks/snac_memory.py --processes 1 4
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+from tts_engine.speechpipe import load_model, convert_to_audio
+load_model()
+loaded = time.perf_counter() - start
+convert_to_audio([100 + i for i in range(28)], 28)
+print(f"__timing__ {loaded} {time.perf_counter() - start}", flush=True)
+sys.stdin.read()
+"""
+
+MB = 1024 * 1024
+
+def measure(count):
+    """Start count loader processes and measure them once all are ready"""
+    processes = [
+        subprocess.Popen([sys.executable, "-c", CHILD], cwd=ROOT, stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for _ in range(count)
+    ]
+    try:
+        timings = []
+        for process in processes:
+            # The engine logs to stdout, so skip ahead to the timing line
+            for line in process.stdout:
+                if line.startswith("__timing__"):
+                    _, load, first = line.split()
+                    timings.append((float(load), float(first)))
+                    break
+            else:
+                raise RuntimeError("A loader process failed, run it directly to see the error")
+
+        memory = [psutil.Process(process.pid).memory_full_info() for process in processes]
+        return {
+            "processes": count,
+            "load_seconds_max": round(max(load for load, _ in timings), 3),
+            "first_audio_seconds_max": round(max(first for _, first in timings), 3),
+            "rss_mb_per_process": round(sum(m.rss for m in memory) / count / MB, 1),
+            "pss_mb_per_process": round(sum(getattr(m, "pss", 0) for m in memory) / count / MB, 1),
+            "uss_mb_per_process": round(sum(m.uss for m in memory) / count / MB, 1),
+            "pss_mb_total": round(sum(getattr(m, "pss", 0) for m in memory) / MB, 1),
+        }
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure SNAC load time and memory across processes")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4],
+                        help="Process counts to measure (default: 1 4)")
+    args = parser.parse_args()
+
+    print(f"ORPHEUS_SNAC_PATH={os.environ.get('ORPHEUS_SNAC_PATH', '') or '(unset, loading from the hub)'}",
+          file=sys.stderr)
+    results = [measure(count) for count in args.processes]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
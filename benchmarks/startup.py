@@ -0,0 +1,111 @@
+"""
+Startup-time benchmark for the TTS engine.
+
+Each stage runs in a fresh Python process so nothing is cached between
+measurements:
+
+- voices: import tts_engine.voices (voice metadata only)
+- package: import tts_engine
+- app: import the FastAPI app module
+- first_audio: import tts_engine, load SNAC and decode the first audio window
+
+With --url the script also starts the server, waits for /ready and times the
+first /v1/audio/speech request (this needs a running LLM backend).
+
+Usage:
+    python benchmarks/startup.py [--runs 3] [--url http://127.0.0.1:5005]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = {
+    "voices": "import tts_engine.voices",
+    "package": "import tts_engine",
+    "app": "import app",
+    "first_audio": (
+        "import tts_engine\n"
+        "from tts_engine.speechpipe import convert_to_audio\n"
+        "convert_to_audio([100 + i for i in range(28)], 28)"
+    ),
+}
+
+def time_stage(code):
+    """Run code in a fresh interpreter and return its wall time in seconds"""
+    script = (
+        "import time\n"
+        "_start = time.perf_counter()\n"
+        f"{code}\n"
+        "print('__elapsed__', time.perf_counter() - _start)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith("__elapsed__"):
+            return float(line.split()[1])
+    raise RuntimeError(f"Stage failed:\n{result.stderr[-2000:]}")
+
+def time_first_request(url, timeout=300):
+    """Start the server, then time readiness and the first speech request"""
+    import requests
+    from urllib.parse import urlparse
+
+    port = urlparse(url).port or 5005
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ready_at = None
+        while time.perf_counter() - start < timeout:
+            try:
+                if requests.get(f"{url}/ready", timeout=1).status_code == 200:
+                    ready_at = time.perf_counter() - start
+                    break
+            except requests.exceptions.ConnectionError:
+                pass
+            time.sleep(0.1)
+        if ready_at is None:
+            raise RuntimeError(f"Server did not become ready within {timeout}s")
+
+        request_start = time.perf_counter()
+        response = requests.post(f"{url}/v1/audio/speech", json={"input": "Hello there, this is a test."}, timeout=timeout)
+        response.raise_for_status()
+        return {
+            "ready_seconds": round(ready_at, 3),
+            "first_request_seconds": round(time.perf_counter() - request_start, 3),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import and first-request latency")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per stage (default: 3)")
+    parser.add_argument("--url", type=str, help="Also time server readiness and the first request on this URL")
+    args = parser.parse_args()
+
+    report = {}
+    for name, code in STAGES.items():
+        times = [time_stage(code) for _ in range(args.runs)]
+        report[name] = {
+            "median_seconds": round(statistics.median(times), 3),
+            "min_seconds": round(min(times), 3),
+            "max_seconds": round(max(times), 3),
+        }
+        print(f"{name}: {report[name]['median_seconds']:.3f}s median over {args.runs} runs", file=sys.stderr)
+
+    if args.url:
+        report["server"] = time_first_request(args.url.rstrip("/"))
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+CPU cost of the worker's MP3 encoding and duration step, per narration.
+
+Compares the encoding paths of Worker/worker_system.py on the same synthetic
+narration (16-bit mono 24 kHz WAV):
+
+- legacy_pydub: the previous default, pydub decodes the WAV, exports MP3
+  through ffmpeg, then decodes the MP3 again to measure its duration
+- legacy_ffmpeg: the previous fallback, ffmpeg -version before each of an
+  ffmpeg conversion and an ffmpeg decode for the duration
+- ffmpeg: one ffmpeg conversion, duration from the WAV header
+- lameenc: in-process chunked encoding from the WAV file, duration from the
+  sample count
+- stream_lameenc: in-process encoding of PCM chunks as the streaming upload
+  path does it, without touching disk
+
+CPU time includes child processes (ffmpeg). Paths whose encoder is not
+installed are skipped.
+
+Usage:
+    python benchmarks/worker_encode.py --seconds 300 --runs 3
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import logging
+import argparse
+import shutil
+import resource
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Worker"))
+
+import worker_system
+from worker_system import AudioProcessor, LameMP3Encoder
+
+SAMPLE_RATE = 24000
+
+def make_wav(path: str, seconds: float) -> bytes:
+    """Write a synthetic narration and return its PCM data"""
+    second = b"".join(((i * 37) % 2000 - 1000).to_bytes(2, "little", signed=True) for i in range(SAMPLE_RATE))
+    whole, rest = divmod(int(seconds * SAMPLE_RATE), SAMPLE_RATE)
+    pcm = second * whole + second[:rest * 2]
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return pcm
+
+def legacy_pydub(wav_path, mp3_path, pcm):
+    from pydub import AudioSegment
+    AudioSegment.from_wav(wav_path).export(mp3_path, format="mp3", bitrate="128k")
+    return len(AudioSegment.from_mp3(mp3_path)) / 1000.0
+
+def legacy_ffmpeg(wav_path, mp3_path, pcm):
+    subprocess.run(["ffmpeg", "-version"], capture_output=True)
+    subprocess.run(["ffmpeg", "-i", wav_path, "-codec:a", "libmp3lame", "-b:a", "128k", "-y", mp3_path],
+                   capture_output=True, check=True)
+    subprocess.run(["ffmpeg", "-version"], capture_output=True)
+    result = subprocess.run(["ffmpeg", "-i", mp3_path, "-f", "null", "-"], capture_output=True, text=True)
+    duration = result.stderr.split("Duration:")[1].split(",")[0].strip().split(":")
+    return float(duration[0]) * 3600 + float(duration[1]) * 60 + float(duration[2])
+
+def ffmpeg(wav_path, mp3_path, pcm):
+    if not AudioProcessor.convert_wav_to_mp3_ffmpeg(wav_path, mp3_path):
+        raise RuntimeError("ffmpeg conversion failed")
+    return AudioProcessor.get_audio_duration(wav_path)
+
+def lameenc(wav_path, mp3_path, pcm):
+    return AudioProcessor.convert_wav_to_mp3_lameenc(wav_path, mp3_path)
+
+def stream_lameenc(wav_path, mp3_path, pcm):
+    encoder = LameMP3Encoder(SAMPLE_RATE, 1)
+    # Response-sized chunks, deliberately not sample-aligned
+    for start in range(0, len(pcm), 65535):
+        encoder.encode(pcm[start:start + 65535])
+    encoder.flush()
+    return encoder.duration
+
+PATHS = {
+    # pydub decodes MP3 through ffprobe and ffmpeg
+    "legacy_pydub": (legacy_pydub, lambda: worker_system.PYDUB_AVAILABLE and shutil.which("ffprobe") is not None),
+    "legacy_ffmpeg": (legacy_ffmpeg, AudioProcessor._check_ffmpeg_availability),
+    "ffmpeg": (ffmpeg, AudioProcessor._check_ffmpeg_availability),
+    "lameenc": (lameenc, lambda: worker_system.LAMEENC_AVAILABLE),
+    "stream_lameenc": (stream_lameenc, lambda: worker_system.LAMEENC_AVAILABLE),
+}
+
+def cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def measure(func, wav_path, mp3_path, pcm, runs) -> dict:
+    walls, cpus = [], []
+    for _ in range(runs):
+        if os.path.exists(mp3_path):
+            os.remove(mp3_path)
+        cpu_start = cpu_seconds()
+        start = time.perf_counter()
+        duration = func(wav_path, mp3_path, pcm)
+        walls.append(time.perf_counter() - start)
+        cpus.append(cpu_seconds() - cpu_start)
+    return {
+        "wall_seconds": round(statistics.median(walls), 4),
+        "cpu_seconds": round(statistics.median(cpus), 4),
+        "duration_reported": round(duration, 2),
+        "mp3_bytes": os.path.getsize(mp3_path) if os.path.exists(mp3_path) else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the CPU cost of the worker's MP3 encoding paths")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Narration length in seconds (default: 300)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per path, the median is reported (default: 3)")
+    parser.add_argument("--paths", type=str, nargs="+", choices=list(PATHS), default=list(PATHS))
+    parser.add_argument("--output", type=str, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.getLogger("worker_system").setLevel(logging.WARNING)
+    directory = tempfile.mkdtemp(prefix="worker_encode_")
+    wav_path = os.path.join(directory, "narration.wav")
+    pcm = make_wav(wav_path, args.seconds)
+
+    results = {}
+    for name in args.paths:
+        func, available = PATHS[name]
+        if not available():
+            print(f"{name}: skipped, encoder not installed", file=sys.stderr)
+            continue
+        result = measure(func, wav_path, os.path.join(directory, f"{name}.mp3"), pcm, args.runs)
+        result["cpu_seconds_per_audio_minute"] = round(result["cpu_seconds"] / args.seconds * 60, 4)
+        results[name] = result
+        print(f"{name}: {result['cpu_seconds']:.3f}s CPU, {result['wall_seconds']:.3f}s wall", file=sys.stderr)
+
+    output = json.dumps({"audio_seconds": args.seconds, "runs": args.runs, "results": results}, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
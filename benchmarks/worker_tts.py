@@ -0,0 +1,165 @@
+"""
+Per-job overhead of the worker's TTS modes: the HTTP server versus the in-process engine.
+
+Both modes run against benchmarks/mock_llm.py, and their audio goes through
+the worker's stream parser. Encoding and upload are the same in both modes, so
+they are left out:
+
+- http: APIClient.stream_tts against app.py's server (TTS_MODE=http, the default)
+- local: LocalTTSEngine.stream_pcm in this process (TTS_MODE=local)
+
+For each mode the report has the wall time per job, the time to first audio
+and the CPU seconds per job and per second of audio. CPU time counts this
+process plus, in http mode, the server process. The "http_minus_local"
+difference is the cost of the server hop and the WAV serialization. The
+mock's own CPU time is not counted.
+
+Needs no GPU or model download when ORPHEUS_SNAC_PATH points to exported SNAC
+weights (see python -m tts_engine.snac_weights).
+
+Usage:
+    python benchmarks/worker_tts.py --runs 5 --frames 100
+    python benchmarks/worker_tts.py --modes local --tokens-per-second 300
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import resource
+import contextlib
+import statistics
+
+import psutil
+
+from replay import ROOT, TEXT, start_mock, start_server, stop_server, mock_requests, check_mock_used
+
+sys.path.insert(0, os.path.join(ROOT, "Worker"))
+
+MODES = ("http", "local")
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+async def run_jobs(streams, parsers, runs: int, server=None) -> dict:
+    """Consume runs audio streams one after another and measure each job"""
+    jobs = []
+    for _ in range(runs):
+        parser = parsers()
+        server_cpu = sum(server.cpu_times()[:2]) if server else 0.0
+        cpu_start = cpu_seconds()
+        start = time.perf_counter()
+        first = None
+        async for chunk in streams():
+            if parser.feed(chunk) and first is None:
+                first = time.perf_counter()
+        jobs.append({
+            "seconds": time.perf_counter() - start,
+            "ttfb": first - start if first else None,
+            "audio_seconds": parser.pcm_bytes / (parser.sample_rate * parser.channels * parser.sample_width),
+            "cpu_seconds": cpu_seconds() - cpu_start + (sum(server.cpu_times()[:2]) - server_cpu if server else 0.0),
+        })
+    return summarize(jobs)
+
+def summarize(jobs: list) -> dict:
+    audio_seconds = sum(job["audio_seconds"] for job in jobs)
+    cpu = sum(job["cpu_seconds"] for job in jobs)
+    return {
+        "jobs": len(jobs),
+        "audio_seconds_per_job": round(audio_seconds / len(jobs), 3),
+        "wall_seconds_per_job": round(statistics.median(job["seconds"] for job in jobs), 4),
+        "ttfb_seconds": round(statistics.median(job["ttfb"] for job in jobs if job["ttfb"] is not None), 4),
+        "cpu_seconds_per_job": round(cpu / len(jobs), 4),
+        "cpu_seconds_per_audio_second": round(cpu / audio_seconds, 4) if audio_seconds else None,
+    }
+
+async def measure_http(args, env) -> dict:
+    from worker_system import APIClient, HTTPSessionPool, WavStreamParser, WorkerConfig
+
+    server, url = start_server(env)
+    config = WorkerConfig()
+    config.tts_server_url = url
+    pool = HTTPSessionPool(config)
+    try:
+        client = APIClient(config, await pool.start())
+        streams = lambda: client.stream_tts(args.text, args.voice)
+        await run_jobs(streams, WavStreamParser, args.warmup)
+        return await run_jobs(streams, WavStreamParser, args.runs, psutil.Process(server.pid))
+    finally:
+        await pool.close()
+        stop_server(server)
+
+async def measure_local(args, env) -> dict:
+    from worker_system import LocalTTSEngine, WavStreamParser, WorkerConfig
+
+    engine = LocalTTSEngine(WorkerConfig())
+    # Model loading is a one-off per process, not part of a job
+    await engine.start()
+    try:
+        streams = lambda: engine.stream_pcm(args.text, args.voice)
+        parsers = lambda: WavStreamParser.for_pcm(engine.sample_rate)
+        await run_jobs(streams, parsers, args.warmup)
+        return await run_jobs(streams, parsers, args.runs)
+    finally:
+        engine.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-job overhead of the worker's TTS modes")
+    parser.add_argument("--modes", choices=MODES, nargs="+", default=list(MODES))
+    parser.add_argument("--runs", type=int, default=5, help="Measured jobs per mode (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured jobs per mode first (default: 1)")
+    parser.add_argument("--text", type=str, default=TEXT, help="Input text for every job")
+    parser.add_argument("--voice", type=str, default="tara")
+    parser.add_argument("--streams", type=str, help="Recorded token streams for the mock (JSON lines)")
+    parser.add_argument("--frames", type=int, default=100, help="Frames per synthetic stream (default: 100)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Mock replay rate, 0 for unthrottled so overhead isn't hidden (default: 0)")
+    parser.add_argument("--chunk-tokens", type=int, default=7, help="Tokens per SSE event (default: 7)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- fraction on chunk delays (default: 0)")
+    parser.add_argument("--output", type=str, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.getLogger("worker_system").setLevel(logging.WARNING)
+    mock, api_url = start_mock(args)
+    # The local engine reads its settings from the environment when it is imported,
+    # a .env in the checkout mustn't replace the mock
+    os.environ["ORPHEUS_API_URL"] = api_url
+    os.environ["ORPHEUS_DOTENV"] = "false"
+    env = dict(os.environ)
+    results = {}
+    try:
+        for mode in args.modes:
+            measure = measure_http if mode == "http" else measure_local
+            served_before = mock_requests(api_url)
+            # The local engine logs every decode, keep the report readable
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results[mode] = asyncio.run(measure(args, env))
+            check_mock_used(api_url, served_before)
+            print(f"{mode}: {results[mode]['wall_seconds_per_job']:.3f}s per job, "
+                  f"{results[mode]['cpu_seconds_per_job']:.3f}s CPU per job", file=sys.stderr)
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    report = {
+        "settings": {"runs": args.runs, "tokens_per_second": args.tokens_per_second,
+                     "streams": args.streams or f"synthetic ({args.frames} frames)", "text_chars": len(args.text)},
+        "results": results,
+    }
+    if "http" in results and "local" in results:
+        report["http_minus_local"] = {
+            key: round(results["http"][key] - results["local"][key], 4)
+            for key in ("wall_seconds_per_job", "ttfb_seconds", "cpu_seconds_per_job")
+        }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Orpheus-FASTAPI by Lex-au
+# https://github.com/Lex-au/Orpheus-FastAPI
+# Description: Pre-forking production server for Orpheus Text-to-Speech
+
+import os
+import gc
+import sys
+import time
+import signal
+import socket
+
+import uvicorn
+
+from tts_engine.cpu import check_oversubscription, configure_decode_threads
+
+# Production server settings from environment variables
+try:
+    WORKERS = int(os.environ.get("ORPHEUS_WORKERS", "1"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_WORKERS value, using 1 as fallback")
+    WORKERS = 1
+
+# Seconds a stopping worker waits for in-flight requests and generations
+try:
+    DRAIN_TIMEOUT = int(os.environ.get("ORPHEUS_DRAIN_TIMEOUT", "30"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_DRAIN_TIMEOUT value, using 30 seconds as fallback")
+    DRAIN_TIMEOUT = 30
+
+def preload_model(workers: int) -> None:
+    """Load SNAC in the parent so forked workers share its pages copy-on-write"""
+    # Check for CUDA through NVML so the parent doesn't initialise CUDA, which
+    # would make it unusable in forked workers
+    os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+    import torch
+
+    if torch.cuda.is_available():
+        print("CUDA detected, each worker loads the model on its own GPU context after fork")
+        return
+
+    from tts_engine import load_model
+    # Configure threads here so load_model doesn't apply single-process settings;
+    # each worker reapplies its own share after fork
+    configure_decode_threads(workers)
+    start_time = time.time()
+    load_model()
+    print(f"Model preloaded in {time.time() - start_time:.2f}s before forking workers")
+
+def configure_worker_threads(workers: int, index: int) -> None:
+    """Apply the worker's share of decoder threads and CPUs (called in each worker after fork)"""
+    from tts_engine import cpu
+
+    threads = configure_decode_threads(workers, index)
+    cpus = f" on cpus {cpu.applied['cpus']}" if cpu.applied["cpus"] else ""
+    print(f"Worker {os.getpid()}: torch using {threads} intra-op threads{cpus}")
+
+def run_worker(app, sock: socket.socket, workers: int, index: int) -> None:
+    """Serve app on the shared listening socket until SIGTERM/SIGINT"""
+    configure_worker_threads(workers, index)
+    config = uvicorn.Config(
+        app,
+        reload=False,
+        timeout_graceful_shutdown=DRAIN_TIMEOUT,
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+def run_production_server(app, host: str, port: int, workers: int = WORKERS) -> None:
+    """
+    Serve app with several pre-forked worker processes and no reloader.
+
+    The model is loaded once before forking, all workers accept connections
+    from the same listening socket, and workers that exit unexpectedly are
+    restarted. SIGTERM or SIGINT stop the workers gracefully: each one stops
+    accepting connections and finishes its in-flight requests first.
+    """
+    workers = max(1, workers)
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    check_oversubscription(workers)
+    preload_model(workers)
+
+    # Keep the garbage collector from touching (and so copying) objects shared with workers
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        # Flush so buffered output isn't duplicated into the worker
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            # Workers install uvicorn's own signal handlers
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                run_worker(app, sock, workers, index)
+            except BaseException as e:
+                print(f"Worker {os.getpid()} failed: {e}")
+                exit_code = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(exit_code)
+        children[pid] = (time.time(), index)
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Starting {workers} worker processes on {host}:{port}")
+    for index in range(workers):
+        spawn(index)
+
+    # Supervise workers, restarting any that exit while the server is running
+    while not stopping:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid and pid in children:
+            started, index = children.pop(pid)
+            print(f"Worker {pid} exited with status {status}, restarting")
+            # Avoid a tight restart loop if workers crash on startup
+            if time.time() - started < 1.0:
+                time.sleep(1.0)
+            # The replacement takes over the same share of CPUs
+            spawn(index)
+        else:
+            time.sleep(0.5)
+
+    # Graceful shutdown: workers drain, then get killed if they overrun the deadline
+    print(f"Stopping {len(children)} workers, draining in-flight requests (up to {DRAIN_TIMEOUT}s)")
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    deadline = time.time() + DRAIN_TIMEOUT + 5
+    while children and time.time() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            children.pop(pid, None)
+        else:
+            time.sleep(0.1)
+
+    for pid in children:
+        print(f"Worker {pid} did not stop in time, killing it")
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+    sock.close()
+    print("Server stopped")
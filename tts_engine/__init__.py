@@ -3,15 +3,31 @@ TTS Engine package for Orpheus text-to-speech system.
 
 This package contains the core components for audio generation:
 - inference.py: Token generation and API handling
-- speechpipe.py: Audio conversion pipeline
+- config.py: Runtime settings that can be changed without a restart
+- voices.py: Voice and language metadata (importable without torch)
+- speechpipe.py: Audio conversion pipeline (SNAC is loaded on first use)
+- cpu.py: Decoder thread counts, CPU affinity and oversubscription checks
+- snac_weights.py: Offline, memory-mapped SNAC weights and their export CLI
+- warmup.py: Startup warm-up of the decoder and the LLM prompt cache
+- admission.py: Admission control for concurrent generation requests
+- coalescing.py: Single-flight sharing of identical in-flight requests
+- output_janitor.py: TTL and size limits for generated files in outputs/
+- metrics.py: Prometheus-style counters and histograms
+- streaming.py: Sentence segmentation of incrementally received text
 """
 
 # Make key components available at package level
 from .inference import (
     generate_speech_from_api,
+    TokenGenerationError,
     AVAILABLE_VOICES,
     DEFAULT_VOICE,
     VOICE_TO_LANGUAGE,
     AVAILABLE_LANGUAGES,
     list_available_voices
 )
+from .speechpipe import load_model, get_model_state
+from .admission import AdmissionController, AdmissionRejected
+from .coalescing import RequestCoalescer, SharedGeneration
+from .output_janitor import OutputJanitor
+from .streaming import SentenceSegmenter
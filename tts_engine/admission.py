@@ -0,0 +1,191 @@
+"""
+Admission control for speech generation requests.
+
+Limits the number of generations running at once and the number of requests
+waiting for a slot. Requests beyond those limits are rejected immediately with
+a Retry-After estimate instead of slowing down every request in flight.
+"""
+
+import os
+import time
+import math
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from .inference import create_text_batches
+from .config import get_config
+from .metrics import ADMISSION_REJECTIONS
+
+# Admission settings from environment variables
+try:
+    MAX_ACTIVE_GENERATIONS = int(os.environ.get("ORPHEUS_MAX_ACTIVE_GENERATIONS", "2"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_MAX_ACTIVE_GENERATIONS value, using 2 as fallback")
+    MAX_ACTIVE_GENERATIONS = 2
+
+try:
+    MAX_QUEUED_REQUESTS = int(os.environ.get("ORPHEUS_MAX_QUEUED_REQUESTS", "16"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_MAX_QUEUED_REQUESTS value, using 16 as fallback")
+    MAX_QUEUED_REQUESTS = 16
+
+# Total token budget for a single request across all of its batches (0 disables the check)
+try:
+    MAX_REQUEST_TOKENS = int(os.environ.get("ORPHEUS_MAX_REQUEST_TOKENS", "0"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_MAX_REQUEST_TOKENS value, using 0 (unlimited) as fallback")
+    MAX_REQUEST_TOKENS = 0
+
+# Orpheus emits ~82 audio tokens per second of speech and English speech runs at
+# ~14 characters per second, so ~6 tokens per input character is a safe estimate
+try:
+    TOKENS_PER_CHAR = float(os.environ.get("ORPHEUS_TOKENS_PER_CHAR", "6.0"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_TOKENS_PER_CHAR value, using 6.0 as fallback")
+    TOKENS_PER_CHAR = 6.0
+
+# Throughput assumed for Retry-After estimates until real requests have been measured
+DEFAULT_TOKENS_PER_SECOND = 80.0
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted"""
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self):
+        if self.retry_after is None:
+            return None
+        return {"Retry-After": str(self.retry_after)}
+
+class AdmissionController:
+    """Bound active and queued generations and estimate when capacity frees up"""
+    def __init__(self, max_active: int = MAX_ACTIVE_GENERATIONS, max_queued: int = MAX_QUEUED_REQUESTS,
+                 max_request_tokens: int = MAX_REQUEST_TOKENS, tokens_per_char: float = TOKENS_PER_CHAR):
+        self.max_active = max(1, max_active)
+        self.max_queued = max(0, max_queued)
+        self.max_request_tokens = max_request_tokens
+        self.tokens_per_char = tokens_per_char
+
+        self.active = 0
+        self.queued = 0
+        self.active_tokens = 0
+        self.queued_tokens = 0
+        self.rejected = 0
+
+        # Smoothed per-generation throughput (estimated tokens per second)
+        self.tokens_per_second = DEFAULT_TOKENS_PER_SECOND
+        self.smoothing = 0.2
+
+        # Created lazily so it binds to the server's running event loop
+        self._semaphore = None
+
+    def estimate_tokens(self, text: str) -> int:
+        """Estimate the number of audio tokens needed to speak text"""
+        return int(math.ceil(len(text) * self.tokens_per_char))
+
+    def check_budget(self, text: str, use_batching: bool, max_batch_chars: int = 1000) -> int:
+        """Reject inputs that cannot be generated within the token limits, return the estimate"""
+        total_tokens = self.estimate_tokens(text)
+
+        if self.max_request_tokens > 0 and total_tokens > self.max_request_tokens:
+            raise AdmissionRejected(
+                413,
+                f"Input needs an estimated {total_tokens} tokens, which exceeds the "
+                f"per-request limit of {self.max_request_tokens} tokens"
+            )
+
+        # Each LLM call is capped at max_tokens, so every batch has to fit on its own
+        max_tokens = get_config().max_tokens
+        segments = create_text_batches(text, max_batch_chars) if use_batching else [text]
+        largest_segment = max((self.estimate_tokens(segment) for segment in segments), default=0)
+        if largest_segment > max_tokens:
+            raise AdmissionRejected(
+                413,
+                f"Input segment needs an estimated {largest_segment} tokens, which exceeds "
+                f"ORPHEUS_MAX_TOKENS ({max_tokens}). Shorten the sentence or raise ORPHEUS_MAX_TOKENS."
+            )
+
+        return total_tokens
+
+    def retry_after(self, extra_tokens: int = 0) -> int:
+        """Estimate seconds until a queued request of extra_tokens would be running"""
+        # Active generations are on average half done
+        pending_tokens = self.queued_tokens + self.active_tokens / 2 + extra_tokens
+        aggregate_rate = max(self.tokens_per_second, 1.0) * self.max_active
+        return max(1, int(math.ceil(pending_tokens / aggregate_rate)))
+
+    def _record_completion(self, tokens: int, elapsed: float) -> None:
+        if elapsed <= 0 or tokens <= 0:
+            return
+        rate = tokens / elapsed
+        self.tokens_per_second = (1 - self.smoothing) * self.tokens_per_second + self.smoothing * rate
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+            "tokens_per_second": round(self.tokens_per_second, 1),
+        }
+
+    def reserve(self, text: str, use_batching: bool, max_batch_chars: int = 1000) -> int:
+        """Admit a request into the queue or reject it, return its estimated token count"""
+        try:
+            tokens = self.check_budget(text, use_batching, max_batch_chars)
+        except AdmissionRejected as e:
+            self.rejected += 1
+            ADMISSION_REJECTIONS.inc(status=str(e.status_code))
+            raise
+
+        # Requests that would have to wait are only accepted while the queue has room
+        if self.active >= self.max_active and self.queued >= self.max_queued:
+            self.rejected += 1
+            ADMISSION_REJECTIONS.inc(status="429")
+            retry_after = self.retry_after(tokens)
+            print(f"Admission: rejecting request ({self.active} active, {self.queued} queued), retry after {retry_after}s")
+            raise AdmissionRejected(429, "Server is at capacity, please retry later", retry_after=retry_after)
+
+        self.queued += 1
+        self.queued_tokens += tokens
+        return tokens
+
+    @asynccontextmanager
+    async def slot(self, text: str, use_batching: bool, max_batch_chars: int = 1000,
+                   tokens: Optional[int] = None):
+        """Wait for a generation slot, rejecting the request if the queue is full
+
+        Pass the value returned by reserve() as tokens when the request was
+        already admitted into the queue.
+        """
+        if tokens is None:
+            tokens = self.reserve(text, use_batching, max_batch_chars)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_active)
+
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+            self.queued_tokens -= tokens
+
+        self.active += 1
+        self.active_tokens += tokens
+        start_time = time.time()
+        completed = False
+        try:
+            yield tokens
+            completed = True
+        finally:
+            self.active -= 1
+            self.active_tokens -= tokens
+            self._semaphore.release()
+            if completed:
+                self._record_completion(tokens, time.time() - start_time)
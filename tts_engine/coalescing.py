@@ -0,0 +1,108 @@
+"""
+Single-flight coalescing of identical speech generation requests.
+
+When several requests ask for the same text, voice and sampling parameters
+while a generation for them is still running, they all attach to that one
+generation instead of starting their own. Followers can wait for the final
+result or replay the audio stream from the beginning while it is produced.
+"""
+
+import json
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+class SharedGeneration:
+    """A single in-flight generation that several requests can follow"""
+    def __init__(self, key: str):
+        self.key = key
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.followers = 0
+        self.finished = False
+        # Chunks are added from the generation thread and read from streaming threads
+        self._condition = threading.Condition()
+        # Final waiters are coroutines on the server's event loop
+        self._done_event = asyncio.Event()
+
+    def add_chunk(self, chunk: bytes) -> None:
+        """Publish a newly generated audio chunk (called from the generation thread)"""
+        with self._condition:
+            self.chunks.append(chunk)
+            self._condition.notify_all()
+
+    def finish(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Mark the generation as complete (called on the event loop)"""
+        with self._condition:
+            self.result = result
+            self.error = error
+            self.finished = True
+            self._condition.notify_all()
+        self._done_event.set()
+
+    async def wait(self) -> Any:
+        """Wait for the generation to finish and return its result"""
+        await self._done_event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Yield every audio chunk from the start, blocking until new ones arrive
+
+        Raises the generation's error after its last chunk, so a stream of a
+        failed generation doesn't end like a complete one.
+        """
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self.chunks) and not self.finished:
+                    self._condition.wait()
+                if index >= len(self.chunks):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                chunk = self.chunks[index]
+            index += 1
+            yield chunk
+
+class RequestCoalescer:
+    """Track in-flight generations by request parameters
+
+    join() and release() are only called from the event loop, so the
+    in-flight table needs no locking.
+    """
+    def __init__(self):
+        self._inflight: Dict[str, SharedGeneration] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(**params) -> str:
+        """Build a stable key from the parameters that determine the generated audio"""
+        encoded = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def join(self, key: str) -> Tuple[SharedGeneration, bool]:
+        """Attach to the in-flight generation for key, return (generation, is_leader)"""
+        generation = self._inflight.get(key)
+        if generation is not None:
+            generation.followers += 1
+            self.coalesced += 1
+            return generation, False
+
+        generation = SharedGeneration(key)
+        self._inflight[key] = generation
+        self.started += 1
+        return generation, True
+
+    def release(self, generation: SharedGeneration) -> None:
+        """Stop routing new requests to a generation that has completed"""
+        if self._inflight.get(generation.key) is generation:
+            del self._inflight[generation.key]
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
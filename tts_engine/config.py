@@ -0,0 +1,97 @@
+"""
+Runtime configuration that can be changed without restarting the server.
+
+The settings that shape a generation (LLM endpoint, timeout and sampling
+parameters) live in an immutable RuntimeConfig. Updates build a new object and
+swap it in atomically, so each request uses one consistent snapshot taken when
+it starts and in-flight requests are unaffected by later changes.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Mapping, Optional
+
+from dotenv import dotenv_values
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """Settings resolved per request"""
+    api_url: Optional[str]
+    request_timeout: int
+    max_tokens: int
+    temperature: float
+    top_p: float
+
+# Environment variable for each runtime setting and the type it is parsed as
+RUNTIME_SETTINGS = {
+    "ORPHEUS_API_URL": ("api_url", str),
+    "ORPHEUS_API_TIMEOUT": ("request_timeout", int),
+    "ORPHEUS_MAX_TOKENS": ("max_tokens", int),
+    "ORPHEUS_TEMPERATURE": ("temperature", float),
+    "ORPHEUS_TOP_P": ("top_p", float),
+}
+
+_config: Optional[RuntimeConfig] = None
+_lock = threading.Lock()
+
+# Modification time of the .env file the current config was last reloaded from
+_env_file_mtime: Optional[float] = None
+
+def get_config() -> RuntimeConfig:
+    """Return the current configuration snapshot"""
+    if _config is None:
+        raise RuntimeError("Runtime configuration has not been initialised")
+    return _config
+
+def set_config(config: RuntimeConfig) -> None:
+    """Replace the current configuration"""
+    global _config
+    with _lock:
+        _config = config
+
+def parse_settings(values: Mapping[str, str], base: RuntimeConfig) -> Dict[str, object]:
+    """Parse runtime settings from env-style values, skipping invalid ones"""
+    changes = {}
+    for key, (field, cast) in RUNTIME_SETTINGS.items():
+        if key not in values or values[key] is None:
+            continue
+        try:
+            value = cast(values[key])
+        except (ValueError, TypeError):
+            print(f"WARNING: Invalid {key} value, keeping {getattr(base, field)}")
+            continue
+        if field == "api_url" and not value:
+            continue
+        changes[field] = value
+    return changes
+
+def update_config(values: Mapping[str, str]) -> Dict[str, object]:
+    """Apply env-style settings to the current configuration, return what changed"""
+    global _config
+    with _lock:
+        current = get_config()
+        changes = {
+            field: value for field, value in parse_settings(values, current).items()
+            if getattr(current, field) != value
+        }
+        if changes:
+            _config = replace(current, **changes)
+    if changes:
+        print(f"Runtime configuration updated: {', '.join(f'{k}={v}' for k, v in changes.items())}")
+    return changes
+
+def reload_if_changed(path: str = ".env") -> Dict[str, object]:
+    """Apply settings from an env file when it has changed since the last check
+
+    Lets every server process pick up a configuration saved by any one of them.
+    """
+    global _env_file_mtime
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return {}
+    if mtime == _env_file_mtime:
+        return {}
+    _env_file_mtime = mtime
+    return update_config(dotenv_values(path))
@@ -0,0 +1,166 @@
+"""
+CPU thread partitioning for the SNAC decoder.
+
+On CPU deployments llama.cpp and the torch decoder share the same cores. By
+default torch starts one intra-op thread per core regardless of what else runs
+on the host, so the two oversubscribe the CPU, which costs throughput and adds
+latency jitter. These settings give the decoder an explicit thread count and,
+optionally, a CPU affinity set, and report at startup when the configured
+threads add up to more than the cores available.
+"""
+
+import os
+from typing import List, Optional
+
+# Intra-op threads per decoder process (0 divides the available cores between workers)
+try:
+    TORCH_THREADS = int(os.environ.get("ORPHEUS_TORCH_THREADS", "0"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_TORCH_THREADS value, using 0 (automatic) as fallback")
+    TORCH_THREADS = 0
+
+# Inter-op threads per decoder process (0 keeps torch's default)
+try:
+    TORCH_INTEROP_THREADS = int(os.environ.get("ORPHEUS_TORCH_INTEROP_THREADS", "0"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_TORCH_INTEROP_THREADS value, using 0 (default) as fallback")
+    TORCH_INTEROP_THREADS = 0
+
+# CPUs the decoder may run on, e.g. "0-3" or "0,2,4-7" (empty means no pinning)
+CPU_AFFINITY = os.environ.get("ORPHEUS_CPU_AFFINITY", "")
+
+# Threads llama.cpp uses on the same host (same variable as docker-compose-cpu.yaml, 0 if it runs elsewhere)
+try:
+    LLAMA_CPU_THREADS = int(os.environ.get("LLAMA_CPU_THREADS", "0"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid LLAMA_CPU_THREADS value, using 0 as fallback")
+    LLAMA_CPU_THREADS = 0
+
+# Settings configure_decode_threads applied to this process (inherited by forked workers)
+applied = {"threads": None, "cpus": None, "interop_threads": None}
+
+def parse_cpu_list(spec: str) -> List[int]:
+    """Parse a CPU list like "0-3,6" into sorted CPU numbers"""
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+def configured_cpus() -> Optional[List[int]]:
+    """CPUs from ORPHEUS_CPU_AFFINITY, or None when pinning is disabled or invalid"""
+    if not CPU_AFFINITY.strip():
+        return None
+    try:
+        cpus = parse_cpu_list(CPU_AFFINITY)
+    except ValueError:
+        print(f"WARNING: Invalid ORPHEUS_CPU_AFFINITY value '{CPU_AFFINITY}', not pinning the decoder")
+        return None
+    return cpus or None
+
+def available_cpus() -> List[int]:
+    """CPUs this process may currently run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def worker_cpus(index: int = 0, workers: int = 1) -> Optional[List[int]]:
+    """
+    CPUs for one decoder process.
+
+    With several workers the affinity set is split into disjoint slices so
+    workers don't compete for the same cores. When there are fewer CPUs than
+    workers every worker gets the whole set.
+    """
+    cpus = configured_cpus()
+    if cpus is None or workers <= 1 or len(cpus) < workers:
+        return cpus
+    per_worker = len(cpus) // workers
+    start = index * per_worker
+    end = len(cpus) if index == workers - 1 else start + per_worker
+    return cpus[start:end]
+
+def decode_threads(workers: int = 1) -> int:
+    """
+    Intra-op threads for each decoder process.
+
+    ORPHEUS_TORCH_THREADS wins when set. Otherwise the decoder's CPUs are divided
+    between the workers; without an affinity set the cores llama.cpp uses on this
+    host are left out first.
+    """
+    if TORCH_THREADS > 0:
+        return TORCH_THREADS
+    pinned = configured_cpus()
+    if pinned is not None:
+        return max(1, len(pinned) // max(1, workers))
+    return max(1, (len(available_cpus()) - LLAMA_CPU_THREADS) // max(1, workers))
+
+def apply_cpu_affinity(cpus: Optional[List[int]]) -> None:
+    """Pin the current process (and the threads it starts later) to cpus"""
+    if not cpus:
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        print("Warning: CPU affinity is not supported on this platform, ignoring ORPHEUS_CPU_AFFINITY")
+        return
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError as e:
+        print(f"Warning: Could not set CPU affinity to {cpus}: {e}")
+
+def check_oversubscription(workers: int = 1, threads: Optional[int] = None) -> dict:
+    """
+    Compare the threads the decoder and llama.cpp will run with the cores available.
+
+    Prints a summary, and a warning when the CPU is oversubscribed.
+    """
+    threads = decode_threads(workers) if threads is None else threads
+    host_cpus = os.cpu_count() or 1
+    pinned = configured_cpus()
+    decoder_cpus = len(pinned) if pinned is not None else len(available_cpus())
+    decoder_threads = threads * workers
+    report = {
+        "host_cpus": host_cpus,
+        "decoder_cpus": decoder_cpus,
+        "decoder_threads": decoder_threads,
+        "llama_threads": LLAMA_CPU_THREADS,
+        "oversubscribed": False,
+    }
+
+    print(f"CPU budget: {host_cpus} cores, decoder {workers} x {threads} threads on "
+          f"{'cpus ' + CPU_AFFINITY if pinned is not None else f'{decoder_cpus} cpus'}, "
+          f"llama.cpp {LLAMA_CPU_THREADS or 'not on this host'} threads")
+
+    if decoder_threads > decoder_cpus:
+        report["oversubscribed"] = True
+        print(f"WARNING: {decoder_threads} decoder threads on {decoder_cpus} CPUs, "
+              f"lower ORPHEUS_TORCH_THREADS or ORPHEUS_WORKERS")
+    # Without pinning the decoder shares every core with llama.cpp
+    if LLAMA_CPU_THREADS and pinned is None and decoder_threads + LLAMA_CPU_THREADS > host_cpus:
+        report["oversubscribed"] = True
+        print(f"WARNING: {decoder_threads} decoder threads + {LLAMA_CPU_THREADS} llama.cpp threads "
+              f"exceed {host_cpus} cores, set ORPHEUS_TORCH_THREADS or ORPHEUS_CPU_AFFINITY to partition them")
+    return report
+
+def configure_decode_threads(workers: int = 1, index: int = 0) -> int:
+    """Apply affinity and torch thread settings to this decoder process, return the intra-op threads"""
+    import torch
+
+    cpus = worker_cpus(index, workers)
+    apply_cpu_affinity(cpus)
+    threads = decode_threads(workers)
+    torch.set_num_threads(threads)
+    # Inter-op threads can only be set once per process, forked workers keep the parent's
+    if TORCH_INTEROP_THREADS > 0 and applied["interop_threads"] is None:
+        try:
+            torch.set_num_interop_threads(TORCH_INTEROP_THREADS)
+            applied["interop_threads"] = TORCH_INTEROP_THREADS
+        except RuntimeError as e:
+            print(f"Warning: Could not set torch inter-op threads: {e}")
+    applied.update(threads=threads, cpus=cpus)
+    return threads
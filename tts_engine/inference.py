@@ -4,8 +4,8 @@ import requests
 import json
 import time
 import wave
+import zlib
 import numpy as np
-import sounddevice as sd
 import argparse
 import threading
 import queue
@@ -25,52 +25,66 @@ IS_RELOADER = is_reloader_process()
 if not IS_RELOADER:
     os.environ['UVICORN_STARTED'] = 'true'
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Detect hardware capabilities and display information
-import torch
-import psutil
-
-# Detect if we're on a high-end system based on hardware capabilities
-HIGH_END_GPU = False
-if torch.cuda.is_available():
-    # Get GPU properties
-    props = torch.cuda.get_device_properties(0)
-    gpu_name = props.name
-    gpu_mem_gb = props.total_memory / (1024**3)
-    compute_capability = f"{props.major}.{props.minor}"
-    
-    # Consider high-end if: large VRAM (≥16GB) OR high compute capability (≥8.0) OR large VRAM (≥12GB) with good CC (≥7.0)
-    HIGH_END_GPU = (gpu_mem_gb >= 16.0 or 
-                    props.major >= 8 or 
-                    (gpu_mem_gb >= 12.0 and props.major >= 7))
+# Load environment variables from .env file (ORPHEUS_DOTENV=false ignores it)
+if os.environ.get("ORPHEUS_DOTENV", "true").lower() in ("true", "1", "yes", "on"):
+    load_dotenv()
+
+# Hardware is detected on first use so that importing this module does not import
+# torch or probe CUDA (voice listing and the reloader process never need them)
+_hardware_info = None
+
+def get_hardware_info():
+    """Detect GPU/CPU capabilities once and return them as a dict."""
+    global _hardware_info
+    if _hardware_info is not None:
+        return _hardware_info
+    
+    import torch
+    import psutil
+    
+    info = {"cuda": torch.cuda.is_available(), "high_end_gpu": False}
+    
+    # Detect if we're on a high-end system based on hardware capabilities
+    if info["cuda"]:
+        # Get GPU properties
+        props = torch.cuda.get_device_properties(0)
+        gpu_name = props.name
+        gpu_mem_gb = props.total_memory / (1024**3)
+        compute_capability = f"{props.major}.{props.minor}"
         
-    if HIGH_END_GPU:
-        if not IS_RELOADER:
+        # Consider high-end if: large VRAM (≥16GB) OR high compute capability (≥8.0) OR large VRAM (≥12GB) with good CC (≥7.0)
+        info["high_end_gpu"] = (gpu_mem_gb >= 16.0 or 
+                                props.major >= 8 or 
+                                (gpu_mem_gb >= 12.0 and props.major >= 7))
+            
+        if info["high_end_gpu"]:
             print(f"🖥️ Hardware: High-end CUDA GPU detected")
             print(f"📊 Device: {gpu_name}")
             print(f"📊 VRAM: {gpu_mem_gb:.2f} GB")
             print(f"📊 Compute Capability: {compute_capability}")
             print("🚀 Using high-performance optimizations")
-    else:
-        if not IS_RELOADER:
+        else:
             print(f"🖥️ Hardware: CUDA GPU detected")
             print(f"📊 Device: {gpu_name}")
             print(f"📊 VRAM: {gpu_mem_gb:.2f} GB")
             print(f"📊 Compute Capability: {compute_capability}")
             print("🚀 Using GPU-optimized settings")
-else:
-    # Get CPU info
-    cpu_cores = psutil.cpu_count(logical=False)
-    cpu_threads = psutil.cpu_count(logical=True)
-    ram_gb = psutil.virtual_memory().total / (1024**3)
-    
-    if not IS_RELOADER:
+    else:
+        # Get CPU info
+        cpu_cores = psutil.cpu_count(logical=False)
+        cpu_threads = psutil.cpu_count(logical=True)
+        ram_gb = psutil.virtual_memory().total / (1024**3)
+        
         print(f"🖥️ Hardware: CPU only (No CUDA GPU detected)")
         print(f"📊 CPU: {cpu_cores} cores, {cpu_threads} threads")
         print(f"📊 RAM: {ram_gb:.2f} GB")
         print("⚙️ Using CPU-optimized settings")
+    
+    _hardware_info = info
+    return info
+
+def is_high_end_gpu():
+    return get_hardware_info()["high_end_gpu"]
 
 # Load configuration from environment variables without hardcoded defaults
 # Critical settings - will log errors if missing
@@ -115,6 +129,31 @@ except (ValueError, TypeError):
     print("WARNING: Invalid ORPHEUS_TOP_P value, using 0.9 as fallback")
     TOP_P = 0.9
 
+# Ask llama.cpp to reuse the KV cache of a matching prompt prefix (cache_prompt)
+PROMPT_CACHE = os.environ.get("ORPHEUS_PROMPT_CACHE", "true").lower() in ("true", "1", "yes", "on")
+
+# Number of llama.cpp slots (--parallel) to pin requests to, 0 lets the server choose
+try:
+    LLM_SLOTS = int(os.environ.get("ORPHEUS_LLM_SLOTS", "0"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_LLM_SLOTS value, using 0 (no slot pinning) as fallback")
+    LLM_SLOTS = 0
+
+# What requests are pinned by: "job" keeps all batches of one request on one slot,
+# "voice" sends every request for a voice to the same slot
+SLOT_AFFINITY = os.environ.get("ORPHEUS_SLOT_AFFINITY", "job").lower()
+if SLOT_AFFINITY not in ("job", "voice"):
+    print(f"WARNING: Invalid ORPHEUS_SLOT_AFFINITY value '{SLOT_AFFINITY}', using 'job' as fallback")
+    SLOT_AFFINITY = "job"
+
+# How prompts and completions travel to and from the LLM: "text" uses the OpenAI-compatible
+# endpoint with <custom_token_N> strings, "ids" uses llama.cpp's native /tokenize and
+# /completion endpoints with integer token IDs
+TOKEN_MODE = os.environ.get("ORPHEUS_TOKEN_MODE", "text").lower()
+if TOKEN_MODE not in ("text", "ids"):
+    print(f"WARNING: Invalid ORPHEUS_TOKEN_MODE value '{TOKEN_MODE}', using 'text' as fallback")
+    TOKEN_MODE = "text"
+
 # Repetition penalty is hardcoded to 1.1 which is the only stable value for quality output
 REPETITION_PENALTY = 1.1
 
@@ -124,6 +163,17 @@ except (ValueError, TypeError):
     print("WARNING: Invalid ORPHEUS_SAMPLE_RATE value, using 24000 as fallback")
     SAMPLE_RATE = 24000
 
+# Settings that can change at runtime are read per request from this snapshot;
+# the module constants above keep the values loaded at startup
+from .config import RuntimeConfig, get_config, set_config
+set_config(RuntimeConfig(
+    api_url=API_URL,
+    request_timeout=REQUEST_TIMEOUT,
+    max_tokens=MAX_TOKENS,
+    temperature=TEMPERATURE,
+    top_p=TOP_P
+))
+
 # Print loaded configuration only in the main process, not in the reloader
 if not IS_RELOADER:
     print(f"Configuration loaded:")
@@ -133,56 +183,39 @@ if not IS_RELOADER:
     print(f"  TOP_P: {TOP_P}")
     print(f"  REPETITION_PENALTY: {REPETITION_PENALTY}")
 
-# Parallel processing settings
-NUM_WORKERS = 4 if HIGH_END_GPU else 2
-
-# Define voices by language
-ENGLISH_VOICES = ["tara", "leah", "jess", "leo", "dan", "mia", "zac", "zoe"]
-FRENCH_VOICES = ["pierre", "amelie", "marie"]
-GERMAN_VOICES = ["jana", "thomas", "max"]
-KOREAN_VOICES = ["유나", "준서"]
-HINDI_VOICES = ["ऋतिका"]
-MANDARIN_VOICES = ["长乐", "白芷"]
-SPANISH_VOICES = ["javi", "sergio", "maria"]
-ITALIAN_VOICES = ["pietro", "giulia", "carlo"]
-
-# Combined list for API compatibility
-AVAILABLE_VOICES = (
-    ENGLISH_VOICES + 
-    FRENCH_VOICES + 
-    GERMAN_VOICES + 
-    KOREAN_VOICES + 
-    HINDI_VOICES + 
-    MANDARIN_VOICES + 
-    SPANISH_VOICES + 
-    ITALIAN_VOICES
+# Voice metadata lives in its own module so it can be used without the audio stack
+from .voices import (
+    ENGLISH_VOICES, FRENCH_VOICES, GERMAN_VOICES, KOREAN_VOICES, HINDI_VOICES,
+    MANDARIN_VOICES, SPANISH_VOICES, ITALIAN_VOICES,
+    AVAILABLE_VOICES, DEFAULT_VOICE, VOICE_TO_LANGUAGE, AVAILABLE_LANGUAGES
 )
-DEFAULT_VOICE = "tara"  # Best voice according to documentation
-
-# Map voices to languages for the UI
-VOICE_TO_LANGUAGE = {}
-VOICE_TO_LANGUAGE.update({voice: "english" for voice in ENGLISH_VOICES})
-VOICE_TO_LANGUAGE.update({voice: "french" for voice in FRENCH_VOICES})
-VOICE_TO_LANGUAGE.update({voice: "german" for voice in GERMAN_VOICES})
-VOICE_TO_LANGUAGE.update({voice: "korean" for voice in KOREAN_VOICES})
-VOICE_TO_LANGUAGE.update({voice: "hindi" for voice in HINDI_VOICES})
-VOICE_TO_LANGUAGE.update({voice: "mandarin" for voice in MANDARIN_VOICES})
-VOICE_TO_LANGUAGE.update({voice: "spanish" for voice in SPANISH_VOICES})
-VOICE_TO_LANGUAGE.update({voice: "italian" for voice in ITALIAN_VOICES})
-
-# Languages list for the UI
-AVAILABLE_LANGUAGES = ["english", "french", "german", "korean", "hindi", "mandarin", "spanish", "italian"]
 
 # Import the unified token handling from speechpipe
-from .speechpipe import turn_token_into_id, CUSTOM_TOKEN_PREFIX
+from .speechpipe import turn_token_into_id, token_id_to_code, CUSTOM_TOKEN_PREFIX
+from .metrics import (
+    TIME_TO_FIRST_AUDIO, REALTIME_FACTOR, LLM_TOKENS_PER_SECOND, LLM_TOKENS,
+    SNAC_DECODE_SECONDS, AUDIO_SECONDS, GENERATION_BATCHES,
+    LLM_PROMPT_EVAL_SECONDS, LLM_PROMPT_TOKENS
+)
+
+def metric_voice(voice: str) -> str:
+    """Voice label for metrics, collapsing unknown voices to keep label cardinality bounded."""
+    return voice if voice in AVAILABLE_VOICES else "other"
 
 # Special token IDs for Orpheus model
 START_TOKEN_ID = 128259
 END_TOKEN_IDS = [128009, 128260, 128261, 128257]
 
+class TokenGenerationError(Exception):
+    """Raised when the LLM server could not generate the tokens for a request"""
+
 # Performance monitoring
 class PerformanceMonitor:
-    """Track and report performance metrics"""
+    """Track and report performance metrics of one generation
+    
+    Generations run concurrently, so every request gets its own monitor that is
+    passed down to the token stream and the decoder.
+    """
     def __init__(self):
         self.start_time = time.time()
         self.token_count = 0
@@ -217,9 +250,6 @@ class PerformanceMonitor:
         
         print(f"Progress: {tokens_per_sec:.1f} tokens/sec, est. {est_duration:.1f}s audio generated, {self.token_count} tokens, {self.audio_chunks} chunks in {elapsed:.1f}s")
 
-# Create global performance monitor
-perf_monitor = PerformanceMonitor()
-
 def format_prompt(prompt: str, voice: str = DEFAULT_VOICE) -> str:
     """Format prompt for Orpheus model with voice prefix and special tokens."""
     # Validate voice and provide fallback
@@ -236,30 +266,113 @@ def format_prompt(prompt: str, voice: str = DEFAULT_VOICE) -> str:
     
     return f"{special_start}{formatted_prompt}{special_end}"
 
-def generate_tokens_from_api(prompt: str, voice: str = DEFAULT_VOICE, temperature: float = TEMPERATURE, 
-                           top_p: float = TOP_P, max_tokens: int = MAX_TOKENS, 
-                           repetition_penalty: float = REPETITION_PENALTY) -> Generator[str, None, None]:
-    """Generate tokens from text using OpenAI-compatible API with optimized streaming and retry logic."""
+def select_slot(voice: str, job_id: Optional[str] = None) -> Optional[int]:
+    """Pick the LLM server slot for a request, or None to let the server choose."""
+    if LLM_SLOTS <= 0:
+        return None
+    key = job_id if SLOT_AFFINITY == "job" and job_id else voice
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(key.encode("utf-8")) % LLM_SLOTS
+
+def record_prompt_timings(timings: Dict[str, Any], voice: str) -> None:
+    """Report llama.cpp prompt evaluation timings for one completion."""
+    prompt_tokens = timings.get("prompt_n", 0) or 0
+    cached_tokens = timings.get("cache_n", 0) or 0
+    prompt_ms = timings.get("prompt_ms", 0.0) or 0.0
+    print(f"Prompt eval: {prompt_tokens} tokens in {prompt_ms:.1f} ms ({cached_tokens} tokens reused from cache)")
+    LLM_PROMPT_EVAL_SECONDS.observe(prompt_ms / 1000.0, voice=metric_voice(voice))
+    LLM_PROMPT_TOKENS.inc(prompt_tokens, source="evaluated")
+    LLM_PROMPT_TOKENS.inc(cached_tokens, source="cached")
+
+def llama_base_url(api_url: str) -> str:
+    """Strip the completions path from the configured API URL to get the llama.cpp server root."""
+    url = api_url.rstrip("/")
+    for suffix in ("/v1/completions", "/completions", "/completion"):
+        if url.endswith(suffix):
+            return url[:-len(suffix)]
+    return url
+
+def tokenize_prompt(prompt: str, voice: str, base_url: str, timeout: int) -> List[int]:
+    """Build the Orpheus prompt as token IDs using the server's tokenizer."""
+    if voice not in AVAILABLE_VOICES:
+        voice = DEFAULT_VOICE
+    response = requests.post(
+        f"{base_url}/tokenize",
+        headers=HEADERS,
+        json={"content": f"{voice}: {prompt}", "add_special": True},
+        timeout=timeout
+    )
+    response.raise_for_status()
+    return [START_TOKEN_ID] + response.json()["tokens"] + END_TOKEN_IDS
+
+def generate_tokens_from_api(prompt: str, voice: str = DEFAULT_VOICE, temperature: Optional[float] = None, 
+                           top_p: Optional[float] = None, max_tokens: Optional[int] = None, 
+                           repetition_penalty: float = REPETITION_PENALTY,
+                           cancel_event=None, config: Optional[RuntimeConfig] = None,
+                           job_id: Optional[str] = None,
+                           perf_monitor: Optional[PerformanceMonitor] = None) -> Generator[Union[str, int], None, None]:
+    """Generate tokens from text using OpenAI-compatible API with optimized streaming and retry logic.
+    
+    Setting cancel_event (a threading.Event) stops the stream and closes the connection,
+    which ends the completion on the LLM server. Sampling parameters that are not given
+    come from config, or the current runtime configuration. Completions that share a
+    job_id are pinned to the same LLM server slot when slot pinning is enabled.
+    
+    Yields token strings, or integer token IDs when ORPHEUS_TOKEN_MODE is "ids".
+    """
+    config = config or get_config()
+    perf_monitor = perf_monitor or PerformanceMonitor()
+    temperature = config.temperature if temperature is None else temperature
+    top_p = config.top_p if top_p is None else top_p
+    max_tokens = config.max_tokens if max_tokens is None else max_tokens
     start_time = time.time()
     formatted_prompt = format_prompt(prompt, voice)
     print(f"Generating speech for: {formatted_prompt}")
     
     # Optimize the token generation for GPUs
-    if HIGH_END_GPU:
+    if is_high_end_gpu():
         # Use more aggressive parameters for faster generation on high-end GPUs
         print("Using optimized parameters for high-end GPU")
-    elif torch.cuda.is_available():
+    elif get_hardware_info()["cuda"]:
         print("Using optimized parameters for GPU acceleration")
     
-    # Create the request payload (model field may not be required by some endpoints but included for compatibility)
-    payload = {
-        "prompt": formatted_prompt,
-        "max_tokens": max_tokens,
-        "temperature": temperature,
-        "top_p": top_p,
-        "repeat_penalty": repetition_penalty,
-        "stream": True  # Always stream for better performance
-    }
+    if TOKEN_MODE == "ids":
+        # Send the prompt as token IDs and get token IDs back, so neither side converts
+        # audio tokens to and from text
+        base_url = llama_base_url(config.api_url)
+        url = f"{base_url}/completion"
+        try:
+            prompt_ids = tokenize_prompt(prompt, voice, base_url, config.request_timeout)
+        except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+            print(f"Error tokenizing prompt via {base_url}/tokenize: {e}")
+            raise TokenGenerationError(f"Tokenizing the prompt failed: {e}") from e
+        payload = {
+            "prompt": prompt_ids,
+            "n_predict": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "repeat_penalty": repetition_penalty,
+            "return_tokens": True,
+            "stream": True
+        }
+    else:
+        url = config.api_url
+        # Create the request payload (model field may not be required by some endpoints but included for compatibility)
+        payload = {
+            "prompt": formatted_prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "repeat_penalty": repetition_penalty,
+            "stream": True  # Always stream for better performance
+        }
+    
+    # Let llama.cpp reuse the cached prompt prefix, and keep related requests on one slot
+    if PROMPT_CACHE:
+        payload["cache_prompt"] = True
+    slot = select_slot(voice, job_id)
+    if slot is not None:
+        payload["id_slot"] = slot
     
     # Add model field - this is ignored by many local inference servers for /v1/completions
     # but included for compatibility with OpenAI API and some servers that may use it
@@ -276,11 +389,11 @@ def generate_tokens_from_api(prompt: str, voice: str = DEFAULT_VOICE, temperatur
         try:
             # Make the API request with streaming and timeout
             response = session.post(
-                API_URL, 
+                url, 
                 headers=HEADERS, 
                 json=payload, 
                 stream=True,
-                timeout=REQUEST_TIMEOUT
+                timeout=config.request_timeout
             )
             
             if response.status_code != 200:
@@ -293,25 +406,44 @@ def generate_tokens_from_api(prompt: str, voice: str = DEFAULT_VOICE, temperatur
                     print(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                     continue
-                return
+                raise TokenGenerationError(f"LLM API request failed with status code {response.status_code}")
             
             # Process the streamed response with better buffering
             buffer = ""
             token_counter = 0
+            prompt_timings = None
+            # A stream that closes before its end marker was cut off, e.g. the server died
+            stream_complete = False
             
             # Iterate through the response to get tokens
             for line in response.iter_lines():
+                if cancel_event is not None and cancel_event.is_set():
+                    print("Token generation cancelled")
+                    response.close()
+                    return
                 if line:
                     line_str = line.decode('utf-8')
                     if line_str.startswith('data: '):
                         data_str = line_str[6:]  # Remove the 'data: ' prefix
                         
                         if data_str.strip() == '[DONE]':
+                            stream_complete = True
                             break
                             
                         try:
                             data = json.loads(data_str)
-                            if 'choices' in data and len(data['choices']) > 0:
+                            # llama.cpp's native endpoint marks its last chunk instead of sending [DONE]
+                            if data.get('stop') is True:
+                                stream_complete = True
+                            # llama.cpp reports timings (including prompt evaluation) with the last chunk
+                            if 'timings' in data:
+                                prompt_timings = data['timings']
+                            if TOKEN_MODE == "ids":
+                                for token_id in data.get('tokens') or ():
+                                    token_counter += 1
+                                    perf_monitor.add_tokens()
+                                    yield token_id
+                            elif 'choices' in data and len(data['choices']) > 0:
                                 token_chunk = data['choices'][0].get('text', '')
                                 for token_text in token_chunk.split('>'):
                                     token_text = f'{token_text}>'
@@ -324,14 +456,22 @@ def generate_tokens_from_api(prompt: str, voice: str = DEFAULT_VOICE, temperatur
                             print(f"Error decoding JSON: {e}")
                             continue
             
+            if not stream_complete:
+                raise TokenGenerationError(f"LLM stream ended early after {token_counter} tokens")
+            
             # Generation completed successfully
             generation_time = time.time() - start_time
             tokens_per_second = token_counter / generation_time if generation_time > 0 else 0
             print(f"Token generation complete: {token_counter} tokens in {generation_time:.2f}s ({tokens_per_second:.1f} tokens/sec)")
+            LLM_TOKENS.inc(token_counter, voice=metric_voice(voice))
+            if token_counter > 0:
+                LLM_TOKENS_PER_SECOND.observe(tokens_per_second, voice=metric_voice(voice))
+            if prompt_timings:
+                record_prompt_timings(prompt_timings, voice)
             return
             
         except requests.exceptions.Timeout:
-            print(f"Request timed out after {REQUEST_TIMEOUT} seconds")
+            print(f"Request timed out after {config.request_timeout} seconds")
             retry_count += 1
             if retry_count < max_retries:
                 wait_time = 2 ** retry_count
@@ -339,10 +479,10 @@ def generate_tokens_from_api(prompt: str, voice: str = DEFAULT_VOICE, temperatur
                 time.sleep(wait_time)
             else:
                 print("Max retries reached. Token generation failed.")
-                return
+                raise TokenGenerationError(f"LLM API request timed out {max_retries} times")
                 
         except requests.exceptions.ConnectionError:
-            print(f"Connection error to API at {API_URL}")
+            print(f"Connection error to API at {url}")
             retry_count += 1
             if retry_count < max_retries:
                 wait_time = 2 ** retry_count
@@ -350,12 +490,16 @@ def generate_tokens_from_api(prompt: str, voice: str = DEFAULT_VOICE, temperatur
                 time.sleep(wait_time)
             else:
                 print("Max retries reached. Token generation failed.")
-                return
+                raise TokenGenerationError(f"Could not connect to the LLM API at {url}")
+    
+    # Every attempt got a server error
+    raise TokenGenerationError(f"LLM API request failed with server errors {max_retries} times")
 
 # The turn_token_into_id function is now imported from speechpipe.py
 # This eliminates duplicate code and ensures consistent behavior
 
-def convert_to_audio(multiframe: List[int], count: int) -> Optional[bytes]:
+def convert_to_audio(multiframe: List[int], count: int,
+                     perf_monitor: Optional[PerformanceMonitor] = None) -> Optional[bytes]:
     """Convert token frames to audio with performance monitoring."""
     # Import here to avoid circular imports
     from .speechpipe import convert_to_audio as orpheus_convert_to_audio
@@ -363,11 +507,13 @@ def convert_to_audio(multiframe: List[int], count: int) -> Optional[bytes]:
     result = orpheus_convert_to_audio(multiframe, count)
     
     if result is not None:
-        perf_monitor.add_audio_chunk()
+        SNAC_DECODE_SECONDS.observe(time.time() - start_time, window=str(len(multiframe)))
+        if perf_monitor:
+            perf_monitor.add_audio_chunk()
         
     return result
 
-async def tokens_decoder(token_gen) -> Generator[bytes, None, None]:
+async def tokens_decoder(token_gen, perf_monitor: Optional[PerformanceMonitor] = None) -> Generator[bytes, None, None]:
     """Simplified token decoder with early first-chunk processing for lower latency."""
     buffer = []
     count = 0
@@ -383,7 +529,11 @@ async def tokens_decoder(token_gen) -> Generator[bytes, None, None]:
     token_count = 0
     
     async for token_text in token_gen:
-        token = turn_token_into_id(token_text, count)
+        # Token IDs map to codes arithmetically, token strings have to be parsed
+        if isinstance(token_text, int):
+            token = token_id_to_code(token_text, count)
+        else:
+            token = turn_token_into_id(token_text, count)
         if token is not None and token > 0:
             # Add to buffer using simple append (reliable method)
             buffer.append(token)
@@ -406,7 +556,7 @@ async def tokens_decoder(token_gen) -> Generator[bytes, None, None]:
                     
                     # Process the first chunk for immediate audio feedback
                     print(f"Processing first audio chunk with {len(buffer_to_proc)} tokens")
-                    audio_samples = convert_to_audio(buffer_to_proc, count)
+                    audio_samples = convert_to_audio(buffer_to_proc, count, perf_monitor)
                     if audio_samples is not None:
                         first_chunk_processed = True  # Mark first chunk as processed
                         yield audio_samples
@@ -421,14 +571,19 @@ async def tokens_decoder(token_gen) -> Generator[bytes, None, None]:
                         print(f"Processing buffer with {len(buffer_to_proc)} tokens, total collected: {len(buffer)}")
                     
                     # Process the tokens
-                    audio_samples = convert_to_audio(buffer_to_proc, count)
+                    audio_samples = convert_to_audio(buffer_to_proc, count, perf_monitor)
                     if audio_samples is not None:
                         yield audio_samples
 
-def tokens_decoder_sync(syn_token_gen, output_file=None):
-    """Optimized synchronous wrapper with parallel processing and efficient file I/O."""
+def tokens_decoder_sync(syn_token_gen, output_file=None, on_audio_chunk=None, perf_monitor=None):
+    """Optimized synchronous wrapper with parallel processing and efficient file I/O.
+    
+    If on_audio_chunk is given it is called with every audio chunk as soon as it is decoded.
+    perf_monitor should be the one the token generator reports to.
+    """
+    perf_monitor = perf_monitor or PerformanceMonitor()
     # Use a larger queue for high-end systems
-    queue_size = 100 if HIGH_END_GPU else 50
+    queue_size = 100 if is_high_end_gpu() else 50
     audio_queue = queue.Queue(maxsize=queue_size)
     audio_segments = []
     
@@ -443,11 +598,13 @@ def tokens_decoder_sync(syn_token_gen, output_file=None):
         wav_file.setframerate(SAMPLE_RATE)
     
     # Batch processing of tokens for improved throughput
-    batch_size = 32 if HIGH_END_GPU else 16
+    batch_size = 32 if is_high_end_gpu() else 16
     
     # Thread synchronization for proper completion detection
     producer_done_event = threading.Event()
     producer_started_event = threading.Event()
+    # A failure in the producer thread is raised to the caller once its audio is handed out
+    producer_error = []
     
     # Convert the synchronous token generator into an async generator with batching
     async def async_token_gen():
@@ -472,7 +629,7 @@ def tokens_decoder_sync(syn_token_gen, output_file=None):
             # Signal that producer has started processing
             producer_started_event.set()
             
-            async for audio_chunk in tokens_decoder(async_token_gen()):
+            async for audio_chunk in tokens_decoder(async_token_gen(), perf_monitor):
                 # Process each audio chunk from the decoder
                 if audio_chunk:
                     audio_queue.put(audio_chunk)
@@ -493,6 +650,7 @@ def tokens_decoder_sync(syn_token_gen, output_file=None):
             print(f"Error in token processing: {str(e)}")
             import traceback
             traceback.print_exc()
+            producer_error.append(e)
         finally:
             # Always signal completion, even if there was an error
             print("Producer completed - setting done event")
@@ -538,6 +696,10 @@ def tokens_decoder_sync(syn_token_gen, output_file=None):
             # Store the audio segment for return value
             audio_segments.append(audio)
             
+            # Hand the chunk to any streaming listener
+            if on_audio_chunk:
+                on_audio_chunk(audio)
+            
             # Write to file if needed
             if wav_file:
                 write_buffer.extend(audio)
@@ -583,6 +745,9 @@ def tokens_decoder_sync(syn_token_gen, output_file=None):
         if output_file:
             print(f"Audio saved to {output_file}")
     
+    if producer_error:
+        raise producer_error[0]
+    
     # Calculate and print detailed performance metrics
     if audio_segments:
         total_bytes = sum(len(segment) for segment in audio_segments)
@@ -613,6 +778,9 @@ def stream_audio(audio_buffer):
         # Normalize to float in range [-1, 1] for playback
         audio_float = audio_data.astype(np.float32) / 32767.0
         
+        # Imported here because it needs PortAudio, which servers usually don't have
+        import sounddevice as sd
+        
         # Play the audio with proper device selection and error handling
         sd.play(audio_float, SAMPLE_RATE)
         sd.wait()
@@ -620,36 +788,45 @@ def stream_audio(audio_buffer):
         print(f"Audio playback error: {e}")
 
 import re
+import uuid
+import struct
 import numpy as np
 from io import BytesIO
 import wave
 
-def split_text_into_sentences(text):
-    """Split text into sentences with a more reliable approach."""
+def find_sentence_ends(text):
+    """Return the end offsets of complete sentences in text (a sentence end needs trailing whitespace)."""
     # We'll use a simple approach that doesn't rely on variable-width lookbehinds
     # which aren't supported in Python's regex engine
     
-    # First, split on common sentence ending punctuation
+    # Split on common sentence ending punctuation followed by whitespace
     # This isn't perfect but works for most cases and avoids the regex error
-    parts = []
-    current_sentence = ""
+    ends = []
+    start = 0
     
-    for char in text:
-        current_sentence += char
-        
+    for i, char in enumerate(text):
         # If we hit a sentence ending followed by a space, consider this a potential sentence end
-        if char in (' ', '\n', '\t') and len(current_sentence) > 1:
-            prev_char = current_sentence[-2]
-            if prev_char in ('.', '!', '?'):
+        if char in (' ', '\n', '\t') and i - start >= 1:
+            if text[i - 1] in ('.', '!', '?'):
                 # Check if this is likely a real sentence end and not an abbreviation
                 # (Simple heuristic: if there's a space before the period, it's likely a real sentence end)
-                if len(current_sentence) > 3 and current_sentence[-3] not in ('.', ' '):
-                    parts.append(current_sentence.strip())
-                    current_sentence = ""
+                if i + 1 - start > 3 and text[i - 2] not in ('.', ' '):
+                    ends.append(i + 1)
+                    start = i + 1
+    
+    return ends
+
+def split_text_into_sentences(text):
+    """Split text into sentences with a more reliable approach."""
+    parts = []
+    start = 0
+    for end in find_sentence_ends(text):
+        parts.append(text[start:end].strip())
+        start = end
     
     # Add any remaining text
-    if current_sentence.strip():
-        parts.append(current_sentence.strip())
+    if text[start:].strip():
+        parts.append(text[start:].strip())
     
     # Combine very short segments to avoid tiny audio files
     min_chars = 20  # Minimum reasonable sentence length
@@ -669,21 +846,104 @@ def split_text_into_sentences(text):
     
     return combined_sentences
 
-def generate_speech_from_api(prompt, voice=DEFAULT_VOICE, output_file=None, temperature=TEMPERATURE, 
-                     top_p=TOP_P, max_tokens=MAX_TOKENS, repetition_penalty=None, 
-                     use_batching=True, max_batch_chars=1000):
-    """Generate speech from text using Orpheus model with performance optimizations."""
+def split_complete_sentences(text, min_chars=20):
+    """
+    Split the complete sentences off the front of text that is still being written.
+    
+    Returns (sentences, remainder). Short sentences are combined with the following
+    ones like split_text_into_sentences does, and the unfinished tail is returned as
+    remainder so more text can be appended to it.
+    """
+    sentences = []
+    start = 0
+    for end in find_sentence_ends(text):
+        candidate = text[start:end].strip()
+        if len(candidate) >= min_chars:
+            sentences.append(candidate)
+            start = end
+    return sentences, text[start:]
+
+def record_generation_metrics(audio_segments, total_time, voice_label):
+    """Record audio duration and realtime factor for a finished generation."""
+    total_bytes = sum(len(segment) for segment in audio_segments)
+    if total_bytes == 0 or total_time <= 0:
+        return
+    duration = total_bytes / (2 * SAMPLE_RATE)
+    AUDIO_SECONDS.inc(duration, voice=voice_label)
+    REALTIME_FACTOR.observe(duration / total_time, voice=voice_label)
+
+def create_text_batches(text, max_batch_chars=1000):
+    """Split text into sentences and combine them into batches of up to max_batch_chars."""
+    sentences = split_text_into_sentences(text)
+    
+    batches = []
+    current_batch = ""
+    
+    for sentence in sentences:
+        # If adding this sentence would exceed the batch size, start a new batch
+        if len(current_batch) + len(sentence) > max_batch_chars and current_batch:
+            batches.append(current_batch)
+            current_batch = sentence
+        else:
+            # Add separator space if needed
+            if current_batch:
+                current_batch += " "
+            current_batch += sentence
+    
+    # Add the last batch if it's not empty
+    if current_batch:
+        batches.append(current_batch)
+    
+    return batches
+
+def generate_speech_from_api(prompt, voice=DEFAULT_VOICE, output_file=None, temperature=None, 
+                     top_p=None, max_tokens=None, repetition_penalty=None, 
+                     use_batching=True, max_batch_chars=1000, on_audio_chunk=None, cancel_event=None,
+                     config=None):
+    """Generate speech from text using Orpheus model with performance optimizations.
+    
+    Returns a list of 16-bit PCM segments that together form the complete audio.
+    Long texts are returned as a single crossfaded segment.
+    
+    on_audio_chunk is called with each raw PCM chunk while it is generated, which lets
+    callers stream audio before the whole text is done. For long texts the chunks are
+    crossfaded at batch boundaries, so together they match the returned audio.
+    Raises TokenGenerationError when the LLM server fails, even if some chunks were
+    already passed on. Setting cancel_event stops
+    generation early and returns the audio produced so far.
+    
+    The runtime configuration is read once here (unless config is given), so every
+    batch of a request uses the same settings even if they are changed meanwhile.
+    """
+    config = config or get_config()
+    # Every batch of this request shares one LLM slot (when slot pinning is enabled)
+    job_id = uuid.uuid4().hex
     print(f"Starting speech generation for '{prompt[:50]}{'...' if len(prompt) > 50 else ''}'")
-    print(f"Using voice: {voice}, GPU acceleration: {'Yes (High-end)' if HIGH_END_GPU else 'Yes' if torch.cuda.is_available() else 'No'}")
+    print(f"Using voice: {voice}, GPU acceleration: {'Yes (High-end)' if is_high_end_gpu() else 'Yes' if get_hardware_info()['cuda'] else 'No'}")
     
-    # Reset performance monitor
-    global perf_monitor
+    # This request's own monitor, other generations may be running concurrently
     perf_monitor = PerformanceMonitor()
     
     start_time = time.time()
+    voice_label = metric_voice(voice)
+    
+    batched = use_batching and len(prompt) >= max_batch_chars
+    # Streamed batches get the same crossfades as the stitched result
+    crossfader = StreamCrossfader(on_audio_chunk) if batched and on_audio_chunk else None
+    send_chunk = crossfader.add_chunk if crossfader else on_audio_chunk
+    
+    # Record time to first audio, then pass chunks on to the caller
+    first_audio_time = []
+    def handle_audio_chunk(chunk):
+        if not first_audio_time:
+            first_audio_time.append(time.time())
+            TIME_TO_FIRST_AUDIO.observe(first_audio_time[0] - start_time, voice=voice_label)
+        if send_chunk:
+            send_chunk(chunk)
     
     # For shorter text, use the standard non-batched approach
-    if not use_batching or len(prompt) < max_batch_chars:
+    if not batched:
+        GENERATION_BATCHES.inc(voice=voice_label)
         # Note: we ignore any provided repetition_penalty and always use the hardcoded value
         # This ensures consistent quality regardless of what might be passed in
         result = tokens_decoder_sync(
@@ -693,58 +953,42 @@ def generate_speech_from_api(prompt, voice=DEFAULT_VOICE, output_file=None, temp
                 temperature=temperature,
                 top_p=top_p,
                 max_tokens=max_tokens,
-                repetition_penalty=REPETITION_PENALTY  # Always use hardcoded value
+                repetition_penalty=REPETITION_PENALTY,  # Always use hardcoded value
+                cancel_event=cancel_event,
+                config=config,
+                job_id=job_id,
+                perf_monitor=perf_monitor
             ),
-            output_file=output_file
+            output_file=output_file,
+            on_audio_chunk=handle_audio_chunk,
+            perf_monitor=perf_monitor
         )
         
         # Report final performance metrics
         end_time = time.time()
         total_time = end_time - start_time
         print(f"Total speech generation completed in {total_time:.2f} seconds")
+        record_generation_metrics(result, total_time, voice_label)
         
         return result
     
     # For longer text, use sentence-based batching
     print(f"Using sentence-based batching for text with {len(prompt)} characters")
     
-    # Split the text into sentences
-    sentences = split_text_into_sentences(prompt)
-    print(f"Split text into {len(sentences)} segments")
-    
-    # Create batches by combining sentences up to max_batch_chars
-    batches = []
-    current_batch = ""
-    
-    for sentence in sentences:
-        # If adding this sentence would exceed the batch size, start a new batch
-        if len(current_batch) + len(sentence) > max_batch_chars and current_batch:
-            batches.append(current_batch)
-            current_batch = sentence
-        else:
-            # Add separator space if needed
-            if current_batch:
-                current_batch += " "
-            current_batch += sentence
-    
-    # Add the last batch if it's not empty
-    if current_batch:
-        batches.append(current_batch)
-    
+    # Split the text into sentences and combine them into batches
+    batches = create_text_batches(prompt, max_batch_chars)
     print(f"Created {len(batches)} batches for processing")
     
-    # Process each batch and collect audio segments
+    # Process each batch and collect audio segments in memory
     all_audio_segments = []
-    batch_temp_files = []
+    batch_audio = []
     
     for i, batch in enumerate(batches):
+        if cancel_event is not None and cancel_event.is_set():
+            print(f"Generation cancelled before batch {i+1}/{len(batches)}")
+            break
         print(f"Processing batch {i+1}/{len(batches)} ({len(batch)} characters)")
-        
-        # Create a temporary file for this batch if an output file is requested
-        temp_output_file = None
-        if output_file:
-            temp_output_file = f"outputs/temp_batch_{i}_{int(time.time())}.wav"
-            batch_temp_files.append(temp_output_file)
+        GENERATION_BATCHES.inc(voice=voice_label)
         
         # Generate speech for this batch
         batch_segments = tokens_decoder_sync(
@@ -754,25 +998,32 @@ def generate_speech_from_api(prompt, voice=DEFAULT_VOICE, output_file=None, temp
                 temperature=temperature,
                 top_p=top_p,
                 max_tokens=max_tokens,
-                repetition_penalty=REPETITION_PENALTY
+                repetition_penalty=REPETITION_PENALTY,
+                cancel_event=cancel_event,
+                config=config,
+                job_id=job_id,
+                perf_monitor=perf_monitor
             ),
-            output_file=temp_output_file
+            on_audio_chunk=handle_audio_chunk,
+            perf_monitor=perf_monitor
         )
         
         # Add to our collection
         all_audio_segments.extend(batch_segments)
+        batch_audio.append(b"".join(batch_segments))
+        if crossfader:
+            crossfader.end_segment()
     
-    # If an output file was requested, stitch together the temporary files
-    if output_file and batch_temp_files:
-        # Stitch together WAV files
-        stitch_wav_files(batch_temp_files, output_file)
-        
-        # Clean up temporary files
-        for temp_file in batch_temp_files:
-            try:
-                os.remove(temp_file)
-            except Exception as e:
-                print(f"Warning: Could not remove temporary file {temp_file}: {e}")
+    if crossfader:
+        crossfader.finish()
+    
+    # Stitch the batches together with crossfades without touching disk
+    stitched_audio = stitch_audio_segments(batch_audio)
+    
+    # Write the stitched audio if an output file was requested
+    if output_file and stitched_audio:
+        write_wav_file(output_file, stitched_audio)
+        print(f"Audio saved to {output_file}")
     
     # Report final performance metrics
     end_time = time.time()
@@ -788,7 +1039,165 @@ def generate_speech_from_api(prompt, voice=DEFAULT_VOICE, output_file=None, temp
         
     print(f"Total speech generation completed in {total_time:.2f} seconds")
     
-    return all_audio_segments
+    # Return the crossfaded audio as a single segment so it matches the output file
+    result = [stitched_audio] if stitched_audio else []
+    record_generation_metrics(result, total_time, voice_label)
+    return result
+
+def create_output_path(voice, directory="outputs", extension="wav"):
+    """Build a collision-free output path from the voice, a timestamp and a random suffix."""
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    return os.path.join(directory, f"{voice}_{timestamp}_{uuid.uuid4().hex[:8]}.{extension}")
+
+def create_wav_header(sample_rate=SAMPLE_RATE, data_size=None):
+    """Build a 16-bit mono WAV header; without data_size the length is left open for streaming."""
+    if data_size is None:
+        # Unknown length - use the largest size so players keep reading until the stream ends
+        data_size = 0xFFFFFFFF - 36
+    byte_rate = sample_rate * 2
+    return (
+        b"RIFF" + struct.pack("<I", data_size + 36) + b"WAVE" +
+        b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, byte_rate, 2, 16) +
+        b"data" + struct.pack("<I", data_size)
+    )
+
+def write_wav_file(output_file, audio_data, sample_rate=SAMPLE_RATE):
+    """Write 16-bit mono PCM audio to a WAV file."""
+    directory = os.path.dirname(os.path.abspath(output_file))
+    os.makedirs(directory, exist_ok=True)
+    with wave.open(output_file, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(audio_data)
+
+def audio_to_wav_bytes(audio_data, sample_rate=SAMPLE_RATE):
+    """Wrap 16-bit mono PCM audio in an in-memory WAV container."""
+    return create_wav_header(sample_rate, data_size=len(audio_data)) + audio_data
+
+def stitch_audio_segments(segments, crossfade_ms=50, sample_rate=SAMPLE_RATE):
+    """Join 16-bit PCM segments in memory with crossfading for smooth transitions."""
+    segments = [segment for segment in segments if segment]
+    if not segments:
+        return b""
+    if len(segments) == 1:
+        return bytes(segments[0])
+    
+    # Convert crossfade_ms to samples
+    crossfade_samples = int(sample_rate * crossfade_ms / 1000)
+    print(f"Stitching {len(segments)} segments with {crossfade_ms}ms crossfade ({crossfade_samples} samples)")
+    
+    # Crossfade weights are the same for every transition
+    fade_out = np.linspace(1.0, 0.0, crossfade_samples)
+    fade_in = np.linspace(0.0, 1.0, crossfade_samples)
+    
+    # Collect pieces and concatenate once at the end
+    pieces = []
+    tail = np.frombuffer(segments[0], dtype=np.int16)
+    
+    for i, segment in enumerate(segments[1:], start=1):
+        audio = np.frombuffer(segment, dtype=np.int16)
+        
+        if len(tail) >= crossfade_samples and len(audio) >= crossfade_samples:
+            # Combine: previous without its last crossfade_samples + crossfade + new without first crossfade_samples
+            crossfade_region = (tail[-crossfade_samples:] * fade_out + 
+                                audio[:crossfade_samples] * fade_in).astype(np.int16)
+            pieces.append(tail[:-crossfade_samples])
+            pieces.append(crossfade_region)
+            tail = audio[crossfade_samples:]
+        else:
+            # One segment too short for crossfade, just append
+            print(f"Segment {i} too short for crossfade, concatenating directly")
+            pieces.append(tail)
+            tail = audio
+    
+    pieces.append(tail)
+    return np.concatenate(pieces).tobytes()
+
+class StreamCrossfader:
+    """Crossfade 16-bit PCM segments like stitch_audio_segments while they are streamed
+    
+    Chunks are passed to on_audio_chunk as they arrive, except for the last crossfade_ms
+    of each segment. That part is held back until the start of the next segment is known,
+    so the streamed audio is the same as the stitched audio, byte for byte.
+    """
+    def __init__(self, on_audio_chunk, crossfade_ms=50, sample_rate=SAMPLE_RATE):
+        self.on_audio_chunk = on_audio_chunk
+        self.crossfade_samples = int(sample_rate * crossfade_ms / 1000)
+        self.crossfade_bytes = self.crossfade_samples * 2
+        self.fade_out = np.linspace(1.0, 0.0, self.crossfade_samples)
+        self.fade_in = np.linspace(0.0, 1.0, self.crossfade_samples)
+        # End of the previous segment's tail and whether that tail is long enough to crossfade
+        self.previous = None
+        self.previous_full = False
+        # Start of the current segment, collected until a crossfade is possible
+        self.head = bytearray()
+        # Unsent end of the current segment and its length after the crossfade
+        self.pending = bytearray()
+        self.tail_bytes = 0
+        self.in_head = False
+    
+    def _emit(self, data):
+        if data:
+            self.on_audio_chunk(bytes(data))
+    
+    def _start_tail(self, data):
+        self.in_head = False
+        self.pending = bytearray()
+        self.tail_bytes = 0
+        self._add_tail(data)
+    
+    def _add_tail(self, data):
+        self.pending += data
+        self.tail_bytes += len(data)
+        if len(self.pending) > self.crossfade_bytes:
+            cut = len(self.pending) - self.crossfade_bytes
+            self._emit(self.pending[:cut])
+            del self.pending[:cut]
+    
+    def add_chunk(self, chunk):
+        if not self.in_head:
+            self._add_tail(chunk)
+            return
+        self.head += chunk
+        if len(self.head) < self.crossfade_bytes:
+            return
+        if self.previous is None:
+            self._start_tail(self.head)
+        elif self.previous_full:
+            previous = np.frombuffer(bytes(self.previous), dtype=np.int16)
+            start = np.frombuffer(bytes(self.head[:self.crossfade_bytes]), dtype=np.int16)
+            self._emit((previous * self.fade_out + start * self.fade_in).astype(np.int16).tobytes())
+            self._start_tail(self.head[self.crossfade_bytes:])
+        else:
+            self._emit(self.previous)
+            self._start_tail(self.head)
+        self.head = bytearray()
+    
+    def end_segment(self):
+        """Mark the end of a segment, its held-back end is blended into the next one"""
+        if self.in_head:
+            # Empty segments are skipped, short ones are appended without a crossfade
+            if self.head:
+                if self.previous is not None:
+                    self._emit(self.previous)
+                self.previous, self.previous_full = self.head, False
+                self.head = bytearray()
+            return
+        self.previous, self.previous_full = self.pending, self.tail_bytes >= self.crossfade_bytes
+        self.pending = bytearray()
+        self.tail_bytes = 0
+        self.in_head = True
+    
+    def finish(self):
+        """Send the held-back audio once the last segment is done"""
+        if self.in_head:
+            if self.previous is not None:
+                self._emit(self.previous)
+            self._emit(self.head)
+        else:
+            self._emit(self.pending)
+        self.previous, self.head, self.pending = None, bytearray(), bytearray()
 
 def stitch_wav_files(input_files, output_file, crossfade_ms=50):
     """Stitch multiple WAV files together with crossfading for smooth transitions."""
@@ -803,12 +1212,7 @@ def stitch_wav_files(input_files, output_file, crossfade_ms=50):
         shutil.copy(input_files[0], output_file)
         return
     
-    # Convert crossfade_ms to samples
-    crossfade_samples = int(SAMPLE_RATE * crossfade_ms / 1000)
-    print(f"Using {crossfade_samples} samples for crossfade at {SAMPLE_RATE}Hz")
-    
-    # Build the final audio in memory with crossfades
-    final_audio = np.array([], dtype=np.int16)
+    segments = []
     first_params = None
     
     for i, input_file in enumerate(input_files):
@@ -816,34 +1220,10 @@ def stitch_wav_files(input_files, output_file, crossfade_ms=50):
             with wave.open(input_file, 'rb') as wav:
                 if first_params is None:
                     first_params = wav.getparams()
-                elif wav.getparams() != first_params:
+                elif wav.getparams()[:3] != first_params[:3]:
                     print(f"Warning: WAV file {input_file} has different parameters")
                     
-                frames = wav.readframes(wav.getnframes())
-                audio = np.frombuffer(frames, dtype=np.int16)
-                
-                if i == 0:
-                    # First segment - use as is
-                    final_audio = audio
-                else:
-                    # Apply crossfade with previous segment
-                    if len(final_audio) >= crossfade_samples and len(audio) >= crossfade_samples:
-                        # Create crossfade weights
-                        fade_out = np.linspace(1.0, 0.0, crossfade_samples)
-                        fade_in = np.linspace(0.0, 1.0, crossfade_samples)
-                        
-                        # Apply crossfade
-                        crossfade_region = (final_audio[-crossfade_samples:] * fade_out + 
-                                           audio[:crossfade_samples] * fade_in).astype(np.int16)
-                        
-                        # Combine: original without last crossfade_samples + crossfade + new without first crossfade_samples
-                        final_audio = np.concatenate([final_audio[:-crossfade_samples], 
-                                                    crossfade_region, 
-                                                    audio[crossfade_samples:]])
-                    else:
-                        # One segment too short for crossfade, just append
-                        print(f"Segment {i} too short for crossfade, concatenating directly")
-                        final_audio = np.concatenate([final_audio, audio])
+                segments.append(wav.readframes(wav.getnframes()))
         except Exception as e:
             print(f"Error processing file {input_file}: {e}")
             if i == 0:
@@ -851,12 +1231,13 @@ def stitch_wav_files(input_files, output_file, crossfade_ms=50):
     
     # Write the final audio data to the output file
     try:
+        if first_params is None:
+            raise ValueError("No valid WAV files were processed")
+        
+        final_audio = stitch_audio_segments(segments, crossfade_ms, sample_rate=first_params.framerate)
         with wave.open(output_file, 'wb') as output_wav:
-            if first_params is None:
-                raise ValueError("No valid WAV files were processed")
-                
             output_wav.setparams(first_params)
-            output_wav.writeframes(final_audio.tobytes())
+            output_wav.writeframes(final_audio)
         
         print(f"Successfully stitched audio to {output_file} with crossfading")
     except Exception as e:
@@ -907,9 +1288,8 @@ def main():
     if not output_file:
         # Create outputs directory if it doesn't exist
         os.makedirs("outputs", exist_ok=True)
-        # Generate a filename based on the voice and a timestamp
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        output_file = f"outputs/{args.voice}_{timestamp}.wav"
+        # Generate a unique filename based on the voice and a timestamp
+        output_file = create_output_path(args.voice)
         print(f"No output file specified. Saving to {output_file}")
     
     # Generate speech
@@ -0,0 +1,227 @@
+"""
+Prometheus-style metrics for the TTS server.
+
+A small in-process registry of counters, gauges and histograms rendered in
+the Prometheus text exposition format, so no client library is required.
+All metric updates are thread-safe because generation runs in worker threads.
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    """Common label handling for all metric types"""
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read an unlabelled counter's value from function at collection time"""
+        self._function = function
+
+    def collect(self) -> List[str]:
+        lines = self._header()
+        if self._function is not None:
+            lines.append(f"{self.name} {_format_value(self._function())}")
+            return lines
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read an unlabelled gauge's value from function at collection time"""
+        self._function = function
+
+    def collect(self) -> List[str]:
+        lines = self._header()
+        if self._function is not None:
+            lines.append(f"{self.name} {_format_value(self._function())}")
+            return lines
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def collect(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted((key, dict(state, counts=list(state["counts"]))) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            inf_label = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf_label)} {state['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state['count']}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def render_metrics() -> str:
+    """Render all registered metrics in the Prometheus text format"""
+    return REGISTRY.render()
+
+# Request-level metrics (recorded by the web server)
+REQUESTS_TOTAL = Counter(
+    "orpheus_requests_total", "Speech requests by endpoint, voice and HTTP status",
+    ("endpoint", "voice", "status"))
+REQUEST_LATENCY = Histogram(
+    "orpheus_request_duration_seconds", "End-to-end speech request latency",
+    ("endpoint", "voice"))
+QUEUE_DEPTH = Gauge("orpheus_queue_depth", "Requests waiting for a generation slot")
+ACTIVE_GENERATIONS = Gauge("orpheus_active_generations", "Generations currently running")
+ADMISSION_REJECTIONS = Counter(
+    "orpheus_admission_rejections_total", "Requests rejected by admission control by HTTP status",
+    ("status",))
+COALESCED_REQUESTS = Counter(
+    "orpheus_coalesced_requests_total", "Requests served by an identical in-flight generation",
+    ("endpoint", "voice"))
+
+# Engine-level metrics (recorded by tts_engine)
+TIME_TO_FIRST_AUDIO = Histogram(
+    "orpheus_time_to_first_audio_seconds", "Time from generation start to the first decoded audio chunk",
+    ("voice",))
+REALTIME_FACTOR = Histogram(
+    "orpheus_realtime_factor", "Seconds of audio generated per second of wall time",
+    ("voice",), buckets=(0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0))
+LLM_TOKENS_PER_SECOND = Histogram(
+    "orpheus_llm_tokens_per_second", "Token throughput of each LLM completion stream",
+    ("voice",), buckets=(10, 25, 50, 75, 100, 150, 200, 300, 500, 1000))
+LLM_TOKENS = Counter("orpheus_llm_tokens_total", "Tokens received from the LLM backend", ("voice",))
+SNAC_DECODE_SECONDS = Histogram(
+    "orpheus_snac_decode_seconds", "SNAC decode time per audio chunk by token window size",
+    ("window",), buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+LLM_PROMPT_EVAL_SECONDS = Histogram(
+    "orpheus_llm_prompt_eval_seconds", "Prompt evaluation time reported by the LLM backend",
+    ("voice",), buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LLM_PROMPT_TOKENS = Counter(
+    "orpheus_llm_prompt_tokens_total", "Prompt tokens evaluated by the LLM backend or reused from its cache",
+    ("source",))
+AUDIO_SECONDS = Counter("orpheus_audio_seconds_total", "Seconds of audio generated", ("voice",))
+GENERATION_BATCHES = Counter(
+    "orpheus_generation_batches_total", "Text batches sent to the LLM (long texts are split into several)",
+    ("voice",))
+TOKEN_CACHE_HITS = Counter("orpheus_token_cache_hits_total", "Token-to-ID conversions served from cache")
+TOKEN_CACHE_MISSES = Counter("orpheus_token_cache_misses_total", "Token-to-ID conversions that were computed")
@@ -0,0 +1,128 @@
+"""
+Lifecycle management for generated audio files in the outputs/ directory.
+
+A background thread periodically deletes files older than a TTL and, when the
+directory grows beyond its size limit, removes the oldest files first.
+"""
+
+import os
+import time
+import threading
+from typing import List, Tuple
+
+# Janitor settings from environment variables
+try:
+    OUTPUT_TTL_SECONDS = int(os.environ.get("ORPHEUS_OUTPUT_TTL", "86400"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_OUTPUT_TTL value, using 86400 seconds as fallback")
+    OUTPUT_TTL_SECONDS = 86400
+
+try:
+    OUTPUT_MAX_MB = int(os.environ.get("ORPHEUS_OUTPUT_MAX_MB", "1024"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_OUTPUT_MAX_MB value, using 1024 MB as fallback")
+    OUTPUT_MAX_MB = 1024
+
+try:
+    SWEEP_INTERVAL = int(os.environ.get("ORPHEUS_OUTPUT_SWEEP_INTERVAL", "300"))
+except (ValueError, TypeError):
+    print("WARNING: Invalid ORPHEUS_OUTPUT_SWEEP_INTERVAL value, using 300 seconds as fallback")
+    SWEEP_INTERVAL = 300
+
+# Only audio files are managed, anything else in the directory is left alone
+MANAGED_EXTENSIONS = (".wav", ".mp3")
+
+class OutputJanitor:
+    """Delete expired generated files and keep the outputs directory under a size limit"""
+    def __init__(self, directory: str = "outputs", ttl_seconds: int = OUTPUT_TTL_SECONDS,
+                 max_bytes: int = OUTPUT_MAX_MB * 1024 * 1024, interval: int = SWEEP_INTERVAL):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.interval = max(1, interval)
+        self.deleted_files = 0
+        self.deleted_bytes = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _list_files(self) -> List[Tuple[float, int, str]]:
+        """Return (mtime, size, path) for managed files, oldest first"""
+        files = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.endswith(MANAGED_EXTENSIONS):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            return []
+        files.sort()
+        return files
+
+    def _delete(self, path: str, size: int) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Warning: Could not remove output file {path}: {e}")
+            return False
+        self.deleted_files += 1
+        self.deleted_bytes += size
+        return True
+
+    def sweep(self) -> int:
+        """Run one cleanup pass and return the number of files deleted"""
+        files = self._list_files()
+        now = time.time()
+        deleted = 0
+        remaining = []
+
+        # Expire old files
+        for mtime, size, path in files:
+            if self.ttl_seconds > 0 and now - mtime > self.ttl_seconds:
+                if self._delete(path, size):
+                    deleted += 1
+            else:
+                remaining.append((mtime, size, path))
+
+        # Enforce the size limit, oldest first
+        if self.max_bytes > 0:
+            total_bytes = sum(size for _, size, _ in remaining)
+            for mtime, size, path in remaining:
+                if total_bytes <= self.max_bytes:
+                    break
+                if self._delete(path, size):
+                    deleted += 1
+                total_bytes -= size
+
+        if deleted:
+            print(f"Output janitor removed {deleted} files from {self.directory}/")
+        return deleted
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error in output janitor: {e}")
+            self._stop_event.wait(self.interval)
+
+    def start(self) -> None:
+        """Start sweeping in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="OutputJanitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
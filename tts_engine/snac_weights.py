@@ -0,0 +1,148 @@
+"""
+Local, memory-mapped SNAC weights.
+
+By default SNAC is downloaded from the Hugging Face hub. When ORPHEUS_SNAC_PATH
+points to a directory exported with this module the weights are loaded from
+disk without any network access. The weight files are memory-mapped, so on CPU
+every server process on a host shares the same read-only pages instead of
+holding a private copy.
+
+Export the weights once (needs network access or a local hub snapshot):
+
+    python -m tts_engine.snac_weights --output models/snac_24khz
+"""
+
+import os
+import json
+import time
+import argparse
+from typing import Optional
+
+# Hugging Face repository used when no local path is configured
+SNAC_REPO_ID = "hubertsiuzdak/snac_24khz"
+
+# Directory with config.json and exported weights (empty means download from the hub)
+SNAC_PATH = os.environ.get("ORPHEUS_SNAC_PATH", "")
+
+# Weight files looked up in SNAC_PATH, in order of preference
+WEIGHT_FILES = ("model.safetensors", "model.pt", "pytorch_model.bin")
+
+def find_weights(directory: str) -> Optional[str]:
+    """Return the preferred weight file in directory, or None if there is none"""
+    for name in WEIGHT_FILES:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+def load_state_dict(weights_path: str):
+    """Load a state dict with its tensors memory-mapped from weights_path"""
+    import torch
+
+    if weights_path.endswith(".safetensors"):
+        try:
+            from safetensors.torch import load_file
+        except ImportError:
+            raise ImportError(f"safetensors is required to load {weights_path} (pip install safetensors)")
+        # safetensors maps the file and returns tensors that view it
+        return load_file(weights_path, device="cpu")
+
+    try:
+        return torch.load(weights_path, map_location="cpu", mmap=True, weights_only=True)
+    except (TypeError, RuntimeError) as e:
+        # Older torch versions or legacy (non-zip) files can't be mapped
+        print(f"Warning: Could not memory-map {weights_path} ({e}), loading it into memory")
+        return torch.load(weights_path, map_location="cpu")
+
+def load_local_snac(directory: str):
+    """Build SNAC from config.json in directory and attach the mapped weights"""
+    from snac import SNAC
+
+    config_path = os.path.join(directory, "config.json")
+    weights_path = find_weights(directory)
+    if not os.path.isfile(config_path) or weights_path is None:
+        raise FileNotFoundError(
+            f"ORPHEUS_SNAC_PATH={directory} must contain config.json and one of {', '.join(WEIGHT_FILES)}. "
+            f"Create it with: python -m tts_engine.snac_weights --output {directory}"
+        )
+
+    model = SNAC.from_config(config_path)
+    state_dict = load_state_dict(weights_path)
+    try:
+        # assign=True keeps the mapped tensors instead of copying them into the
+        # randomly initialised parameters, which are then freed
+        model.load_state_dict(state_dict, assign=True)
+    except TypeError:
+        model.load_state_dict(state_dict)
+    print(f"Loaded SNAC weights from {weights_path}")
+    return model.eval()
+
+def load_snac(path: Optional[str] = None):
+    """Load SNAC from a local directory if configured, otherwise from the hub"""
+    path = SNAC_PATH if path is None else path
+    if path:
+        return load_local_snac(path)
+
+    from snac import SNAC
+    return SNAC.from_pretrained(SNAC_REPO_ID).eval()
+
+def export_snac(output_dir: str, source: str = SNAC_REPO_ID, weights_format: str = "auto") -> str:
+    """Write config.json and memory-mappable weights for SNAC to output_dir"""
+    import torch
+    from snac import SNAC
+
+    if weights_format == "auto":
+        try:
+            import safetensors  # noqa: F401
+            weights_format = "safetensors"
+        except ImportError:
+            weights_format = "pt"
+
+    model = SNAC.from_pretrained(source)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Recover the constructor arguments from the source config
+    if os.path.isdir(source):
+        config_path = os.path.join(source, "config.json")
+    else:
+        from huggingface_hub import hf_hub_download
+        config_path = hf_hub_download(repo_id=source, filename="config.json")
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    with open(os.path.join(output_dir, "config.json"), "w") as f:
+        json.dump(config, f, indent=2)
+
+    state_dict = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+    if weights_format == "safetensors":
+        from safetensors.torch import save_file
+        weights_path = os.path.join(output_dir, "model.safetensors")
+        save_file(state_dict, weights_path)
+    else:
+        # The zip-based torch format can be memory-mapped by torch.load(mmap=True)
+        weights_path = os.path.join(output_dir, "model.pt")
+        torch.save(state_dict, weights_path)
+
+    # Remove weights of the other format so the directory is unambiguous
+    for name in WEIGHT_FILES:
+        stale = os.path.join(output_dir, name)
+        if stale != weights_path and os.path.isfile(stale):
+            os.remove(stale)
+
+    return weights_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Export SNAC weights for offline, memory-mapped loading")
+    parser.add_argument("--output", type=str, required=True, help="Directory to write config.json and weights to")
+    parser.add_argument("--source", type=str, default=SNAC_REPO_ID,
+                        help=f"Hugging Face repository or local snapshot to export (default: {SNAC_REPO_ID})")
+    parser.add_argument("--format", type=str, choices=["auto", "safetensors", "pt"], default="auto",
+                        help="Weight file format (default: safetensors if installed, otherwise pt)")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    weights_path = export_snac(args.output, args.source, args.format)
+    print(f"Exported SNAC weights to {weights_path} in {time.time() - start_time:.2f}s")
+    print(f"Set ORPHEUS_SNAC_PATH={args.output} to load them without network access")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,11 @@
-from snac import SNAC
 import numpy as np
-import torch
 import asyncio
 import threading
 import queue
 import time
 import os
 import sys
+from .metrics import TOKEN_CACHE_HITS, TOKEN_CACHE_MISSES
 
 # Helper to detect if running in Uvicorn's reloader (same as in inference.py)
 def is_reloader_process():
@@ -17,46 +16,84 @@ def is_reloader_process():
 # Set a flag to avoid repeat messages
 IS_RELOADER = is_reloader_process()
 
-# Try to enable torch.compile if PyTorch 2.0+ is available
+# torch and the SNAC model are loaded on first use (or by an explicit load_model()
+# call during startup), so importing the package stays cheap
 TORCH_COMPILE_AVAILABLE = False
-try:
-    if hasattr(torch, 'compile'):
-        TORCH_COMPILE_AVAILABLE = True
-        if not IS_RELOADER:
-            print("PyTorch 2.0+ detected, torch.compile is available")
-except:
-    pass
-
-# Try to enable CUDA graphs if available
 CUDA_GRAPHS_AVAILABLE = False
-try:
-    if torch.cuda.is_available() and hasattr(torch.cuda, 'make_graphed_callables'):
-        CUDA_GRAPHS_AVAILABLE = True
-        if not IS_RELOADER:
-            print("CUDA graphs support is available")
-except:
-    pass
-
-model = SNAC.from_pretrained("hubertsiuzdak/snac_24khz").eval()
+model = None
+snac_device = None
+cuda_stream = None
 
-# Check if CUDA is available and set device accordingly
-snac_device = "cuda" if torch.cuda.is_available() else "mps" if torch.backends.mps.is_available() else "cpu"
-if not IS_RELOADER:
-    print(f"Using device: {snac_device}")
-model = model.to(snac_device)
+# Readiness state: "unloaded", "loading", "ready" or "failed"
+model_state = {"status": "unloaded", "device": None, "load_seconds": None, "error": None}
+_model_lock = threading.Lock()
 
-# Disable torch.compile as it requires Triton which isn't installed
-# We'll use regular PyTorch optimization techniques instead
-if not IS_RELOADER:
-    print("Using standard PyTorch optimizations (torch.compile disabled)")
+def load_model():
+    """Load the SNAC decoder onto the best available device if it is not loaded yet."""
+    global model, snac_device, cuda_stream, TORCH_COMPILE_AVAILABLE, CUDA_GRAPHS_AVAILABLE
+    if model is not None:
+        return model
+    
+    with _model_lock:
+        if model is not None:
+            return model
+        
+        model_state["status"] = "loading"
+        model_state["error"] = None
+        start_time = time.time()
+        try:
+            import torch
+            from .snac_weights import load_snac
+            from . import cpu
+            
+            # Partition the CPU unless a process manager already did (server.py workers)
+            if cpu.applied["threads"] is None:
+                cpu.check_oversubscription(1, cpu.configure_decode_threads())
+            
+            # Try to enable torch.compile if PyTorch 2.0+ is available
+            if hasattr(torch, 'compile'):
+                TORCH_COMPILE_AVAILABLE = True
+                print("PyTorch 2.0+ detected, torch.compile is available")
+            
+            # Try to enable CUDA graphs if available
+            if torch.cuda.is_available() and hasattr(torch.cuda, 'make_graphed_callables'):
+                CUDA_GRAPHS_AVAILABLE = True
+                print("CUDA graphs support is available")
+            
+            # From ORPHEUS_SNAC_PATH (memory-mapped, offline) if set, otherwise from the hub
+            snac_model = load_snac()
+            
+            # Check if CUDA is available and set device accordingly
+            device = "cuda" if torch.cuda.is_available() else "mps" if torch.backends.mps.is_available() else "cpu"
+            print(f"Using device: {device}")
+            snac_model = snac_model.to(device)
+            
+            # Disable torch.compile as it requires Triton which isn't installed
+            # We'll use regular PyTorch optimization techniques instead
+            print("Using standard PyTorch optimizations (torch.compile disabled)")
+            
+            # Prepare CUDA streams for parallel processing if available
+            if device == "cuda":
+                cuda_stream = torch.cuda.Stream()
+                print("Using CUDA stream for parallel processing")
+        except Exception as e:
+            model_state["status"] = "failed"
+            model_state["error"] = str(e)
+            print(f"Error loading SNAC model: {e}")
+            raise
+        
+        snac_device = device
+        model = snac_model
+        model_state.update(status="ready", device=device, load_seconds=round(time.time() - start_time, 3))
+        print(f"SNAC model loaded in {model_state['load_seconds']:.2f}s")
+    return model
 
-# Prepare CUDA streams for parallel processing if available
-cuda_stream = None
-if snac_device == "cuda":
-    cuda_stream = torch.cuda.Stream()
-    if not IS_RELOADER:
-        print("Using CUDA stream for parallel processing")
+def get_model_state():
+    """Return a copy of the model readiness state."""
+    return dict(model_state)
 
+def is_model_ready():
+    return model is not None
 
 def convert_to_audio(multiframe, count):
     """
@@ -65,6 +102,9 @@ def convert_to_audio(multiframe, count):
     """
     if len(multiframe) < 7:
         return None
+    
+    import torch
+    load_model()
   
     num_frames = len(multiframe) // 7
     frame = multiframe[:num_frames*7]
@@ -140,6 +180,11 @@ CUSTOM_TOKEN_PREFIX = "<custom_token_"
 token_id_cache = {}
 MAX_CACHE_SIZE = 10000  # Increased cache size for better performance
 
+# Cache effectiveness counters, read by the metrics endpoint at scrape time
+token_cache_stats = {"hits": 0, "misses": 0}
+TOKEN_CACHE_HITS.set_function(lambda: token_cache_stats["hits"])
+TOKEN_CACHE_MISSES.set_function(lambda: token_cache_stats["misses"])
+
 def turn_token_into_id(token_string, index):
     """
     Optimized token-to-ID conversion with caching.
@@ -155,7 +200,9 @@ def turn_token_into_id(token_string, index):
     # Check cache first (significant speedup for repeated tokens)
     cache_key = (token_string, index % 7)
     if cache_key in token_id_cache:
+        token_cache_stats["hits"] += 1
         return token_id_cache[cache_key]
+    token_cache_stats["misses"] += 1
         
     # Early rejection for obvious non-matches
     if CUSTOM_TOKEN_PREFIX not in token_string:
@@ -185,6 +232,19 @@ def turn_token_into_id(token_string, index):
     except (ValueError, IndexError):
         return None
 
+# <custom_token_N> has token ID 128256 + N, and its code is N - 10 - (index % 7) * 4096
+AUDIO_TOKEN_ID_OFFSET = 128256 + 10
+
+def token_id_to_code(token_id, index):
+    """
+    Convert an audio token ID straight to a SNAC code.
+    
+    Returns None for token IDs that aren't audio tokens (e.g. end of speech).
+    """
+    if token_id < AUDIO_TOKEN_ID_OFFSET:
+        return None
+    return token_id - AUDIO_TOKEN_ID_OFFSET - ((index % 7) * 4096)
+
 async def tokens_decoder(token_gen):
     """Optimized token decoder with early first-chunk processing for lower latency"""
     buffer = []
@@ -291,6 +351,8 @@ async def tokens_decoder(token_gen):
 # ------------------ Synchronous Tokens Decoder Wrapper ------------------ #
 def tokens_decoder_sync(syn_token_gen):
     """Optimized synchronous decoder with larger queue and parallel processing"""
+    load_model()
+    
     # Use a larger queue for RTX 4090 to maximize GPU utilization
     max_queue_size = 32 if snac_device == "cuda" else 8
     audio_queue = queue.Queue(maxsize=max_queue_size)
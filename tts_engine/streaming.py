@@ -0,0 +1,46 @@
+"""
+Incremental text segmentation for streaming text-to-speech.
+
+Text that arrives in fragments (for example tokens from an upstream LLM) is
+buffered until a complete sentence is available, using the same sentence
+boundaries as the batch splitter, so each sentence can be voiced as soon as
+it has been written.
+"""
+
+from typing import List
+
+from .inference import split_complete_sentences
+
+class SentenceSegmenter:
+    """Buffer text fragments and emit complete sentences"""
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    @property
+    def pending(self) -> str:
+        """Text received that has not been emitted yet"""
+        return self._buffer
+
+    def feed(self, text: str) -> List[str]:
+        """Add a text fragment and return any sentences it completed"""
+        self._buffer += text
+        sentences, self._buffer = split_complete_sentences(self._buffer, self.min_chars)
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Emit whatever text is buffered, even an unfinished sentence"""
+        sentences, remainder = split_complete_sentences(self._buffer, self.min_chars)
+        remainder = remainder.strip()
+        if remainder:
+            # A short trailing piece is voiced together with the sentence before it
+            if sentences and len(remainder) < self.min_chars:
+                sentences[-1] = f"{sentences[-1]} {remainder}"
+            else:
+                sentences.append(remainder)
+        self._buffer = ""
+        return sentences
+
+    def clear(self) -> None:
+        """Drop buffered text without emitting it"""
+        self._buffer = ""
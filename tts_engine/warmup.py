@@ -0,0 +1,109 @@
+"""
+Startup warm-up for the TTS engine.
+
+The first request after a start is slow because SNAC has never decoded the
+window shapes the decoder uses and the LLM server has no cached prompt prefix
+for the voices. Warm-up decodes a dummy window of every shape and sends a
+one-token priming completion for each configured voice prefix.
+
+Priming helps when requests can find the primed slot: without slot pinning
+(ORPHEUS_LLM_SLOTS=0, llama.cpp picks the slot with the most similar cached
+prompt) or with ORPHEUS_SLOT_AFFINITY=voice. With pinning by job, requests
+go to a slot derived from their own ID and skip the primed cache.
+"""
+
+import os
+import time
+from typing import Iterable, List, Optional
+
+import requests
+
+from .inference import HEADERS, PROMPT_CACHE, SLOT_AFFINITY, select_slot
+from .config import get_config
+from .voices import AVAILABLE_VOICES, DEFAULT_VOICE
+from .speechpipe import load_model, convert_to_audio
+
+# Window sizes used by the decoders: the first chunk, the standard window and the 7x7 window
+WARMUP_WINDOWS = (7, 28, 49)
+
+# Voices whose prompt prefix is primed on the LLM server ("all" primes every voice)
+WARMUP_VOICES = os.environ.get("ORPHEUS_WARMUP_VOICES", DEFAULT_VOICE)
+
+# Warm-up state: "disabled", "pending", "running", "done" or "failed"
+warmup_state = {"status": "disabled", "seconds": None, "error": None}
+
+def configured_voices(setting: str = WARMUP_VOICES) -> List[str]:
+    """Parse a comma-separated voice list, or "all" for every voice"""
+    if setting.strip().lower() == "all":
+        return list(AVAILABLE_VOICES)
+    voices = [voice.strip() for voice in setting.split(",") if voice.strip()]
+    return [voice for voice in voices if voice in AVAILABLE_VOICES] or [DEFAULT_VOICE]
+
+def warm_decoder(windows: Iterable[int] = WARMUP_WINDOWS) -> None:
+    """Decode one dummy window of every size so SNAC has seen each shape"""
+    load_model()
+    for window in windows:
+        # Any in-range codes will do, the audio is discarded
+        convert_to_audio([(i * 97) % 4096 + 1 for i in range(window)], window)
+
+def prime_voice(voice: str) -> float:
+    """Send a one-token completion for the voice prefix, return its duration"""
+    config = get_config()
+    payload = {
+        "prompt": f"<|audio|>{voice}: ",
+        "max_tokens": 1,
+        "temperature": 0.0,
+        "stream": False,
+        "model": os.environ.get("ORPHEUS_MODEL_NAME", "lex-au/Orpheus-3b-FT-Q2_K.gguf"),
+    }
+    if PROMPT_CACHE:
+        payload["cache_prompt"] = True
+    # Only voice affinity pins a voice's requests to a known slot. With job affinity each
+    # request gets a slot from its own ID, so a slot picked here would be primed for nothing
+    if SLOT_AFFINITY == "voice":
+        slot = select_slot(voice)
+        if slot is not None:
+            payload["id_slot"] = slot
+    
+    start_time = time.time()
+    response = requests.post(
+        config.api_url,
+        headers=HEADERS,
+        json=payload,
+        timeout=config.request_timeout
+    )
+    response.raise_for_status()
+    return time.time() - start_time
+
+def warmup(voices: Optional[List[str]] = None) -> dict:
+    """
+    Warm up the decoder and prime the LLM, return the time spent on each step.
+
+    Decoder failures are raised. Priming failures are logged and recorded in
+    warmup_state but don't fail the warm-up, since the LLM server may come up
+    after this process.
+    """
+    voices = configured_voices() if voices is None else voices
+    warmup_state.update(status="running", seconds=None, error=None)
+    start_time = time.time()
+    timings = {}
+
+    try:
+        warm_decoder()
+    except Exception as e:
+        warmup_state.update(status="failed", error=f"Decoder warm-up failed: {e}")
+        raise
+    timings["decoder"] = round(time.time() - start_time, 3)
+
+    if get_config().api_url:
+        for voice in voices:
+            try:
+                timings[f"prime_{voice}"] = round(prime_voice(voice), 3)
+            except requests.exceptions.RequestException as e:
+                print(f"Warm-up: could not prime voice '{voice}': {e}")
+                warmup_state["error"] = f"Priming failed for {voice}: {e}"
+
+    total = round(time.time() - start_time, 3)
+    warmup_state.update(status="done", seconds=total)
+    print(f"Warm-up completed in {total:.2f}s ({', '.join(f'{k}: {v:.2f}s' for k, v in timings.items())})")
+    return timings